@@ -0,0 +1,118 @@
+"""
+In-process caching primitives for PurpleShop backend
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache with per-entry expiry.
+
+    Not thread-safe; it is meant to be used from the event loop only.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a live entry, refreshing its LRU position"""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._discard(key)
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store an entry, evicting the least recently used ones when full"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._discard(next(iter(self._data)))
+
+    def delete(self, key: Hashable) -> None:
+        """Remove an entry if present"""
+        self._discard(key)
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        self._data.clear()
+
+    def _discard(self, key: Hashable) -> None:
+        """Drop one entry; every removal goes through here"""
+        self._data.pop(key, None)
+
+
+class TaggedTTLCache(TTLCache):
+    """
+    TTLCache whose entries carry tags for targeted invalidation.
+
+    ``invalidate`` drops every entry stored under any of the given tags,
+    so writers evict only what they may have changed.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        super().__init__(max_size, ttl)
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+        self._key_tags: Dict[Hashable, tuple] = {}
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        tags: Iterable[Hashable] = ()
+    ) -> None:
+        """Store an entry under some tags"""
+        self._untag(key)
+        self._key_tags[key] = tuple(tags)
+        for tag in self._key_tags[key]:
+            self._tags.setdefault(tag, set()).add(key)
+        super().set(key, value, ttl)
+
+    def invalidate(self, tags: Iterable[Hashable]) -> int:
+        """Drop the entries stored under any of the tags and get how many"""
+        keys = set()
+        for tag in tags:
+            keys.update(self._tags.get(tag, ()))
+        for key in keys:
+            self._discard(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        super().clear()
+        self._tags.clear()
+        self._key_tags.clear()
+
+    def _untag(self, key: Hashable) -> None:
+        """Remove a key from the tag index"""
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _discard(self, key: Hashable) -> None:
+        """Drop one entry and its tags"""
+        super()._discard(key)
+        self._untag(key)
@@ -54,6 +54,20 @@ class Settings(BaseSettings):
             return self.DATABASE_URL
         return self.SQLITE_URL
 
+    # Search settings
+    SEARCH_DEFAULT_LANGUAGE: str = "en"
+    FUZZY_SIMILARITY_THRESHOLD: float = 0.3
+    SEARCH_VOCABULARY_REFRESH_SECONDS: int = 900  # 15 minutes
+    SEARCH_BACKEND: str = "auto"  # auto, postgres, memory or database
+    SEARCH_INDEX_SHARDS: int = 1  # Per app worker, 1 = in-process; 0 = one process per CPU core
+    SEARCH_INDEX_TIMEOUT_SECONDS: float = 1.0  # Shard reply deadline before falling back to SQL
+    SEARCH_INDEX_MAX_CANDIDATES: int = 1000  # Searches matching more products fall back to SQL
+    SEARCH_INDEX_REBUILD_BATCH: int = 1000
+
+    # Geospatial settings
+    USE_POSTGIS: bool = False
+    GEO_NEAREST_MAX_RADIUS_KM: float = 100.0  # Bound for sort=distance without radius_km
+
     # JWT settings
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
@@ -92,6 +106,94 @@ class Settings(BaseSettings):
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
 
+    # Listing totals
+    COUNT_CACHE_TTL: int = 30  # seconds
+    COUNT_CACHE_SIZE: int = 10000
+    COUNT_ESTIMATE_THRESHOLD: int = 10000  # Use planner estimates above this
+
+    # Denormalized count reconciliation (manage.py counts)
+    RECONCILE_CHUNK_SIZE: int = 10000  # Ids per transaction
+    RECONCILE_CONCURRENCY: int = 4  # Chunks run in parallel
+
+    # Category taxonomy (navigation menu)
+    TAXONOMY_REFRESH_SECONDS: int = 300  # Recount from products, covers other workers' writes
+
+    # Category price distributions (percentiles and histogram)
+    PRICE_SKETCH_ACCURACY: float = 0.01  # Relative error of percentiles
+    PRICE_PERCENTILES: List[int] = [10, 25, 50, 75, 90]
+    PRICE_SKETCH_REFRESH_SECONDS: int = 900
+
+    # Product stats rollup
+    PRODUCT_STATS_CHECK_SECONDS: int = 3600  # Recompute from products and fix drift
+
+    # Sharded product counters (views, favorites, inquiries)
+    COUNTER_SHARDS: int = 8  # Slots per product counter
+    COUNTER_FOLD_SECONDS: int = 10  # How often slots are added to products
+
+    # Product view counting (buffered per worker, flushed in batches)
+    VIEW_COUNTER_FLUSH_SECONDS: int = 5
+    VIEW_COUNTER_MAX_PENDING: int = 100000  # Products buffered before views are dropped
+
+    # Unique viewers (HyperLogLog per product and day)
+    UNIQUE_VIEWERS_PRECISION: int = 10  # 2**10 registers: 1 KiB per sketch, ~3% error
+    UNIQUE_VIEWERS_WINDOW_DAYS: int = 30  # Days merged into unique_viewers
+    UNIQUE_VIEWERS_RETENTION_DAYS: int = 90
+    UNIQUE_VIEWERS_MAX_PENDING: int = 10000  # Sketches buffered per worker
+    UNIQUE_VIEWERS_FLUSH_SECONDS: int = 60
+
+    # Listing result cache
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_BACKEND: str = "memory"  # memory (per worker: others see writes after RESULT_CACHE_TTL) or redis (shared)
+    RESULT_CACHE_TTL: int = 60  # seconds, memory backend
+    RESULT_CACHE_SIZE: int = 10000
+
+    # Search facets
+    FACET_CACHE_TTL: int = 60  # seconds
+    FACET_CACHE_SIZE: int = 5000
+    PRICE_FACET_BUCKETS: List[int] = [10, 50, 100, 250, 500, 1000]
+
+    # Related products
+    RELATED_PRODUCTS_ENABLED: bool = True
+    RELATED_PRODUCTS_COUNT: int = 8
+    RELATED_MIN_SIMILARITY: float = 0.05
+    RELATED_MAX_FEATURES: int = 2000  # TF-IDF vocabulary size per category
+    RELATED_MAX_CATEGORY_SIZE: int = 20000  # Newest active products compared per category
+    RELATED_REFRESH_SECONDS: int = 300  # Categories changed by writes
+    RELATED_REBUILD_SECONDS: int = 86400  # Every category
+
+    # Favorites-based recommendations
+    RECOMMENDATIONS_NEIGHBORS: int = 50  # Stored neighbors per product
+    RECOMMENDATIONS_MIN_COOCCURRENCE: int = 2  # Users favoriting both products
+    RECOMMENDATIONS_MAX_USER_FAVORITES: int = 100  # Most recent favorites used per user
+    RECOMMENDATIONS_BATCH_SIZE: int = 50000  # Favorites read per chunk
+    RECOMMENDATIONS_MAX_PENDING_PAIRS: int = 20000000  # Partial sums before compacting
+    RECOMMENDATIONS_LIMIT: int = 20
+
+    # Trending products
+    TRENDING_ENABLED: bool = True
+    TRENDING_HALF_LIFE_HOURS: float = 24.0
+    TRENDING_VIEW_WEIGHT: float = 1.0
+    TRENDING_FAVORITE_WEIGHT: float = 5.0
+    TRENDING_TOP_K: int = 100  # Products ranked per category and location
+    TRENDING_MIN_SCORE: float = 0.05  # Decayed score below which a product is forgotten
+    TRENDING_SEED_HALF_LIVES: float = 4.0  # History replayed at startup
+    TRENDING_COMPACT_SECONDS: int = 600
+
+    # Tags
+    MAX_TAGS_PER_PRODUCT: int = 20
+    TAG_CLOUD_SIZE: int = 100
+
+    # Search-as-you-type suggestions
+    SUGGEST_ENABLED: bool = True
+    SUGGEST_MAX_RESULTS: int = 10
+    SUGGEST_REFRESH_SECONDS: int = 600
+    SUGGEST_MIN_QUERY_COUNT: int = 3  # Searches before a query is suggested
+    SUGGEST_TRACKED_QUERIES: int = 10000
+
+    # In-memory bitmap index for filter-only browsing
+    BITMAP_INDEX_ENABLED: bool = True  # Listings go to SQL after other workers' writes until the next refresh
+    BITMAP_INDEX_REFRESH_SECONDS: int = 300
+
     class Config:
         """Pydantic configuration"""
         env_file = ".env"
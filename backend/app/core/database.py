@@ -62,6 +62,11 @@ async def drop_tables():
     logger.info("Database tables dropped successfully")
 
 
+def is_postgresql() -> bool:
+    """Check whether the configured database is PostgreSQL"""
+    return engine.dialect.name == "postgresql"
+
+
 # Database health check
 async def check_database_connection():
     """Check if database connection is working"""
@@ -0,0 +1,119 @@
+"""
+Managed database indexes for PurpleShop backend
+
+``Base.metadata.create_all`` only creates indexes together with new tables,
+so indexes declared later on existing models never reach running databases.
+``sync_indexes`` brings a database in line with the declared set: it creates
+missing indexes (``CONCURRENTLY`` on PostgreSQL, so writes are not blocked),
+rebuilds ones left invalid by an interrupted concurrent build and drops
+retired ones.
+"""
+from typing import Dict, List, Set
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateIndex, Index
+
+from app.core.database import engine
+from app.core.logging import logger
+from app.models.base import Base
+
+# Indexes superseded by later indexes on products
+RETIRED_INDEXES = {
+    "products": [
+        "ix_products_title",
+        "ix_products_category",
+        "ix_products_subcategory",
+        "ix_products_product_type",
+        "ix_products_location",
+        "ix_products_status",
+        "ix_products_status_created_at_id",
+        "ix_products_status_geohash",
+        # Covered by ix_products_active_sort_price_id
+        "ix_products_active_price_id",
+    ],
+}
+
+
+def declared_indexes() -> List[Index]:
+    """Get every index declared on the models, in table dependency order"""
+    indexes = []
+    for table in Base.metadata.sorted_tables:
+        indexes.extend(sorted(table.indexes, key=lambda index: index.name))
+    return indexes
+
+
+def _existing_indexes(sync_conn) -> Dict[str, Set[str]]:
+    """Get index names per table (synchronous, for run_sync)"""
+    inspector = inspect(sync_conn)
+    tables = set(inspector.get_table_names())
+    return {
+        table.name: {index["name"] for index in inspector.get_indexes(table.name)}
+        for table in Base.metadata.sorted_tables
+        if table.name in tables
+    }
+
+
+async def _invalid_indexes(conn: AsyncConnection) -> Set[str]:
+    """Get indexes left invalid by failed concurrent builds (PostgreSQL)"""
+    result = await conn.execute(text(
+        "SELECT c.relname FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE NOT i.indisvalid"
+    ))
+    return set(result.scalars().all())
+
+
+def create_index_sql(index: Index, dialect) -> str:
+    """Render the CREATE INDEX statement for an index"""
+    sql = str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect))
+    if dialect.name == "postgresql":
+        sql = sql.replace("INDEX IF NOT EXISTS", "INDEX CONCURRENTLY IF NOT EXISTS", 1)
+    return sql
+
+
+def drop_index_sql(name: str, dialect) -> str:
+    """Render the DROP INDEX statement for an index name"""
+    if dialect.name == "postgresql":
+        return f"DROP INDEX CONCURRENTLY IF EXISTS {name}"
+    return f"DROP INDEX IF EXISTS {name}"
+
+
+async def sync_indexes(dry_run: bool = False, drop_retired: bool = True) -> List[str]:
+    """
+    Apply the declared index set to the database.
+
+    Returns the statements that were (or, with ``dry_run``, would be)
+    executed. Runs in autocommit mode because PostgreSQL does not allow
+    concurrent index builds inside a transaction.
+    """
+    statements = []
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        dialect = conn.dialect
+        existing = await conn.run_sync(_existing_indexes)
+        invalid = await _invalid_indexes(conn) if dialect.name == "postgresql" else set()
+
+        for index in declared_indexes():
+            table = index.table.name
+            if table not in existing:
+                continue
+            if index.name in invalid:
+                statements.append(drop_index_sql(index.name, dialect))
+            elif index.name in existing[table]:
+                continue
+            statements.append(create_index_sql(index, dialect))
+
+        if drop_retired:
+            for table, names in RETIRED_INDEXES.items():
+                for name in names:
+                    if name in existing.get(table, ()):
+                        statements.append(drop_index_sql(name, dialect))
+
+        for statement in statements:
+            if dry_run:
+                continue
+            logger.info(f"Index sync: {statement}")
+            await conn.execute(text(statement))
+
+    return statements
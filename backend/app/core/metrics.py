@@ -0,0 +1,37 @@
+"""
+In-process metrics for PurpleShop backend
+
+Counters are incremented by services as they work; gauges are read from a
+callable when a snapshot is taken. Both are served on ``/metrics``.
+"""
+from collections import Counter
+from typing import Callable, Dict, Union
+
+Number = Union[int, float]
+
+
+class Metrics:
+    """Named counters and gauges of one worker process"""
+
+    def __init__(self):
+        self._counters: Counter = Counter()
+        self._gauges: Dict[str, Callable[[], Number]] = {}
+
+    def increment(self, name: str, value: Number = 1) -> None:
+        """Add to a counter"""
+        self._counters[name] += value
+
+    def gauge(self, name: str, func: Callable[[], Number]) -> None:
+        """Register a gauge read at snapshot time"""
+        self._gauges[name] = func
+
+    def snapshot(self) -> Dict[str, Number]:
+        """Get the current value of every counter and gauge"""
+        values: Dict[str, Number] = dict(self._counters)
+        for name, func in self._gauges.items():
+            values[name] = func()
+        return dict(sorted(values.items()))
+
+
+# Global metrics registry
+metrics = Metrics()
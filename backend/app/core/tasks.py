@@ -0,0 +1,77 @@
+"""
+Periodic background tasks for PurpleShop backend
+"""
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+
+from app.core.logging import logger
+
+
+class PeriodicTask:
+    """Run an async callable on a fixed interval inside the event loop"""
+
+    def __init__(
+        self,
+        name: str,
+        interval: float,
+        func: Callable[[], Awaitable[None]]
+    ):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> None:
+        """Run the task body, logging instead of propagating errors"""
+        try:
+            await self.func()
+        except Exception as e:
+            logger.error(f"Periodic task '{self.name}' failed: {e}", exc_info=True)
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+    def start(self) -> None:
+        """Start the task loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def stop(self) -> None:
+        """Cancel the task loop and wait for it to exit"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+_periodic_tasks: List[PeriodicTask] = []
+
+
+def register_periodic_task(
+    name: str,
+    interval: float,
+    func: Callable[[], Awaitable[None]]
+) -> PeriodicTask:
+    """Register a task to be started with the application"""
+    task = PeriodicTask(name, interval, func)
+    _periodic_tasks.append(task)
+    return task
+
+
+def start_periodic_tasks() -> None:
+    """Start all registered periodic tasks"""
+    for task in _periodic_tasks:
+        task.start()
+        logger.info(f"Started periodic task '{task.name}' every {task.interval}s")
+
+
+async def stop_periodic_tasks() -> None:
+    """Stop all registered periodic tasks"""
+    for task in _periodic_tasks:
+        await task.stop()
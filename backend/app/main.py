@@ -16,9 +16,47 @@ from slowapi.middleware import SlowAPIMiddleware
 from app.core.config import settings
 from app.core.database import engine
 from app.models.base import Base
-from app.routers import products, users, auth, categories
+from app.routers import products, users, auth, categories, tags
 from app.utils.exceptions import ValidationException, NotFoundError
 from app.core.logging import logger
+from app.core.metrics import metrics
+from app.core.tasks import (
+    register_periodic_task,
+    start_periodic_tasks,
+    stop_periodic_tasks
+)
+from app.services.bitmap_index import (
+    rebuild_bitmap_index,
+    start_bitmap_index,
+    stop_bitmap_index
+)
+from app.services.counter_shards import fold_counter_shards
+from app.services.fulltext import install_fulltext_search, install_language
+from app.services.fuzzy import install_fuzzy_search, refresh_search_vocabulary
+from app.services.geo import backfill_geohashes, install_geohash, install_postgis, use_postgis
+from app.services.price_distribution import rebuild_price_distributions
+from app.services.product_stats import check_product_stats
+from app.services.related import (
+    install_related_summaries,
+    rebuild_related_products,
+    refresh_related_products,
+    start_related_products
+)
+from app.services.result_cache import start_result_cache, stop_result_cache
+from app.services.search_index import (
+    get_search_backend,
+    start_search_index,
+    stop_search_index
+)
+from app.services.suggest import (
+    rebuild_suggestions,
+    start_suggestions,
+    stop_suggestions
+)
+from app.services.taxonomy import rebuild_taxonomy
+from app.services.trending import compact_trending, start_trending
+from app.services.unique_viewers import flush_viewer_sketches, prune_viewer_sketches
+from app.services.view_counter import flush_views
 
 
 # Rate limiter
@@ -34,12 +72,143 @@ async def lifespan(app: FastAPI):
     # Create database tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await install_geohash(conn)
+        await install_language(conn)
+        await install_related_summaries(conn)
+        if conn.dialect.name == "postgresql":
+            await install_fulltext_search(conn)
+            await install_fuzzy_search(conn)
+        if use_postgis():
+            await install_postgis(conn)
 
     logger.info("Database tables created successfully")
+
+    # Geohashes of products stored before radius search
+    filled = await backfill_geohashes()
+    if filled:
+        logger.info(f"Backfilled geohashes for {filled} products")
+
+    # In-memory search index
+    if get_search_backend() == "memory":
+        await start_search_index()
+
+    # Listing result cache
+    if settings.RESULT_CACHE_ENABLED:
+        start_result_cache()
+
+    # In-memory bitmap index for filter-only browsing
+    if settings.BITMAP_INDEX_ENABLED:
+        await start_bitmap_index()
+        register_periodic_task(
+            "bitmap-index",
+            settings.BITMAP_INDEX_REFRESH_SECONDS,
+            rebuild_bitmap_index
+        )
+
+    # Search-as-you-type suggestions
+    if settings.SUGGEST_ENABLED:
+        await start_suggestions()
+        register_periodic_task(
+            "suggestions",
+            settings.SUGGEST_REFRESH_SECONDS,
+            rebuild_suggestions
+        )
+
+    # Related products: changed categories often, everything daily
+    if settings.RELATED_PRODUCTS_ENABLED:
+        await start_related_products()
+        register_periodic_task(
+            "related-products",
+            settings.RELATED_REFRESH_SECONDS,
+            refresh_related_products
+        )
+        register_periodic_task(
+            "related-products-rebuild",
+            settings.RELATED_REBUILD_SECONDS,
+            rebuild_related_products
+        )
+
+    # Category taxonomy for the navigation menu
+    await rebuild_taxonomy()
+    register_periodic_task(
+        "taxonomy",
+        settings.TAXONOMY_REFRESH_SECONDS,
+        rebuild_taxonomy
+    )
+
+    # Category price distributions
+    await rebuild_price_distributions()
+    register_periodic_task(
+        "price-distributions",
+        settings.PRICE_SKETCH_REFRESH_SECONDS,
+        rebuild_price_distributions
+    )
+
+    # Product stats rollup, built from source and checked for drift
+    await check_product_stats()
+    register_periodic_task(
+        "product-stats",
+        settings.PRODUCT_STATS_CHECK_SECONDS,
+        check_product_stats
+    )
+
+    # Sharded product counters, folded into the products table
+    register_periodic_task(
+        "counter-shards",
+        settings.COUNTER_FOLD_SECONDS,
+        fold_counter_shards
+    )
+
+    # Buffered product view counts
+    register_periodic_task(
+        "view-counter",
+        settings.VIEW_COUNTER_FLUSH_SECONDS,
+        flush_views
+    )
+
+    # Unique viewer sketches
+    register_periodic_task(
+        "unique-viewers",
+        settings.UNIQUE_VIEWERS_FLUSH_SECONDS,
+        flush_viewer_sketches
+    )
+    register_periodic_task(
+        "unique-viewers-prune",
+        24 * 60 * 60,
+        prune_viewer_sketches
+    )
+
+    # Trending products, seeded from recent activity
+    if settings.TRENDING_ENABLED:
+        await start_trending()
+        register_periodic_task(
+            "trending",
+            settings.TRENDING_COMPACT_SECONDS,
+            compact_trending
+        )
+
+    # Background maintenance
+    if engine.dialect.name == "postgresql":
+        register_periodic_task(
+            "search-vocabulary",
+            settings.SEARCH_VOCABULARY_REFRESH_SECONDS,
+            refresh_search_vocabulary
+        )
+    start_periodic_tasks()
     yield
 
     # Shutdown
     logger.info("Shutting down PurpleShop API...")
+    await stop_periodic_tasks()
+    for flush in (flush_views, flush_viewer_sketches, fold_counter_shards):
+        try:
+            await flush()
+        except Exception as e:
+            logger.error(f"Final {flush.__name__} failed: {e}", exc_info=True)
+    stop_search_index()
+    stop_bitmap_index()
+    stop_suggestions()
+    await stop_result_cache()
     await engine.dispose()
 
 
@@ -123,6 +292,13 @@ async def health_check():
     }
 
 
+# Metrics endpoint
+@app.get("/metrics", tags=["Health"])
+async def get_metrics():
+    """In-process counters and gauges of this worker"""
+    return metrics.snapshot()
+
+
 # Root endpoint
 @app.get("/", tags=["Root"])
 async def root():
@@ -131,7 +307,8 @@ async def root():
         "message": "Welcome to PurpleShop API",
         "docs": "/docs",
         "redoc": "/redoc",
-        "health": "/health"
+        "health": "/health",
+        "metrics": "/metrics"
     }
 
 
@@ -156,6 +333,11 @@ app.include_router(
     prefix=f"{settings.API_V1_STR}/categories",
     tags=["Categories"]
 )
+app.include_router(
+    tags.router,
+    prefix=f"{settings.API_V1_STR}/tags",
+    tags=["Tags"]
+)
 
 
 if __name__ == "__main__":
@@ -6,6 +6,12 @@ from app.models.user import User, UserRole, UserStatus
 from app.models.product import Product, ProductCondition, ProductStatus, ProductType
 from app.models.favorite import Favorite
 from app.models.review import Review
+from app.models.related import ProductNeighbors, ProductRelated
+from app.models.tag import ProductTag, Tag
+from app.models.view_sketch import ProductViewSketch
+from app.models.counter_shard import ProductCounterShard
+from app.models.product_stats import ProductStats
+from app.models.listing_generation import ListingGeneration
 
 __all__ = [
     "Base",
@@ -17,5 +23,13 @@ __all__ = [
     "ProductStatus",
     "ProductType",
     "Favorite",
-    "Review"
+    "Review",
+    "ProductNeighbors",
+    "ProductRelated",
+    "ProductTag",
+    "Tag",
+    "ProductViewSketch",
+    "ProductCounterShard",
+    "ProductStats",
+    "ListingGeneration"
 ]
\ No newline at end of file
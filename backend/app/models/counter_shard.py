@@ -0,0 +1,33 @@
+"""
+Product counter shard model for PurpleShop
+"""
+from sqlalchemy import ForeignKey, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class ProductCounterShard(Base):
+    """ProductCounterShard model - one slot of a product counter's unfolded increments"""
+    __tablename__ = "product_counter_shards"
+
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id"),
+        nullable=False
+    )
+    counter: Mapped[str] = mapped_column(
+        String(20),  # "views", "favorites" or "inquiries"
+        nullable=False
+    )
+    shard: Mapped[int] = mapped_column(
+        nullable=False
+    )
+    value: Mapped[int] = mapped_column(
+        default=0,
+        nullable=False
+    )
+
+    # Constraints: one row per slot, also the conflict target of increments
+    __table_args__ = (
+        UniqueConstraint("product_id", "counter", "shard", name="unique_product_counter_shard"),
+    )
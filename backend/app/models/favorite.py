@@ -2,7 +2,7 @@
 Favorite model for PurpleShop
 """
 from typing import TYPE_CHECKING
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -41,6 +41,7 @@ class Favorite(Base):
     # Constraints
     __table_args__ = (
         UniqueConstraint("user_id", "product_id", name="unique_user_product_favorite"),
+        Index("ix_favorites_user_created_at_id", "user_id", "created_at", "id"),
     )
 
     def to_dict(self) -> dict:
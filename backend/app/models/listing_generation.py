@@ -0,0 +1,18 @@
+"""
+Listing generation model for PurpleShop
+"""
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class ListingGeneration(Base):
+    """ListingGeneration model - count of committed product writes, shared by every worker"""
+    __tablename__ = "listing_generation"
+
+    # One row, bumped after each product write so in-memory indexes can
+    # tell whether another worker wrote since they last caught up
+    generation: Mapped[int] = mapped_column(
+        default=0,
+        nullable=False
+    )
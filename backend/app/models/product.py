@@ -1,12 +1,14 @@
 """
 Product model for PurpleShop
 """
+import json
 from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import String, Text, Integer, Float, Boolean, Enum, ForeignKey
+from sqlalchemy import String, Text, Integer, Float, Boolean, Enum, ForeignKey, Index, event, func, literal_column, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
 from app.models.base import Base
+from app.utils.geo import geohash_encode
 
 if TYPE_CHECKING:
     from app.models.user import User
@@ -37,6 +39,12 @@ class ProductType(str, enum.Enum):
     NEW = "new"
 
 
+def _active_index(name: str, *columns: str) -> Index:
+    """Partial index over active products (status values are stored by name)"""
+    active = text(f"status = '{ProductStatus.ACTIVE.name}'")
+    return Index(name, *columns, postgresql_where=active, sqlite_where=active)
+
+
 class Product(Base):
     """Product model"""
     __tablename__ = "products"
@@ -44,8 +52,7 @@ class Product(Base):
     # Basic information
     title: Mapped[str] = mapped_column(
         String(255),
-        nullable=False,
-        index=True
+        nullable=False
     )
     description: Mapped[Optional[str]] = mapped_column(
         Text,
@@ -60,13 +67,11 @@ class Product(Base):
     # Categorization
     category: Mapped[str] = mapped_column(
         String(100),
-        nullable=False,
-        index=True
+        nullable=False
     )
     subcategory: Mapped[Optional[str]] = mapped_column(
         String(100),
-        nullable=True,
-        index=True
+        nullable=True
     )
 
     # Condition and type
@@ -76,18 +81,20 @@ class Product(Base):
     )
     product_type: Mapped[ProductType] = mapped_column(
         Enum(ProductType),
-        nullable=False,
-        index=True
+        nullable=False
     )
 
     # Location
     location: Mapped[str] = mapped_column(
         String(100),
-        nullable=False,
-        index=True
+        nullable=False
     )
     latitude: Mapped[Optional[float]] = mapped_column(nullable=True)
     longitude: Mapped[Optional[float]] = mapped_column(nullable=True)
+    geohash: Mapped[Optional[str]] = mapped_column(
+        String(12),  # Derived from latitude/longitude on flush
+        nullable=True
+    )
 
     # Images
     image_urls: Mapped[Optional[str]] = mapped_column(
@@ -103,8 +110,7 @@ class Product(Base):
     status: Mapped[ProductStatus] = mapped_column(
         Enum(ProductStatus),
         default=ProductStatus.ACTIVE,
-        nullable=False,
-        index=True
+        nullable=False
     )
     is_featured: Mapped[bool] = mapped_column(
         Boolean,
@@ -135,7 +141,7 @@ class Product(Base):
 
     # Metadata
     tags: Mapped[Optional[str]] = mapped_column(
-        Text,  # JSON string of tags
+        Text,  # JSON string of tags, mirrored in product_tags for filtering
         nullable=True
     )
     brand: Mapped[Optional[str]] = mapped_column(
@@ -146,6 +152,11 @@ class Product(Base):
         String(100),
         nullable=True
     )
+    language: Mapped[str] = mapped_column(
+        String(5),  # Listing language, selects the full-text analyzer
+        default="en",
+        nullable=False
+    )
 
     # Shipping information
     shipping_available: Mapped[bool] = mapped_column(
@@ -188,6 +199,45 @@ class Product(Base):
         back_populates="product",
         cascade="all, delete-orphan"
     )
+    product_tags: Mapped[List["ProductTag"]] = relationship(
+        "ProductTag",
+        back_populates="product",
+        cascade="all, delete-orphan"
+    )
+
+    # Listing queries are "status = 'ACTIVE'" plus one or two filters in
+    # keyset order (created_at desc, id desc); partial indexes match that
+    # shape and skip every inactive row. Existing databases get them through
+    # "python manage.py indexes" (see app/core/indexes.py).
+    __table_args__ = (
+        _active_index("ix_products_active_created_at_id", "created_at", "id"),
+        _active_index("ix_products_active_category_created_at_id", "category", "created_at", "id"),
+        _active_index(
+            "ix_products_active_category_location_created_at_id",
+            "category", "location", "created_at", "id"
+        ),
+        _active_index("ix_products_active_subcategory_created_at_id", "subcategory", "created_at", "id"),
+        _active_index("ix_products_active_location_created_at_id", "location", "created_at", "id"),
+        _active_index("ix_products_active_type_created_at_id", "product_type", "created_at", "id"),
+        _active_index("ix_products_active_seller_created_at_id", "seller_id", "created_at", "id"),
+        _active_index("ix_products_active_views_id", "views_count", "id"),
+        _active_index("ix_products_active_favorites_id", "favorites_count", "id"),
+        # Seller listings of any status
+        Index(
+            "ix_products_seller_status_created_at_id",
+            "seller_id", "status", "created_at", "id"
+        ),
+        # Geohash prefix ranges for radius searches
+        _active_index("ix_products_active_geohash", "geohash"),
+    )
+
+    @classmethod
+    def status_is(cls, status: ProductStatus):
+        """
+        Filter on a status rendered inline rather than bound, so the planner
+        can match the partial indexes even with generic prepared-statement plans
+        """
+        return cls.status == literal_column(f"'{status.name}'")
 
     @property
     def is_available(self) -> bool:
@@ -223,6 +273,7 @@ class Product(Base):
     def to_public_dict(self) -> dict:
         """Convert product to public dictionary"""
         data = self.to_dict()
+        data["tags"] = json.loads(self.tags) if self.tags else []
         # Add seller info (public only)
         if self.seller:
             data["seller"] = {
@@ -231,4 +282,24 @@ class Product(Base):
                 "avatar_url": self.seller.avatar_url,
                 "location": self.seller.location
             }
-        return data
\ No newline at end of file
+        return data
+
+
+# Price order of listings: free items (no price) sort as 0, so the key is
+# never NULL and keyset comparisons stay well-defined. The 0 is inline so
+# queries match the index expression exactly.
+sort_price = func.coalesce(Product.price, literal_column("0"))
+
+Index(
+    "ix_products_active_sort_price_id",
+    sort_price, Product.id,
+    postgresql_where=Product.status_is(ProductStatus.ACTIVE),
+    sqlite_where=Product.status_is(ProductStatus.ACTIVE)
+)
+
+
+@event.listens_for(Product, "before_insert")
+@event.listens_for(Product, "before_update")
+def _sync_geohash(mapper, connection, target: Product) -> None:
+    """Keep the geohash column in sync with the coordinates"""
+    target.geohash = geohash_encode(target.latitude, target.longitude)
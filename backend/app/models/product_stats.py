@@ -0,0 +1,60 @@
+"""
+Product statistics rollup model for PurpleShop
+"""
+from typing import Optional
+from sqlalchemy import Enum, Float, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+from app.models.product import ProductStatus, ProductType
+
+
+class ProductStats(Base):
+    """ProductStats model - counts and price aggregates of one status/type/category/location cell"""
+    __tablename__ = "product_stats"
+
+    # Cell
+    status: Mapped[ProductStatus] = mapped_column(
+        Enum(ProductStatus),
+        nullable=False
+    )
+    product_type: Mapped[ProductType] = mapped_column(
+        Enum(ProductType),
+        nullable=False
+    )
+    category: Mapped[str] = mapped_column(
+        String(100),
+        nullable=False
+    )
+    location: Mapped[str] = mapped_column(
+        String(100),
+        nullable=False
+    )
+
+    # Aggregates, kept up to date on product writes
+    product_count: Mapped[int] = mapped_column(
+        default=0,
+        nullable=False
+    )
+    priced_count: Mapped[int] = mapped_column(  # Products with a price
+        default=0,
+        nullable=False
+    )
+    price_sum: Mapped[float] = mapped_column(
+        Float,
+        default=0.0,
+        nullable=False
+    )
+    min_price: Mapped[Optional[float]] = mapped_column(
+        Float,
+        nullable=True
+    )
+    max_price: Mapped[Optional[float]] = mapped_column(
+        Float,
+        nullable=True
+    )
+
+    # Constraints: one row per cell, also the conflict target of upserts
+    __table_args__ = (
+        UniqueConstraint("status", "product_type", "category", "location", name="unique_product_stats_cell"),
+    )
@@ -0,0 +1,44 @@
+"""
+Related product models for PurpleShop
+"""
+from typing import Optional
+from sqlalchemy import ForeignKey, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class ProductRelated(Base):
+    """ProductRelated model - precomputed related products of one product"""
+    __tablename__ = "product_related"
+
+    # The product's own id, so get_product reads its row by primary key
+    id: Mapped[int] = mapped_column(
+        ForeignKey("products.id"),
+        primary_key=True,
+        autoincrement=False
+    )
+
+    # JSON list of related product summaries, most similar first
+    summaries: Mapped[Optional[str]] = mapped_column(
+        Text,
+        nullable=True
+    )
+
+
+class ProductNeighbors(Base):
+    """ProductNeighbors model - products most often favorited together with one product"""
+    __tablename__ = "product_neighbors"
+
+    # The product's own id, so recommendations read rows by primary key
+    id: Mapped[int] = mapped_column(
+        ForeignKey("products.id"),
+        primary_key=True,
+        autoincrement=False
+    )
+
+    # JSON list of [product_id, score] pairs, best first
+    neighbors: Mapped[Optional[str]] = mapped_column(
+        Text,
+        nullable=True
+    )
@@ -0,0 +1,72 @@
+"""
+Tag models for PurpleShop
+"""
+from typing import List, TYPE_CHECKING
+from sqlalchemy import String, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.models.base import Base
+
+if TYPE_CHECKING:
+    from app.models.product import Product
+
+
+class Tag(Base):
+    """Tag model - normalized product tag with a precomputed usage count"""
+    __tablename__ = "tags"
+
+    name: Mapped[str] = mapped_column(
+        String(50),
+        unique=True,
+        nullable=False
+    )
+
+    # Number of active products carrying the tag, kept up to date on writes
+    product_count: Mapped[int] = mapped_column(
+        default=0,
+        nullable=False
+    )
+
+    # Relationships
+    product_tags: Mapped[List["ProductTag"]] = relationship(
+        "ProductTag",
+        back_populates="tag",
+        cascade="all, delete-orphan"
+    )
+
+    # Tag cloud reads the most used tags first
+    __table_args__ = (
+        Index("ix_tags_product_count", "product_count"),
+    )
+
+
+class ProductTag(Base):
+    """ProductTag model - links a product to one of its tags"""
+    __tablename__ = "product_tags"
+
+    # Foreign keys
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id"),
+        nullable=False
+    )
+    tag_id: Mapped[int] = mapped_column(
+        ForeignKey("tags.id"),
+        nullable=False
+    )
+
+    # Relationships
+    product: Mapped["Product"] = relationship(
+        "Product",
+        back_populates="product_tags"
+    )
+    tag: Mapped["Tag"] = relationship(
+        "Tag",
+        back_populates="product_tags"
+    )
+
+    # Constraints: (product_id, tag_id) serves a product's tags,
+    # (tag_id, product_id) serves tag filters
+    __table_args__ = (
+        UniqueConstraint("product_id", "tag_id", name="unique_product_tag"),
+        Index("ix_product_tags_tag_product", "tag_id", "product_id"),
+    )
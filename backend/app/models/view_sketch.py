@@ -0,0 +1,34 @@
+"""
+Product view sketch model for PurpleShop
+"""
+from datetime import date
+from sqlalchemy import Date, ForeignKey, Index, LargeBinary, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class ProductViewSketch(Base):
+    """ProductViewSketch model - HyperLogLog of one product's viewers on one day"""
+    __tablename__ = "product_view_sketches"
+
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id"),
+        nullable=False
+    )
+    day: Mapped[date] = mapped_column(
+        Date,
+        nullable=False
+    )
+
+    # Serialized app.utils.hyperloglog.HyperLogLog
+    sketch: Mapped[bytes] = mapped_column(
+        LargeBinary,
+        nullable=False
+    )
+
+    # Constraints: (product_id, day) serves window reads, day serves pruning
+    __table_args__ = (
+        UniqueConstraint("product_id", "day", name="unique_product_view_sketch_day"),
+        Index("ix_product_view_sketches_day", "day"),
+    )
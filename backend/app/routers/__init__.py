@@ -5,10 +5,12 @@ from app.routers.auth import router as auth_router
 from app.routers.users import router as users_router
 from app.routers.products import router as products_router
 from app.routers.categories import router as categories_router
+from app.routers.tags import router as tags_router
 
 __all__ = [
     "auth_router",
     "users_router",
     "products_router",
-    "categories_router"
+    "categories_router",
+    "tags_router"
 ]
\ No newline at end of file
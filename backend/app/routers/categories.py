@@ -4,72 +4,26 @@ Categories router for PurpleShop API
 from typing import List, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 
 from app.core.database import get_db
 from app.models.product import Product, ProductStatus
+from app.services.price_distribution import get_price_distribution
+from app.services.product_stats import get_category_stats
+from app.services.taxonomy import taxonomy_response
 
 router = APIRouter()
 
 
 @router.get("/")
-async def list_categories(
-    db: AsyncSession = Depends(get_db)
-):
-    """List all available categories with product counts"""
+async def list_categories(request: Request):
+    """
+    List all available categories with product counts
 
-    # Query categories with product counts
-    category_query = (
-        select(
-            Product.category,
-            func.count(Product.id).label("product_count")
-        )
-        .where(Product.status == ProductStatus.ACTIVE)
-        .group_by(Product.category)
-        .order_by(func.count(Product.id).desc())
-    )
-
-    category_result = await db.execute(category_query)
-    categories = [
-        {"name": row[0], "product_count": row[1]}
-        for row in category_result.all()
-    ]
-
-    # Query subcategories
-    subcategory_query = (
-        select(
-            Product.category,
-            Product.subcategory,
-            func.count(Product.id).label("product_count")
-        )
-        .where(
-            and_(
-                Product.status == ProductStatus.ACTIVE,
-                Product.subcategory.isnot(None)
-            )
-        )
-        .group_by(Product.category, Product.subcategory)
-        .order_by(Product.category, func.count(Product.id).desc())
-    )
-
-    subcategory_result = await db.execute(subcategory_query)
-    subcategories = {}
-    for row in subcategory_result.all():
-        category = row[0]
-        subcategory = row[1]
-        count = row[2]
-
-        if category not in subcategories:
-            subcategories[category] = []
-        subcategories[category].append({
-            "name": subcategory,
-            "product_count": count
-        })
-
-    return {
-        "categories": categories,
-        "subcategories": subcategories
-    }
+    Served from the in-memory taxonomy with an ETag; an unchanged tree
+    answers ``If-None-Match`` with 304.
+    """
+    return taxonomy_response(request, "tree")
 
 
 @router.get("/{category_name}")
@@ -77,82 +31,16 @@ async def get_category_details(
     category_name: str,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get category details with statistics"""
-
-    # Query category statistics
-    stats_query = (
-        select(
-            func.count(Product.id).label("total_products"),
-            func.avg(Product.price).label("average_price"),
-            func.min(Product.price).label("min_price"),
-            func.max(Product.price).label("max_price")
-        )
-        .where(
-            and_(
-                Product.category == category_name,
-                Product.status == ProductStatus.ACTIVE,
-                Product.price.isnot(None)
-            )
-        )
-    )
-
-    stats_result = await db.execute(stats_query)
-    stats_row = stats_result.first()
-
-    # Query locations for this category
-    location_query = (
-        select(
-            Product.location,
-            func.count(Product.id).label("product_count")
-        )
-        .where(
-            and_(
-                Product.category == category_name,
-                Product.status == ProductStatus.ACTIVE
-            )
-        )
-        .group_by(Product.location)
-        .order_by(func.count(Product.id).desc())
-    )
-
-    location_result = await db.execute(location_query)
-    locations = [
-        {"name": row[0], "product_count": row[1]}
-        for row in location_result.all()
-    ]
-
-    # Query product types distribution
-    type_query = (
-        select(
-            Product.product_type,
-            func.count(Product.id).label("product_count")
-        )
-        .where(
-            and_(
-                Product.category == category_name,
-                Product.status == ProductStatus.ACTIVE
-            )
-        )
-        .group_by(Product.product_type)
-        .order_by(func.count(Product.id).desc())
-    )
-
-    type_result = await db.execute(type_query)
-    product_types = [
-        {"type": row[0], "product_count": row[1]}
-        for row in type_result.all()
-    ]
+    """
+    Get category details with statistics
 
+    Counts and price bounds come from the product_stats rollup; price
+    percentiles and the histogram come from in-memory price sketches.
+    """
     return {
         "category": category_name,
-        "statistics": {
-            "total_products": stats_row[0] if stats_row else 0,
-            "average_price": float(stats_row[1]) if stats_row and stats_row[1] else None,
-            "min_price": float(stats_row[2]) if stats_row and stats_row[2] else None,
-            "max_price": float(stats_row[3]) if stats_row and stats_row[3] else None,
-        },
-        "locations": locations,
-        "product_types": product_types
+        **await get_category_stats(db, category_name),
+        **get_price_distribution(category_name)
     }
 
 
@@ -171,7 +59,7 @@ async def list_category_subcategories(
         .where(
             and_(
                 Product.category == category_name,
-                Product.status == ProductStatus.ACTIVE,
+                Product.status_is(ProductStatus.ACTIVE),
                 Product.subcategory.isnot(None)
             )
         )
@@ -1,55 +1,80 @@
 """
 Products router for PurpleShop API
 """
-from typing import List, Optional
+from itertools import islice
+from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, text
-from sqlalchemy.orm import selectinload
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from app.core.database import get_db
-from app.models.product import Product, ProductStatus, ProductType, ProductCondition
+from sqlalchemy import select, and_, or_, text, case
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import ColumnElement
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from app.core.database import get_db, is_postgresql
+from app.models.product import Product, ProductStatus, ProductCondition, sort_price
+from app.models.related import ProductRelated
 from app.models.user import User
 from app.schemas.product import (
-    Product,
+    Product as ProductSchema,
     ProductCreate,
     ProductUpdate,
     ProductList,
     ProductSearchParams,
-    ProductDetail
+    ProductDetail,
+    SearchSuggestions,
+    serialize_product
 )
-from app.schemas.base import PaginationParams, PaginatedResponse
-from app.utils.exceptions import ProductNotFoundError, UnauthorizedError
+from app.schemas.base import PaginationParams, PaginatedResponse, CursorParams
+from app.core.config import settings
+from app.services.bitmap_index import ProductBitmapIndex, bitmap_filter, record_product_write
+from app.services.counter_shards import COUNTERS, increment_shard, unfolded_count_columns
+from app.services.counters import increment_counter
+from app.services.counting import (
+    COUNT_CACHED,
+    COUNT_EXACT,
+    COUNT_SKIPPED,
+    count_results,
+    page_count
+)
+from app.services.events import ProductEvent, product_events, product_snapshot
+from app.services.facets import compute_facets, parse_facets
+from app.services.fulltext import fulltext_search
+from app.services.geo import distance_km, radius_filter
+from app.services.listing_rows import listing_select, load_product_records, product_record
+from app.services.fuzzy import (
+    fuzzy_search,
+    get_search_suggestions,
+    set_similarity_threshold
+)
+from app.services.related import related_products
+from app.services.result_cache import (
+    CachedPage,
+    cache_listing,
+    get_cached_listing,
+    listing_cache_generation,
+    listing_cache_key
+)
+from app.services.product_stats import get_stats_summary, sync_product_stats
+from app.services.search_index import get_search_backend, search_product_ids
+from app.services.suggest import record_search, suggest
+from app.services.tags import sync_product_tags, tag_filter
+from app.services.taxonomy import taxonomy_response
+from app.services.trending import get_trending, record_product_favorite, record_product_view
+from app.services.unique_viewers import record_viewer, unique_viewer_counts, viewer_key
+from app.services.view_counter import pending_views, record_view
+from app.utils.exceptions import (
+    ProductNotFoundError,
+    UnauthorizedError,
+    ValidationException
+)
+from app.utils.bitmap import RoaringBitmap
+from app.utils.serializers import JSONBytesResponse
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_condition
 
 router = APIRouter()
 
 
-@router.get("/", response_model=ProductList)
-async def list_products(
-    db: AsyncSession = Depends(get_db),
-    search_params: ProductSearchParams = Depends(),
-    pagination: PaginationParams = Depends(),
-    current_user: Optional[User] = None
-):
-    """List products with filtering and pagination"""
-
-    # Base query
-    query = select(Product).options(
-        selectinload(Product.seller)
-    ).where(
-        Product.status == ProductStatus.ACTIVE
-    )
-
-    # Apply filters
-    if search_params.search:
-        search_filter = f"%{search_params.search}%"
-        query = query.where(
-            or_(
-                Product.title.ilike(search_filter),
-                Product.description.ilike(search_filter),
-                Product.tags.ilike(search_filter)
-            )
-        )
-
+def apply_product_filters(query: Select, search_params: ProductSearchParams) -> Select:
+    """Apply the column filters of a product search to a query"""
     if search_params.category:
         query = query.where(Product.category == search_params.category)
 
@@ -74,64 +99,391 @@ async def list_products(
     if search_params.seller_id:
         query = query.where(Product.seller_id == search_params.seller_id)
 
-    # Location-based search with radius
-    if search_params.latitude and search_params.longitude and search_params.radius_km:
-        # Using simplified distance calculation (for demo purposes)
-        # In production, consider using PostGIS for accurate geospatial queries
-        lat_range = search_params.radius_km / 111.0  # Approximate km per degree
-        query = query.where(
-            and_(
-                Product.latitude.between(
-                    search_params.latitude - lat_range,
-                    search_params.latitude + lat_range
-                ),
-                Product.longitude.between(
-                    search_params.longitude - lat_range,
-                    search_params.longitude + lat_range
+    tag_names = search_params.tag_names()
+    if tag_names:
+        query = query.where(tag_filter(tag_names, search_params.tags_mode or "any"))
+
+    return query
+
+
+def listing_sort_key(
+    sort: str,
+    distance: Optional[ColumnElement] = None,
+    relevance: Optional[ColumnElement] = None
+) -> Tuple[Tuple[ColumnElement, ColumnElement], bool]:
+    """
+    Get the keyset sort key of a listing sort mode and whether it descends.
+
+    Column sorts are served by the partial active-product indexes; distance
+    and relevance are computed per row but only over the rows a radius or
+    search condition already narrowed down.
+    """
+    if sort == "distance":
+        return (distance, Product.id), False
+    if sort == "relevance":
+        return (relevance, Product.id), True
+    if sort == "price_asc":
+        return (sort_price, Product.id), False
+    if sort == "price_desc":
+        return (sort_price, Product.id), True
+    if sort == "most_viewed":
+        return (Product.views_count, Product.id), True
+    if sort == "most_favorited":
+        return (Product.favorites_count, Product.id), True
+    return (Product.created_at, Product.id), True
+
+
+def _product_list_response(
+    products: List[dict],
+    pagination: PaginationParams,
+    total: Optional[int],
+    total_strategy: str,
+    next_cursor: Optional[str] = None,
+    suggestions: Optional[List[str]] = None,
+    facets: Optional[dict] = None
+) -> JSONBytesResponse:
+    """Write serialized products as a ProductList, in the schema's field order"""
+    return JSONBytesResponse({
+        "products": products,
+        "total": total,
+        "page": pagination.page,
+        "size": pagination.size,
+        "pages": page_count(total, pagination.size),
+        "total_strategy": total_strategy,
+        "next_cursor": next_cursor,
+        "suggestions": suggestions,
+        "facets": facets
+    })
+
+
+async def _list_from_bitmap_index(
+    db: AsyncSession,
+    index: ProductBitmapIndex,
+    matches: RoaringBitmap,
+    pagination: PaginationParams,
+    cursor_params: CursorParams,
+    requested_facets: List[str]
+) -> JSONBytesResponse:
+    """
+    Serve a filter-only listing from the bitmap index.
+
+    Positions follow ``(created_at, id)`` order, so walking the matching
+    positions from highest to lowest gives the same newest-first order as
+    the SQL path, and both components of its cursors select the same next
+    page. Only the page is loaded, by primary key.
+    """
+    if cursor_params.cursor:
+        created_at, last_id = decode_cursor(cursor_params.cursor, (Product.created_at, Product.id), "newest")
+        below = index.position_before(created_at, last_id)
+        positions = list(islice(matches.descending(below=below), pagination.size + 1))
+    else:
+        offset = (pagination.page - 1) * pagination.size
+        positions = list(islice(matches.descending(), offset, offset + pagination.size + 1))
+
+    has_more = len(positions) > pagination.size
+    page_ids = [index.product_id(position) for position in positions[:pagination.size]]
+
+    products = await load_product_records(db, page_ids)
+
+    next_cursor = None
+    if has_more and products:
+        next_cursor = encode_cursor((products[-1].created_at, products[-1].id), "newest")
+
+    if pagination.include_total:
+        total, total_strategy = len(matches), COUNT_EXACT
+    else:
+        total, total_strategy = None, COUNT_SKIPPED
+
+    return _product_list_response(
+        [serialize_product(product) for product in products],
+        pagination,
+        total,
+        total_strategy,
+        next_cursor=next_cursor,
+        facets=index.facet_counts(matches, requested_facets) if requested_facets else None
+    )
+
+
+async def _list_from_cached_page(
+    db: AsyncSession,
+    page: CachedPage,
+    search_params: ProductSearchParams,
+    pagination: PaginationParams
+) -> JSONBytesResponse:
+    """
+    Serve a listing from a cached id page.
+
+    Products are loaded fresh by primary key, so edits that do not move a
+    product between listings show up without evicting the page.
+    """
+    distances = dict(zip(page.ids, page.distances)) if page.distances is not None else None
+    products = []
+    for product in await load_product_records(db, page.ids):
+        product_dict = serialize_product(product)
+        if distances is not None:
+            product_dict["distance_km"] = distances[product.id]
+        products.append(product_dict)
+
+    if search_params.search and page.ids:
+        record_search(search_params.search)
+
+    return _product_list_response(
+        products,
+        pagination,
+        page.total,
+        COUNT_CACHED if page.total_strategy == COUNT_EXACT else page.total_strategy,
+        next_cursor=page.next_cursor,
+        suggestions=page.suggestions,
+        facets=page.facets
+    )
+
+
+@router.get("/", response_model=ProductList)
+async def list_products(
+    db: AsyncSession = Depends(get_db),
+    search_params: ProductSearchParams = Depends(),
+    pagination: PaginationParams = Depends(),
+    cursor_params: CursorParams = Depends(),
+    facets: Optional[str] = None,
+    current_user: Optional[User] = None
+):
+    """
+    List products with filtering and pagination
+
+    Pass the ``next_cursor`` of a response as ``cursor`` to fetch the
+    following page by keyset; ``page`` is kept for legacy offset paging.
+    ``facets`` is a comma-separated list of category, subcategory,
+    condition, product_type, location and price to count for the filters.
+    """
+    requested_facets = parse_facets(facets)
+
+    # Filter-only browsing is answered from the in-memory bitmap index
+    bitmap_match = await bitmap_filter(db, search_params)
+    if bitmap_match is not None:
+        index, matches = bitmap_match
+        return await _list_from_bitmap_index(
+            db, index, matches, pagination, cursor_params, requested_facets
+        )
+
+    # Repeated listings are answered from the result cache
+    listing_key = listing_cache_key(search_params, pagination, cursor_params, requested_facets)
+    cached_page = await get_cached_listing(listing_key)
+    if cached_page is not None:
+        return await _list_from_cached_page(db, cached_page, search_params, pagination)
+    # Read before querying: a write committed from here on keeps this page out of the cache
+    cache_generation = await listing_cache_generation(search_params)
+
+    # Base query: listing columns only, read into records without the ORM
+    query = listing_select().where(
+        Product.status_is(ProductStatus.ACTIVE)
+    )
+
+    # Apply filters
+    relevance = None
+    fuzzy = search_params.search_mode == "fuzzy"
+    search_backend = get_search_backend()
+    if search_params.search:
+        scores = None
+        if search_backend == "memory" and not (is_postgresql() and fuzzy):
+            # None when a shard is dead or slow or too many products match,
+            # which falls back to ilike
+            scores = await search_product_ids(search_params.search)
+
+        if is_postgresql() and fuzzy:
+            # Typo-tolerant search backed by the trigram GIN indexes
+            await set_similarity_threshold(
+                db,
+                search_params.similarity or settings.FUZZY_SIMILARITY_THRESHOLD
+            )
+            search_filter, relevance = fuzzy_search(search_params.search)
+            query = query.where(search_filter)
+        elif search_backend == "postgres":
+            # Ranked full-text search backed by the search_vector GIN index
+            search_filter, relevance = fulltext_search(
+                search_params.search,
+                search_params.language
+            )
+            query = query.where(search_filter)
+        elif scores is not None:
+            # Every BM25 match from the in-memory inverted index; the score
+            # CASE is only built when the listing is ranked by it
+            query = query.where(Product.id.in_(list(scores)))
+            if scores and search_params.sort in (None, "relevance"):
+                relevance = case(scores, value=Product.id, else_=0.0)
+        else:
+            search_filter = f"%{search_params.search}%"
+            query = query.where(
+                or_(
+                    Product.title.ilike(search_filter),
+                    Product.description.ilike(search_filter),
+                    Product.tags.ilike(search_filter)
                 )
             )
-        )
 
-    # Count total results
-    count_query = select(func.count()).select_from(query)
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    query = apply_product_filters(query, search_params)
+
+    # Location-based search: geohash cell prefilter plus exact haversine
+    distance = None
+    has_point = search_params.latitude is not None and search_params.longitude is not None
+    if has_point:
+        distance = distance_km(search_params.latitude, search_params.longitude)
+        query = query.add_columns(distance.label("distance_km"))
+
+        radius = search_params.radius_km
+        if not radius and search_params.sort == "distance":
+            radius = settings.GEO_NEAREST_MAX_RADIUS_KM
+        if radius:
+            query = query.where(radius_filter(
+                search_params.latitude,
+                search_params.longitude,
+                radius
+            ))
+    elif search_params.sort == "distance":
+        raise ValidationException("sort=distance requires latitude and longitude")
+
+    if search_params.sort == "relevance" and not search_params.search:
+        raise ValidationException("sort=relevance requires a search")
+
+    # Count total results (cached, estimated or skipped where possible)
+    total, total_strategy = await count_results(
+        db,
+        query,
+        ("products", search_params.cache_key()),
+        pagination.include_total
+    )
 
-    # Apply pagination and ordering
-    query = query.order_by(Product.created_at.desc())
-    query = query.offset((pagination.page - 1) * pagination.size)
-    query = query.limit(pagination.size)
+    # Facet counts for the same filters, in one grouped query
+    facet_counts = None
+    if requested_facets:
+        facet_counts = await compute_facets(
+            db,
+            query.whereclause,
+            requested_facets,
+            search_params.cache_key()
+        )
 
-    # Execute query
+    # Apply ordering and pagination: every sort mode is a keyset over an
+    # indexed key, with the id breaking ties
+    sort = search_params.sort or ("relevance" if relevance is not None else "newest")
+    if sort == "relevance" and relevance is None:
+        sort = "newest"  # Plain ilike matching has no ranking
+    sort_key, descending = listing_sort_key(sort, distance, relevance)
+    query = query.add_columns(sort_key[0].label("sort_value"))
+    query = query.order_by(*[c.desc() if descending else c.asc() for c in sort_key])
+
+    if cursor_params.cursor:
+        query = query.where(keyset_condition(
+            sort_key,
+            decode_cursor(cursor_params.cursor, sort_key, sort),
+            descending=descending
+        ))
+    else:
+        query = query.offset((pagination.page - 1) * pagination.size)
+    query = query.limit(pagination.size + 1)
+
+    # Execute query; rows are (listing columns..., [distance_km,] sort_value)
     result = await db.execute(query)
-    products = result.scalars().all()
+    rows = result.all()
 
-    # Convert to response format
-    product_schemas = []
-    for product in products:
-        product_dict = product.to_public_dict()
-        product_schemas.append(Product(**product_dict))
+    # One extra row tells whether a following page exists
+    next_cursor = None
+    if len(rows) > pagination.size:
+        rows = rows[:pagination.size]
+        last = rows[-1]
+        next_cursor = encode_cursor((last.sort_value, last.id), sort)
 
-    return ProductList(
-        products=product_schemas,
+    # Convert to response format
+    products = []
+    distances = [] if distance is not None else None
+    for row in rows:
+        product_dict = serialize_product(product_record(row))
+        if distance is not None:
+            product_dict["distance_km"] = round(row.distance_km, 3) if row.distance_km is not None else None
+            distances.append(product_dict["distance_km"])
+        products.append(product_dict)
+
+    # "Did you mean" suggestions for fuzzy searches and empty result sets
+    suggestions = None
+    if search_params.search and is_postgresql() and (fuzzy or not rows):
+        suggestions = await get_search_suggestions(db, search_params.search)
+
+    # Queries that find products feed the autocomplete
+    if search_params.search and rows:
+        record_search(search_params.search)
+
+    await cache_listing(listing_key, search_params, cache_generation, CachedPage(
+        ids=[row.id for row in rows],
         total=total,
-        page=pagination.page,
-        size=pagination.size,
-        pages=(total + pagination.size - 1) // pagination.size
+        total_strategy=total_strategy,
+        next_cursor=next_cursor,
+        distances=distances,
+        suggestions=suggestions,
+        facets=facet_counts
+    ))
+
+    return _product_list_response(
+        products,
+        pagination,
+        total,
+        total_strategy,
+        next_cursor=next_cursor,
+        suggestions=suggestions,
+        facets=facet_counts
     )
 
 
+@router.get("/suggest", response_model=SearchSuggestions)
+async def suggest_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(settings.SUGGEST_MAX_RESULTS, ge=1, le=settings.SUGGEST_MAX_RESULTS)
+):
+    """
+    Search-as-you-type completions for the search box
+
+    Served from the in-memory completion trie without touching the
+    database; completions come from titles, brands and popular searches.
+    """
+    return SearchSuggestions(query=q, suggestions=suggest(q, limit))
+
+
+@router.get("/trending")
+async def trending_products(
+    db: AsyncSession = Depends(get_db),
+    category: Optional[str] = Query(None),
+    location: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=settings.TRENDING_TOP_K)
+):
+    """
+    Products with the most recent views and favorites
+
+    Ranked by popularity that halves every ``TRENDING_HALF_LIFE_HOURS``,
+    read from this worker's in-memory top-k; only the ranked products are
+    loaded from the database.
+    """
+    ranked = get_trending(category, location, limit)
+    products = await load_product_records(db, [product_id for product_id, _ in ranked])
+    return JSONBytesResponse({"products": [serialize_product(product) for product in products]})
+
+
 @router.get("/{product_id}", response_model=ProductDetail)
 async def get_product(
     product_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: Optional[User] = None
 ):
     """Get product by ID"""
 
-    # Query product with seller info
-    query = select(Product).options(
-        selectinload(Product.seller),
+    # Query product with seller info, its unfolded counter slots and its
+    # stored related products in one statement
+    query = select(
+        Product,
+        *unfolded_count_columns(),
+        ProductRelated.summaries
+    ).outerjoin(
+        ProductRelated, ProductRelated.id == Product.id
+    ).options(
+        joinedload(Product.seller),
         selectinload(Product.reviews)
     ).where(
         and_(
@@ -141,22 +493,32 @@ async def get_product(
     )
 
     result = await db.execute(query)
-    product = result.scalar_one_or_none()
+    row = result.one_or_none()
 
-    if not product:
+    if not row:
         raise ProductNotFoundError(product_id)
+    product = row.Product
+
+    # Count the view; buffered and flushed in batches, so reading stays a read
+    record_view(product.id)
+    record_product_view(product)
+    record_viewer(
+        product.id,
+        viewer_key(current_user, request.client.host if request.client else None)
+    )
 
-    # Increment view count
-    product.views_count += 1
-    await db.commit()
-
-    # Convert to response format
+    # Convert to response format, including unfolded counter shards and
+    # this worker's unflushed views
     product_dict = product.to_public_dict()
+    for counter, column in COUNTERS.items():
+        product_dict[column] += row._mapping[f"unfolded_{counter}"]
+    product_dict["views_count"] += pending_views(product.id)
+    product_dict["unique_viewers"] = (await unique_viewer_counts(db, [product.id]))[product.id]
 
     # Add additional data for detailed view
     product_dict.update({
         "seller_info": product.seller.to_public_dict() if product.seller else None,
-        "related_products": [],  # TODO: Implement related products logic
+        "related_products": related_products(row.summaries),
         "reviews": [
             review.to_public_dict() for review in product.reviews
             if review.is_public
@@ -166,7 +528,7 @@ async def get_product(
     return ProductDetail(**product_dict)
 
 
-@router.post("/", response_model=Product)
+@router.post("/", response_model=ProductSchema)
 async def create_product(
     product_data: ProductCreate,
     current_user: User,  # Requires authentication
@@ -176,24 +538,31 @@ async def create_product(
 
     # Create product instance
     product = Product(
-        **product_data.model_dump(),
+        **product_data.model_dump(exclude={"tags"}),
         seller_id=current_user.id,
         status=ProductStatus.ACTIVE
     )
 
-    # Add to database
+    # Add to database, with its tags, stats and the seller's product count
     db.add(product)
+    await db.flush()
+    await sync_product_tags(db, product, product_data.tags or [])
+    await sync_product_stats(db, None, product_snapshot(product))
+    await increment_counter(db, User.products_count, current_user.id)
     await db.commit()
     await db.refresh(product)
 
-    # Update user's product count
-    current_user.products_count += 1
-    await db.commit()
+    product_events.publish(ProductEvent(
+        action="created",
+        product_id=product.id,
+        current=product_snapshot(product)
+    ))
+    await record_product_write(db)
 
-    return Product(**product.to_public_dict())
+    return ProductSchema(**product.to_public_dict())
 
 
-@router.put("/{product_id}", response_model=Product)
+@router.put("/{product_id}", response_model=ProductSchema)
 async def update_product(
     product_id: int,
     product_data: ProductUpdate,
@@ -214,15 +583,35 @@ async def update_product(
     if product.seller_id != current_user.id and not current_user.is_admin:
         raise UnauthorizedError("You can only edit your own products")
 
+    previous = product_snapshot(product)
+
     # Update fields
     update_data = product_data.model_dump(exclude_unset=True)
+    tags = None
+    if "tags" in update_data:
+        tags = update_data.pop("tags") or []
     for field, value in update_data.items():
         setattr(product, field, value)
 
+    await sync_product_tags(
+        db,
+        product,
+        tags,
+        was_active=previous["status"] == ProductStatus.ACTIVE
+    )
+    await sync_product_stats(db, previous, product_snapshot(product))
     await db.commit()
     await db.refresh(product)
 
-    return Product(**product.to_public_dict())
+    product_events.publish(ProductEvent(
+        action="updated",
+        product_id=product.id,
+        current=product_snapshot(product),
+        previous=previous
+    ))
+    await record_product_write(db)
+
+    return ProductSchema(**product.to_public_dict())
 
 
 @router.delete("/{product_id}")
@@ -245,10 +634,25 @@ async def delete_product(
     if product.seller_id != current_user.id and not current_user.is_admin:
         raise UnauthorizedError("You can only delete your own products")
 
+    previous = product_snapshot(product)
+
     # Soft delete
     product.status = ProductStatus.DELETED
+    await sync_product_tags(
+        db,
+        product,
+        was_active=previous["status"] == ProductStatus.ACTIVE
+    )
+    await sync_product_stats(db, previous, product_snapshot(product))
     await db.commit()
 
+    product_events.publish(ProductEvent(
+        action="deleted",
+        product_id=product.id,
+        previous=previous
+    ))
+    await record_product_write(db)
+
     return {"message": "Product deleted successfully"}
 
 
@@ -291,11 +695,13 @@ async def favorite_product(
     favorite = Favorite(user_id=current_user.id, product_id=product_id)
     db.add(favorite)
 
-    # Update counts
-    product.favorites_count += 1
-    current_user.favorites_count += 1
+    # Update counts in SQL so concurrent favorites are not lost; the
+    # product's count is sharded since popular listings take many at once
+    await increment_shard(db, product_id, "favorites")
+    await increment_counter(db, User.favorites_count, current_user.id)
 
     await db.commit()
+    record_product_favorite(product)
 
     return {"message": "Product added to favorites"}
 
@@ -325,10 +731,9 @@ async def unfavorite_product(
             detail="Product not in favorites"
         )
 
-    # Update counts before deletion
-    if favorite.product:
-        favorite.product.favorites_count -= 1
-    current_user.favorites_count -= 1
+    # Update counts in SQL so concurrent changes are not lost
+    await increment_shard(db, product_id, "favorites", -1)
+    await increment_counter(db, User.favorites_count, current_user.id, -1)
 
     # Remove favorite
     await db.delete(favorite)
@@ -338,80 +743,14 @@ async def unfavorite_product(
 
 
 @router.get("/categories/list")
-async def list_categories(
-    db: AsyncSession = Depends(get_db)
-):
-    """Get list of available categories"""
-
-    # Query distinct categories
-    category_query = select(Product.category).distinct().where(
-        Product.status == ProductStatus.ACTIVE
-    )
-    category_result = await db.execute(category_query)
-    categories = [row[0] for row in category_result.all()]
-
-    # Query distinct locations
-    location_query = select(Product.location).distinct().where(
-        Product.status == ProductStatus.ACTIVE
-    )
-    location_result = await db.execute(location_query)
-    locations = [row[0] for row in location_result.all()]
-
-    return {
-        "categories": sorted(categories),
-        "locations": sorted(locations)
-    }
+async def list_categories(request: Request):
+    """Get list of available categories and locations, from the in-memory taxonomy"""
+    return taxonomy_response(request, "names")
 
 
 @router.get("/stats/summary")
 async def get_products_stats(
     db: AsyncSession = Depends(get_db)
 ):
-    """Get products statistics"""
-
-    # Total products
-    total_query = select(func.count(Product.id)).where(
-        Product.status == ProductStatus.ACTIVE
-    )
-    total_result = await db.execute(total_query)
-    total_products = total_result.scalar()
-
-    # Products by type
-    type_stats = {}
-    for product_type in ProductType:
-        type_query = select(func.count(Product.id)).where(
-            and_(
-                Product.status == ProductStatus.ACTIVE,
-                Product.product_type == product_type
-            )
-        )
-        type_result = await db.execute(type_query)
-        type_stats[product_type.value] = type_result.scalar()
-
-    # Products by category
-    category_query = select(
-        Product.category,
-        func.count(Product.id)
-    ).where(
-        Product.status == ProductStatus.ACTIVE
-    ).group_by(Product.category)
-
-    category_result = await db.execute(category_query)
-    category_stats = {row[0]: row[1] for row in category_result.all()}
-
-    # Average price (excluding free products)
-    avg_price_query = select(func.avg(Product.price)).where(
-        and_(
-            Product.status == ProductStatus.ACTIVE,
-            Product.price.isnot(None)
-        )
-    )
-    avg_price_result = await db.execute(avg_price_query)
-    avg_price = float(avg_price_result.scalar() or 0)
-
-    return {
-        "total_products": total_products,
-        "products_by_type": type_stats,
-        "products_by_category": category_stats,
-        "average_price": round(avg_price, 2)
-    }
\ No newline at end of file
+    """Get products statistics, read from the product_stats rollup"""
+    return await get_stats_summary(db)
@@ -0,0 +1,23 @@
+"""
+Tags router for PurpleShop API
+"""
+from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Query
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.schemas.product import TagCloudEntry
+from app.services.tags import get_tag_cloud
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[TagCloudEntry])
+async def tag_cloud(
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(settings.TAG_CLOUD_SIZE, ge=1, le=500),
+    min_count: int = Query(1, ge=1)
+):
+    """Get the most used tags of active products, with display weights"""
+    return await get_tag_cloud(db, limit, min_count)
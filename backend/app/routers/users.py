@@ -3,15 +3,25 @@ Users router for PurpleShop API
 """
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.models.user import User, UserStatus
-from app.schemas.user import User, UserCreate, UserUpdate, UserProfile, UserList
-from app.schemas.base import PaginationParams
+from app.schemas.user import User as UserSchema, UserCreate, UserUpdate, UserProfile, UserList
+from app.models.favorite import Favorite
+from app.models.product import Product, ProductStatus
+from app.schemas.base import PaginationParams, CursorParams
+from app.schemas.product import serialize_product
+from app.services.counting import count_results, page_count
+from app.services.listing_rows import listing_select, product_record, product_records
+from app.services.recommendations import get_recommendations
+from app.services.unique_viewers import unique_viewer_counts
 from app.utils.exceptions import UserNotFoundError, UnauthorizedError
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_condition
+from app.utils.serializers import JSONBytesResponse
 
 router = APIRouter()
 
@@ -38,6 +48,22 @@ async def get_current_user_profile(
     return UserProfile(**user.to_dict())
 
 
+@router.get("/me/recommendations")
+async def get_current_user_recommendations(
+    current_user: User,  # Requires authentication
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(settings.RECOMMENDATIONS_LIMIT, ge=1, le=100)
+):
+    """
+    Get products favorited by users who favorited the same products
+
+    Merges the precomputed neighbors of the user's recent favorites;
+    empty until the user favorites something.
+    """
+    products = await get_recommendations(db, current_user.id, limit)
+    return JSONBytesResponse({"products": [serialize_product(product) for product in products]})
+
+
 @router.get("/{user_id}", response_model=UserProfile)
 async def get_user_profile(
     user_id: int,
@@ -87,9 +113,12 @@ async def list_users(
     ).order_by(User.created_at.desc())
 
     # Count total
-    count_query = select(func.count()).select_from(query)
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    total, total_strategy = await count_results(
+        db,
+        query,
+        ("users", "active"),
+        pagination.include_total
+    )
 
     # Apply pagination
     query = query.offset((pagination.page - 1) * pagination.size)
@@ -98,11 +127,12 @@ async def list_users(
     result = await db.execute(query)
     users = result.scalars().all()
 
-    user_schemas = [User(**user.to_public_dict()) for user in users]
+    user_schemas = [UserSchema(**user.to_public_dict()) for user in users]
 
     return UserList(
         users=user_schemas,
-        total=total
+        total=total,
+        total_strategy=total_strategy
     )
 
 
@@ -144,6 +174,7 @@ async def get_user_products(
     user_id: int,
     db: AsyncSession = Depends(get_db),
     pagination: PaginationParams = Depends(),
+    cursor_params: CursorParams = Depends(),
     status_filter: str = "active"
 ):
     """Get products by user"""
@@ -162,36 +193,56 @@ async def get_user_products(
         raise UserNotFoundError(user_id)
 
     # Query user's products
-    from app.models.product import Product, ProductStatus
-
-    query = select(Product).where(
+    sort_key = (Product.created_at, Product.id)
+    query = listing_select().where(
         and_(
             Product.seller_id == user_id,
-            getattr(ProductStatus, status_filter.upper()) == Product.status
+            Product.status_is(getattr(ProductStatus, status_filter.upper()))
         )
-    ).order_by(Product.created_at.desc())
+    ).order_by(*[c.desc() for c in sort_key])
 
     # Count total
-    count_query = select(func.count()).select_from(query)
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    total, total_strategy = await count_results(
+        db,
+        query,
+        ("user-products", user_id, status_filter),
+        pagination.include_total
+    )
 
-    # Apply pagination
-    query = query.offset((pagination.page - 1) * pagination.size)
-    query = query.limit(pagination.size)
+    # Apply pagination (keyset when a cursor is given, offset otherwise)
+    if cursor_params.cursor:
+        query = query.where(keyset_condition(
+            sort_key,
+            decode_cursor(cursor_params.cursor, sort_key, "newest")
+        ))
+    else:
+        query = query.offset((pagination.page - 1) * pagination.size)
+    query = query.limit(pagination.size + 1)
 
     result = await db.execute(query)
-    products = result.scalars().all()
-
-    product_schemas = [Product(**product.to_public_dict()) for product in products]
-
-    return {
-        "products": product_schemas,
+    products = product_records(result)
+
+    next_cursor = None
+    if len(products) > pagination.size:
+        products = products[:pagination.size]
+        next_cursor = encode_cursor((products[-1].created_at, products[-1].id), "newest")
+
+    unique_viewers = await unique_viewer_counts(db, [product.id for product in products])
+    product_dicts = []
+    for product in products:
+        product_dict = serialize_product(product)
+        product_dict["unique_viewers"] = unique_viewers[product.id]
+        product_dicts.append(product_dict)
+
+    return JSONBytesResponse({
+        "products": product_dicts,
         "total": total,
         "page": pagination.page,
         "size": pagination.size,
-        "pages": (total + pagination.size - 1) // pagination.size
-    }
+        "pages": page_count(total, pagination.size),
+        "total_strategy": total_strategy,
+        "next_cursor": next_cursor
+    })
 
 
 @router.get("/{user_id}/favorites")
@@ -199,6 +250,7 @@ async def get_user_favorites(
     user_id: int,
     db: AsyncSession = Depends(get_db),
     pagination: PaginationParams = Depends(),
+    cursor_params: CursorParams = Depends(),
     current_user: User = None
 ):
     """Get user's favorite products"""
@@ -220,41 +272,53 @@ async def get_user_favorites(
     if not user:
         raise UserNotFoundError(user_id)
 
-    # Query favorites with product details
-    from app.models.favorite import Favorite
-    from app.models.product import Product
-
+    # Query favorites with product details, newest favorite first
+    sort_key = (Favorite.created_at, Favorite.id)
     query = (
-        select(Product)
+        listing_select()
+        .add_columns(*sort_key)
         .join(Favorite, Product.id == Favorite.product_id)
         .where(
             and_(
                 Favorite.user_id == user_id,
-                Product.status == ProductStatus.ACTIVE
+                Product.status_is(ProductStatus.ACTIVE)
             )
         )
-        .options(selectinload(Product.seller))
-        .order_by(Favorite.created_at.desc())
+        .order_by(*[c.desc() for c in sort_key])
     )
 
     # Count total
-    count_query = select(func.count()).select_from(query)
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    total, total_strategy = await count_results(
+        db,
+        query,
+        ("user-favorites", user_id),
+        pagination.include_total
+    )
 
-    # Apply pagination
-    query = query.offset((pagination.page - 1) * pagination.size)
-    query = query.limit(pagination.size)
+    # Apply pagination (keyset when a cursor is given, offset otherwise)
+    if cursor_params.cursor:
+        query = query.where(keyset_condition(
+            sort_key,
+            decode_cursor(cursor_params.cursor, sort_key, "favorited")
+        ))
+    else:
+        query = query.offset((pagination.page - 1) * pagination.size)
+    query = query.limit(pagination.size + 1)
 
     result = await db.execute(query)
-    products = result.scalars().all()
+    rows = result.all()
 
-    product_schemas = [Product(**product.to_public_dict()) for product in products]
+    next_cursor = None
+    if len(rows) > pagination.size:
+        rows = rows[:pagination.size]
+        next_cursor = encode_cursor(tuple(rows[-1])[-len(sort_key):], "favorited")
 
-    return {
-        "products": product_schemas,
+    return JSONBytesResponse({
+        "products": [serialize_product(product_record(row)) for row in rows],
         "total": total,
         "page": pagination.page,
         "size": pagination.size,
-        "pages": (total + pagination.size - 1) // pagination.size
-    }
\ No newline at end of file
+        "pages": page_count(total, pagination.size),
+        "total_strategy": total_strategy,
+        "next_cursor": next_cursor
+    })
@@ -1,7 +1,13 @@
 """
 Schemas package for PurpleShop API
 """
-from app.schemas.base import BaseSchema, TimestampSchema, PaginationParams, PaginatedResponse
+from app.schemas.base import (
+    BaseSchema,
+    TimestampSchema,
+    PaginationParams,
+    CursorParams,
+    PaginatedResponse
+)
 from app.schemas.user import User, UserCreate, UserUpdate, UserInDB, UserProfile
 from app.schemas.product import Product, ProductCreate, ProductUpdate, ProductSearchParams
 from app.schemas.auth import Token, LoginRequest, RegisterRequest, AuthResponse
@@ -10,6 +16,7 @@ __all__ = [
     "BaseSchema",
     "TimestampSchema",
     "PaginationParams",
+    "CursorParams",
     "PaginatedResponse",
     "User",
     "UserCreate",
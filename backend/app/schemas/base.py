@@ -27,6 +27,7 @@ class PaginationParams(BaseSchema):
     """Schema for pagination parameters"""
     page: int = 1
     size: int = 20
+    include_total: bool = True  # False skips counting the full result set
 
     def __init__(self, **data):
         super().__init__(**data)
@@ -39,6 +40,11 @@ class PaginationParams(BaseSchema):
             self.size = 100
 
 
+class CursorParams(BaseSchema):
+    """Schema for keyset pagination parameters"""
+    cursor: Optional[str] = None  # Opaque next_cursor from the previous page
+
+
 class PaginatedResponse(BaseSchema):
     """Schema for paginated responses"""
     items: list
@@ -1,11 +1,24 @@
 """
 Product schemas for PurpleShop API
 """
-from typing import Optional, List
+import json
+from typing import Optional, List, Dict
 from datetime import datetime
 from pydantic import BaseModel, Field, field_validator
 
 from app.schemas.base import BaseSchema, TimestampSchema
+from app.utils.serializers import compile_serializer
+
+
+SORT_MODES = (
+    "newest",
+    "price_asc",
+    "price_desc",
+    "most_viewed",
+    "most_favorited",
+    "relevance",
+    "distance",
+)
 
 
 class ProductBase(BaseSchema):
@@ -23,10 +36,34 @@ class ProductBase(BaseSchema):
     tags: Optional[List[str]] = None
     brand: Optional[str] = Field(None, max_length=100)
     model: Optional[str] = Field(None, max_length=100)
+    language: str = Field("en", min_length=2, max_length=5)
     shipping_available: bool = False
     shipping_cost: Optional[float] = Field(None, ge=0)
     local_pickup: bool = True
 
+    @field_validator("tags")
+    @classmethod
+    def validate_tags(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        """Normalize tags and limit how many a product can carry"""
+        from app.core.config import settings
+        from app.services.tags import normalize_tags
+        if v is None:
+            return v
+        v = normalize_tags(v)
+        if len(v) > settings.MAX_TAGS_PER_PRODUCT:
+            raise ValueError(f"A product can have at most {settings.MAX_TAGS_PER_PRODUCT} tags")
+        return v
+
+    @field_validator("language")
+    @classmethod
+    def validate_language(cls, v: str) -> str:
+        """Validate listing language against the supported search analyzers"""
+        from app.services.fulltext import SEARCH_LANGUAGES
+        v = v.lower()
+        if v not in SEARCH_LANGUAGES:
+            raise ValueError(f"language must be one of {', '.join(SEARCH_LANGUAGES)}")
+        return v
+
 
 class ProductCreate(ProductBase):
     """Schema for creating a product"""
@@ -60,6 +97,43 @@ class ProductInDBBase(ProductBase, TimestampSchema):
 class Product(ProductInDBBase):
     """Schema for product response"""
     seller: Optional[dict] = None  # Will be populated with seller info
+    distance_km: Optional[float] = None  # Set when searching around a point
+    unique_viewers: Optional[int] = None  # Approximate, on product pages and seller listings
+
+
+def _product_tags(product) -> List[str]:
+    """Decode the JSON tags column"""
+    return json.loads(product.tags) if product.tags else []
+
+
+def _product_image_urls(product) -> Optional[List[str]]:
+    """Decode the JSON image URLs column"""
+    return json.loads(product.image_urls) if product.image_urls else None
+
+
+def _product_seller(product) -> Optional[dict]:
+    """Public seller summary of a product"""
+    seller = product.seller
+    if not seller:
+        return None
+    return {
+        "id": seller.id,
+        "display_name": seller.display_name,
+        "avatar_url": seller.avatar_url,
+        "location": seller.location
+    }
+
+
+# Product's public shape, built straight from a product without validation
+serialize_product = compile_serializer(
+    Product,
+    converters={
+        "tags": _product_tags,
+        "image_urls": _product_image_urls,
+        "seller": _product_seller,
+    },
+    defaults=("distance_km", "unique_viewers")
+)
 
 
 class ProductDetail(Product):
@@ -70,18 +144,44 @@ class ProductDetail(Product):
     reviews: Optional[List[dict]] = None
 
 
+class FacetCount(BaseSchema):
+    """Schema for one facet value and its product count"""
+    value: Optional[str] = None
+    count: int
+
+
+class TagCloudEntry(BaseSchema):
+    """Schema for one tag of the tag cloud"""
+    name: str
+    product_count: int
+    weight: int  # 1 (least used) to 5 (most used)
+
+
+class SearchSuggestions(BaseSchema):
+    """Schema for search-as-you-type completions"""
+    query: str
+    suggestions: List[str]
+
+
 class ProductList(BaseSchema):
     """Schema for list of products"""
     products: List[Product]
-    total: int
+    total: Optional[int] = None  # None when include_total=false
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    total_strategy: str = "exact"  # exact, cached, estimated or skipped
+    next_cursor: Optional[str] = None  # Keyset cursor for the following page
+    suggestions: Optional[List[str]] = None  # "Did you mean" alternatives
+    facets: Optional[Dict[str, List[FacetCount]]] = None  # Requested via facets=
 
 
 class ProductSearchParams(BaseSchema):
     """Schema for product search parameters"""
     search: Optional[str] = None
+    language: Optional[str] = None  # Analyzer for full-text search (en, es, ...)
+    search_mode: Optional[str] = None  # "fulltext" (default) or "fuzzy"
+    similarity: Optional[float] = Field(None, ge=0.1, le=1.0)  # Fuzzy threshold
     category: Optional[str] = None
     subcategory: Optional[str] = None
     location: Optional[str] = None
@@ -92,10 +192,36 @@ class ProductSearchParams(BaseSchema):
     status: Optional[str] = "active"
     is_featured: Optional[bool] = None
     seller_id: Optional[int] = None
-    tags: Optional[List[str]] = None
+    tags: Optional[str] = None  # Comma-separated tag names
+    tags_mode: Optional[str] = None  # "any" (default) or "all" of the tags
     latitude: Optional[float] = None
     longitude: Optional[float] = None
     radius_km: Optional[float] = Field(None, ge=0, le=100)  # Max 100km radius
+    sort: Optional[str] = None  # One of SORT_MODES; newest, or relevance when searching
+
+    @field_validator("search_mode")
+    @classmethod
+    def validate_search_mode(cls, v: Optional[str]) -> Optional[str]:
+        """Validate search mode"""
+        if v is not None and v not in ("fulltext", "fuzzy"):
+            raise ValueError("search_mode must be 'fulltext' or 'fuzzy'")
+        return v
+
+    @field_validator("tags_mode")
+    @classmethod
+    def validate_tags_mode(cls, v: Optional[str]) -> Optional[str]:
+        """Validate tag matching mode"""
+        if v is not None and v not in ("any", "all"):
+            raise ValueError("tags_mode must be 'any' or 'all'")
+        return v
+
+    @field_validator("sort")
+    @classmethod
+    def validate_sort(cls, v: Optional[str]) -> Optional[str]:
+        """Validate sort mode"""
+        if v is not None and v not in SORT_MODES:
+            raise ValueError(f"sort must be one of {', '.join(SORT_MODES)}")
+        return v
 
     @field_validator("max_price")
     @classmethod
@@ -107,6 +233,20 @@ class ProductSearchParams(BaseSchema):
                 raise ValueError("max_price must be greater than min_price")
         return v
 
+    def tag_names(self) -> List[str]:
+        """Get the normalized tag filter"""
+        from app.services.tags import parse_tags
+        return parse_tags(self.tags)
+
+    def cache_key(self) -> str:
+        """Get a canonical key for this filter set, for caching results"""
+        data = self.model_dump(exclude_none=True, exclude={"sort"})
+        if "search" in data:
+            data["search"] = " ".join(data["search"].lower().split())
+        if "tags" in data:
+            data["tags"] = sorted(self.tag_names())
+        return json.dumps(data, sort_keys=True, default=str)
+
 
 class ProductStats(BaseSchema):
     """Schema for product statistics"""
@@ -156,4 +296,4 @@ class ProductReport(BaseSchema):
     """Schema for reporting a product"""
     product_id: int
     reason: str = Field(..., max_length=500)
-    description: Optional[str] = Field(None, max_length=1000)
\ No newline at end of file
+    description: Optional[str] = Field(None, max_length=1000)
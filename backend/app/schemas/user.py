@@ -84,7 +84,8 @@ class UserProfile(UserInDBBase):
 class UserList(BaseSchema):
     """Schema for list of users"""
     users: list[User]
-    total: int
+    total: Optional[int] = None  # None when include_total=false
+    total_strategy: str = "exact"
 
 
 class PasswordReset(BaseSchema):
@@ -0,0 +1,44 @@
+"""
+Services package for PurpleShop API
+"""
+from app.services.events import (
+    ProductEvent,
+    product_events,
+    product_snapshot
+)
+from app.services.fulltext import (
+    SEARCH_LANGUAGES,
+    fulltext_search,
+    install_fulltext_search,
+    install_language
+)
+from app.services.fuzzy import (
+    fuzzy_search,
+    get_search_suggestions,
+    install_fuzzy_search,
+    refresh_search_vocabulary
+)
+from app.services.search_index import (
+    get_search_backend,
+    search_product_ids,
+    start_search_index,
+    stop_search_index
+)
+
+__all__ = [
+    "ProductEvent",
+    "product_events",
+    "product_snapshot",
+    "SEARCH_LANGUAGES",
+    "fulltext_search",
+    "install_fulltext_search",
+    "install_language",
+    "fuzzy_search",
+    "get_search_suggestions",
+    "install_fuzzy_search",
+    "refresh_search_vocabulary",
+    "get_search_backend",
+    "search_product_ids",
+    "start_search_index",
+    "stop_search_index"
+]
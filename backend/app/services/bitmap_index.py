@@ -0,0 +1,385 @@
+"""
+In-memory bitmap index for filter-only product browsing
+
+Every active product id is kept in one compressed bitmap per value of the
+category, subcategory, condition, product type and location columns, and per
+price facet bucket. Filter combinations become bitmap intersections and facet
+counts become intersection cardinalities, with no database round trip; the
+router then hydrates only the requested page by primary key.
+
+Bitmaps hold positions rather than product ids: products are numbered in
+``(created_at, id)`` order, the newest-first order of the SQL listing, so
+walking positions downwards pages exactly like the SQL path and a keyset
+cursor maps to a position by bisection. A write that arrives out of that
+order marks the index unordered, and listings go to SQL until the next
+rebuild.
+
+Price ranges are answered from the price buckets they cover whole plus a
+sorted ``(price, position)`` array, bisected for the rest of the range, so
+a filter only visits the products it matches.
+
+The index is updated from this worker's product write events and rebuilt
+from the ``products`` table at startup and every
+``BITMAP_INDEX_REFRESH_SECONDS``. Every product write also bumps the
+shared ``listing_generation`` counter; the index knows which generation it
+reflects, and a listing is only served from it while the counter still
+matches. Once another worker writes, listings go to SQL until the next
+rebuild catches up.
+"""
+import enum
+import math
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_maker, is_postgresql
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.models.listing_generation import ListingGeneration
+from app.models.product import Product, ProductStatus
+from app.schemas.product import ProductSearchParams
+from app.services.events import ProductEvent, ProductSnapshot, product_events
+from app.services.facets import (
+    facet_value,
+    format_facet_counts,
+    price_bucket_label,
+    price_bucket_labels
+)
+from app.utils.bitmap import RoaringBitmap
+from app.utils.pagination import keyset_condition
+
+BITMAP_FIELDS = ("category", "subcategory", "condition", "product_type", "location")
+
+_INDEXED_COLUMNS = [getattr(Product, field) for field in BITMAP_FIELDS]
+
+LISTING_GENERATION_ID = 1
+
+
+def _utc(value: datetime) -> datetime:
+    """Make a datetime comparable, reading naive ones as UTC like SQLite stores them"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _value_key(field: str, value: Any) -> Any:
+    """Normalize a column or request value to its bitmap key"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    return facet_value(field, value)
+
+
+class ProductBitmapIndex:
+    """Per-value bitmaps over the positions of active products"""
+
+    def __init__(self):
+        self.active = RoaringBitmap()
+        self.bitmaps: Dict[str, Dict[Any, RoaringBitmap]] = {
+            field: {} for field in (*BITMAP_FIELDS, "price")
+        }
+        self.prices: Dict[int, Optional[float]] = {}  # Position -> price
+        self.ordered = True  # Positions follow (created_at, id) order
+        self.generation = 0  # Last listing generation whose writes are all indexed
+        self._price_order: List[Tuple[float, int]] = []  # (price, position), sorted
+        self._unsorted_prices: List[Tuple[float, int]] = []  # Added since the last sort
+        self._order: List[Tuple[datetime, int]] = []  # (created_at, id) by position
+        self._positions: Dict[int, int] = {}  # Product id -> position
+        self._keys: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.active)
+
+    def _position(self, product_id: int, created_at: datetime) -> int:
+        """Get a product's position, numbering new products after the others"""
+        position = self._positions.get(product_id)
+        if position is None:
+            key = (_utc(created_at), product_id)
+            if self._order and key < self._order[-1]:
+                self.ordered = False
+            position = self._positions[product_id] = len(self._order)
+            self._order.append(key)
+        return position
+
+    def product_id(self, position: int) -> int:
+        """Get the product at a position"""
+        return self._order[position][1]
+
+    def position_before(self, created_at: datetime, product_id: int) -> int:
+        """Get the first position at or after a keyset cursor, so lower ones follow it newest-first"""
+        return bisect_left(self._order, (_utc(created_at), product_id))
+
+    def add(self, product_id: int, fields: Dict[str, Any]) -> None:
+        """Index or re-index an active product"""
+        self.remove(product_id)
+        position = self._position(product_id, fields["created_at"])
+
+        keys = {field: _value_key(field, fields.get(field)) for field in BITMAP_FIELDS}
+        keys["price"] = price_bucket_label(fields.get("price"))
+        for field, key in keys.items():
+            bitmap = self.bitmaps[field].get(key)
+            if bitmap is None:
+                bitmap = self.bitmaps[field][key] = RoaringBitmap()
+            bitmap.add(position)
+
+        price = fields.get("price")
+        self.active.add(position)
+        self.prices[position] = price
+        if price is not None:
+            self._unsorted_prices.append((price, position))
+        self._keys[product_id] = keys
+
+    def remove(self, product_id: int) -> None:
+        """Drop a product from every bitmap; its position is kept for a re-add"""
+        keys = self._keys.pop(product_id, None)
+        if keys is None:
+            return
+        position = self._positions[product_id]
+        for field, key in keys.items():
+            bitmap = self.bitmaps[field].get(key)
+            if bitmap is None:
+                continue
+            bitmap.discard(position)
+            if not bitmap:
+                del self.bitmaps[field][key]
+        self.active.discard(position)
+        price = self.prices.pop(position, None)
+        if price is not None:
+            prices = self.sorted_prices()
+            index = bisect_left(prices, (price, position))
+            if index < len(prices) and prices[index] == (price, position):
+                del prices[index]
+
+    def sorted_prices(self) -> List[Tuple[float, int]]:
+        """Get the ``(price, position)`` pairs of priced products in price order"""
+        if self._unsorted_prices:
+            # Timsort merges the appended run with the sorted one in linear time
+            self._price_order.extend(self._unsorted_prices)
+            self._price_order.sort()
+            self._unsorted_prices = []
+        return self._price_order
+
+    def _priced_between(self, low: Optional[float], high: Optional[float], high_inclusive: bool) -> RoaringBitmap:
+        """Get products priced from ``low`` up to ``high``, by bisecting the sorted prices"""
+        prices = self.sorted_prices()
+        start = 0 if low is None else bisect_left(prices, (low, -1))
+        if high is None:
+            end = len(prices)
+        elif high_inclusive:
+            end = bisect_right(prices, (high, math.inf))
+        else:
+            end = bisect_left(prices, (high, -1))
+        return RoaringBitmap(position for _, position in prices[start:end])
+
+    def price_range(self, min_price: Optional[float], max_price: Optional[float]) -> RoaringBitmap:
+        """
+        Get products priced within an inclusive range.
+
+        Buckets inside the range are taken whole and the rest of the range
+        is read from the sorted prices. Like the SQL filter, products
+        without a price never match a range.
+        """
+        bounds = settings.PRICE_FACET_BUCKETS
+        labels = price_bucket_labels()
+
+        # Buckets hold prices in [lower, upper), except zero, which is free
+        covered = [
+            (label, lower, upper)
+            for label, lower, upper in zip(labels[1:], [0, *bounds], [*bounds, None])
+            if (min_price is None or min_price <= lower)
+            and (max_price is None or (upper is not None and upper <= max_price))
+        ]
+        if not covered:
+            return self._priced_between(min_price, max_price, high_inclusive=True)
+
+        low_edge, high_edge = covered[0][1], covered[-1][2]
+        selected = [self.bitmaps["price"].get(label, RoaringBitmap()) for label, _, _ in covered]
+        # Zero sits below the first bucket, so include it with the range below
+        selected.append(self._priced_between(min_price, low_edge, high_inclusive=low_edge == 0))
+        if high_edge is not None:
+            selected.append(self._priced_between(high_edge, max_price, high_inclusive=True))
+        return RoaringBitmap.union_all(selected)
+
+    def filter(self, params: ProductSearchParams) -> RoaringBitmap:
+        """Get the positions of active products matching the column filters of a search"""
+        bitmaps = [self.active]
+        for field in BITMAP_FIELDS:
+            value = getattr(params, field)
+            if value is None or value == "":
+                continue
+            bitmap = self.bitmaps[field].get(_value_key(field, value))
+            if bitmap is None:
+                return RoaringBitmap()
+            bitmaps.append(bitmap)
+
+        if params.min_price is not None or params.max_price is not None:
+            bitmaps.append(self.price_range(params.min_price, params.max_price))
+
+        return RoaringBitmap.intersect_all(bitmaps)
+
+    def facet_counts(self, ids: RoaringBitmap, facets: Sequence[str]) -> Dict[str, List[dict]]:
+        """Count the matching products for each value of the requested facets"""
+        counts = {}
+        for facet in facets:
+            values = {}
+            for key, bitmap in self.bitmaps[facet].items():
+                count = len(ids & bitmap)
+                if count:
+                    values[key] = count
+            counts[facet] = values
+        return format_facet_counts(counts)
+
+
+# Global index, created at startup when BITMAP_INDEX_ENABLED is set
+product_bitmap_index: Optional[ProductBitmapIndex] = None
+
+# Write events received while a rebuild scans, applied once it is done,
+# and the listing generations this worker's writes bumped meanwhile
+_building_events: Optional[List[ProductEvent]] = None
+_building_generations: Optional[List[int]] = None
+
+
+def _apply_event(index: ProductBitmapIndex, event: ProductEvent) -> None:
+    """Apply one product write to an index"""
+    current: Optional[ProductSnapshot] = event.current
+    if current is not None and current.get("status") == ProductStatus.ACTIVE:
+        index.add(event.product_id, current)
+    else:
+        index.remove(event.product_id)
+
+
+@product_events.subscribe
+def _on_product_event(event: ProductEvent) -> None:
+    """Keep the bitmap index in sync with product writes"""
+    if product_bitmap_index is not None:
+        _apply_event(product_bitmap_index, event)
+    if _building_events is not None:
+        _building_events.append(event)
+
+
+async def _listing_generation(db: AsyncSession) -> int:
+    """Read the shared count of committed product writes"""
+    generation = await db.scalar(
+        select(ListingGeneration.generation).where(ListingGeneration.id == LISTING_GENERATION_ID)
+    )
+    return generation or 0
+
+
+def _catch_up(index: ProductBitmapIndex, generations: Sequence[int]) -> None:
+    """Advance an index over the generations of writes it has applied, while they follow on"""
+    for generation in sorted(generations):
+        if generation == index.generation + 1:
+            index.generation = generation
+
+
+async def record_product_write(db: AsyncSession) -> None:
+    """
+    Bump the shared listing generation after a committed product write.
+
+    Call once the write's event is published, so this worker's index
+    already holds it and keeps serving if no other worker wrote meanwhile.
+    """
+    if not settings.BITMAP_INDEX_ENABLED:
+        return
+    insert = postgresql_insert if is_postgresql() else sqlite_insert
+    statement = insert(ListingGeneration).values(id=LISTING_GENERATION_ID, generation=1)
+    statement = statement.on_conflict_do_update(
+        index_elements=[ListingGeneration.id],
+        set_={"generation": ListingGeneration.generation + 1, "updated_at": func.now()}
+    ).returning(ListingGeneration.generation)
+    generation = (await db.execute(statement)).scalar_one()
+    await db.commit()
+
+    if product_bitmap_index is not None:
+        _catch_up(product_bitmap_index, [generation])
+    if _building_generations is not None:
+        _building_generations.append(generation)
+
+
+async def rebuild_bitmap_index() -> None:
+    """Fill a fresh bitmap index from the products table and swap it in"""
+    global product_bitmap_index, _building_events, _building_generations
+    batch_size = settings.SEARCH_INDEX_REBUILD_BATCH
+    sort_key = (Product.created_at, Product.id)
+    index = ProductBitmapIndex()
+    _building_events = events = []
+    _building_generations = generations = []
+
+    try:
+        async with async_session_maker() as session:
+            # Read first: writes counted in it are committed, so the scan sees them
+            index.generation = await _listing_generation(session)
+            last_key = None
+            while True:
+                query = (
+                    select(Product.id, Product.created_at, Product.price, *_INDEXED_COLUMNS)
+                    .where(Product.status == ProductStatus.ACTIVE)
+                    .order_by(*sort_key)
+                    .limit(batch_size)
+                )
+                if last_key is not None:
+                    query = query.where(keyset_condition(sort_key, last_key, descending=False))
+                rows = (await session.execute(query)).all()
+                if not rows:
+                    break
+
+                for row in rows:
+                    fields = dict(zip(BITMAP_FIELDS, row[3:]))
+                    fields["created_at"] = row.created_at
+                    fields["price"] = row.price
+                    index.add(row.id, fields)
+                last_key = (rows[-1].created_at, rows[-1].id)
+
+        # Writes committed during the scan, in order, after the rows they follow
+        for event in events:
+            _apply_event(index, event)
+        _catch_up(index, generations)
+        index.sorted_prices()
+        product_bitmap_index = index
+        logger.info(f"Bitmap index rebuilt with {len(index)} products")
+    finally:
+        _building_events = None
+        _building_generations = None
+
+
+async def start_bitmap_index() -> None:
+    """Build the bitmap index at startup"""
+    await rebuild_bitmap_index()
+
+
+def stop_bitmap_index() -> None:
+    """Release the bitmap index"""
+    global product_bitmap_index
+    product_bitmap_index = None
+
+
+async def bitmap_filter(
+    db: AsyncSession,
+    params: ProductSearchParams
+) -> Optional[Tuple[ProductBitmapIndex, RoaringBitmap]]:
+    """
+    Resolve a listing from the bitmap index when it only uses indexed filters.
+
+    Returns the index and matching positions, or None when the search needs
+    the database (text search, geo, seller, tags or a non-default sort), the
+    index is out of listing order or another worker wrote since it caught up.
+    """
+    index = product_bitmap_index
+    if index is None or not index.ordered:
+        return None
+    if (
+        params.search
+        or params.latitude is not None
+        or params.longitude is not None
+        or params.seller_id is not None
+        or params.tags
+        or params.sort not in (None, "newest")
+    ):
+        return None
+    if await _listing_generation(db) != index.generation:
+        metrics.increment("bitmap_index.stale")
+        return None
+    return index, index.filter(params)
@@ -0,0 +1,148 @@
+"""
+Sharded product counters for PurpleShop
+
+Views, favorites and inquiries are not added to the ``products`` row
+directly: each increment is upserted into one of ``COUNTER_SHARDS``
+randomly picked slots in ``product_counter_shards``, so concurrent writers
+to one viral listing rarely wait on the same row lock. Every
+``COUNTER_FOLD_SECONDS`` the slots are deleted and their values added to
+the product columns, which listings sort and display; product detail adds
+the slots not folded yet, summed by subqueries of its own product query.
+"""
+import random
+from collections import defaultdict
+from typing import Dict, List, Mapping, Sequence
+
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.core.database import async_session_maker, is_postgresql
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.models.counter_shard import ProductCounterShard
+from app.models.product import Product
+
+FOLD_BATCH_SIZE = 1000
+
+# Counter names and the product columns they fold into
+COUNTERS = {
+    "views": "views_count",
+    "favorites": "favorites_count",
+    "inquiries": "inquiries_count",
+}
+
+_shards = ProductCounterShard.__table__
+_products = Product.__table__
+
+
+async def increment_shards(
+    db: AsyncSession,
+    counter: str,
+    deltas: Mapping[int, int]
+) -> None:
+    """Add per-product deltas to a counter, each into a random slot"""
+    if counter not in COUNTERS:
+        raise ValueError(f"Unknown product counter: {counter}")
+    if not deltas:
+        return
+
+    rows = [
+        {
+            "product_id": product_id,
+            "counter": counter,
+            "shard": random.randrange(settings.COUNTER_SHARDS),
+            "value": delta,
+        }
+        for product_id, delta in sorted(deltas.items())
+    ]
+    insert = postgresql_insert if is_postgresql() else sqlite_insert
+    statement = insert(_shards)
+    statement = statement.on_conflict_do_update(
+        index_elements=[_shards.c.product_id, _shards.c.counter, _shards.c.shard],
+        set_={"value": _shards.c.value + statement.excluded.value}
+    )
+    await db.execute(statement, rows)
+
+
+async def increment_shard(
+    db: AsyncSession,
+    product_id: int,
+    counter: str,
+    delta: int = 1
+) -> None:
+    """Add a delta to one product counter"""
+    await increment_shards(db, counter, {product_id: delta})
+
+
+def unfolded_count_columns() -> List[ColumnElement]:
+    """
+    Sum each counter's slots not folded yet, as columns to add to a products query.
+
+    The subqueries correlate with the ``products`` row of the enclosing
+    query and are labelled ``unfolded_<counter>``, in ``COUNTERS`` order.
+    """
+    return [
+        select(func.coalesce(func.sum(_shards.c.value), 0))
+        .where(_shards.c.product_id == _products.c.id, _shards.c.counter == counter)
+        .scalar_subquery()
+        .label(f"unfolded_{counter}")
+        for counter in COUNTERS
+    ]
+
+
+async def _fold_batch(session: AsyncSession, shard_ids: Sequence[int]) -> int:
+    """Move a batch of slots into their product columns and get how many products changed"""
+    # Deleting returns each slot's value as of its row lock, so increments
+    # that land after the delete simply create the slot again
+    result = await session.execute(
+        delete(_shards)
+        .where(_shards.c.id.in_(shard_ids))
+        .returning(_shards.c.product_id, _shards.c.counter, _shards.c.value)
+    )
+    totals: Dict[int, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for product_id, counter, value in result.all():
+        totals[product_id][counter] += value
+
+    # Sorted ids take row locks in the same order in every worker
+    params = [
+        {"product_id": product_id, **{f"d_{counter}": delta for counter, delta in totals[product_id].items()}}
+        for product_id in sorted(totals)
+    ]
+    if params:
+        await session.execute(
+            update(_products)
+            .where(_products.c.id == bindparam("product_id"))
+            .values({
+                column: _products.c[column] + bindparam(f"d_{counter}")
+                for counter, column in COUNTERS.items()
+            }),
+            params
+        )
+    return len(params)
+
+
+async def fold_counter_shards() -> None:
+    """Fold every counter slot into the product columns"""
+    folded = 0
+    last_id = 0
+    while True:
+        async with async_session_maker() as session:
+            shard_ids = list((await session.execute(
+                select(_shards.c.id)
+                .where(_shards.c.id > last_id)
+                .order_by(_shards.c.id)
+                .limit(FOLD_BATCH_SIZE)
+            )).scalars())
+            if not shard_ids:
+                break
+            folded += await _fold_batch(session, shard_ids)
+            await session.commit()
+        last_id = shard_ids[-1]
+
+    if folded:
+        metrics.increment("counter_shards.folded_products", folded)
+        logger.debug(f"Folded counter shards into {folded} products")
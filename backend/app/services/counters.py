@@ -0,0 +1,119 @@
+"""
+Denormalized counters for PurpleShop
+
+Routers change counters with ``counter = counter + delta`` UPDATEs, so
+concurrent requests never overwrite each other's increments. The
+reconciliation job recomputes every counter from its source rows in
+id-range chunks run in parallel; each chunk is its own short transaction
+and only rewrites rows whose stored count drifted. Product counters are
+sharded (see ``app.services.counter_shards``) and folded first.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.logging import logger
+from app.models.favorite import Favorite
+from app.models.product import Product
+from app.models.review import Review
+from app.models.user import User
+from app.services.counter_shards import fold_counter_shards
+
+
+async def increment_counter(
+    db: AsyncSession,
+    counter: InstrumentedAttribute,
+    row_id: int,
+    delta: int = 1
+) -> None:
+    """Atomically add ``delta`` to a counter column of one row"""
+    model = counter.class_
+    await db.execute(
+        update(model)
+        .where(model.id == row_id)
+        .values({counter.key: counter + delta})
+    )
+
+
+@dataclass(frozen=True)
+class CountedColumn:
+    """A denormalized count and the rows it counts"""
+    counter: InstrumentedAttribute  # e.g. User.favorites_count
+    source: InstrumentedAttribute  # Foreign key of the counted rows, e.g. Favorite.user_id
+
+    @property
+    def name(self) -> str:
+        return f"{self.counter.class_.__tablename__}.{self.counter.key}"
+
+
+# Products count every listing a user created, including deleted ones,
+# matching the increment in create_product; reviews count reviews written.
+COUNTED_COLUMNS: Tuple[CountedColumn, ...] = (
+    CountedColumn(Product.favorites_count, Favorite.product_id),
+    CountedColumn(User.products_count, Product.seller_id),
+    CountedColumn(User.favorites_count, Favorite.user_id),
+    CountedColumn(User.reviews_count, Review.reviewer_id),
+)
+
+
+def _id_ranges(low: int, high: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """Split ``[low, high]`` into inclusive chunks"""
+    return [
+        (start, min(start + chunk_size - 1, high))
+        for start in range(low, high + 1, chunk_size)
+    ]
+
+
+async def _reconcile_chunk(column: CountedColumn, low: int, high: int) -> int:
+    """Correct the drifted counts of one id range and get how many rows changed"""
+    model = column.counter.class_
+    actual = (
+        select(func.count())
+        .select_from(column.source.class_)
+        .where(column.source == model.id)
+        .scalar_subquery()
+    )
+    async with async_session_maker() as session:
+        result = await session.execute(
+            update(model)
+            .where(model.id.between(low, high), column.counter != actual)
+            .values({column.counter.key: actual})
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+    return result.rowcount
+
+
+async def reconcile_counts(
+    chunk_size: int = settings.RECONCILE_CHUNK_SIZE,
+    concurrency: int = settings.RECONCILE_CONCURRENCY
+) -> Dict[str, int]:
+    """Recompute every denormalized count and get the rows corrected per column"""
+    await fold_counter_shards()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(column: CountedColumn, low: int, high: int) -> int:
+        async with semaphore:
+            return await _reconcile_chunk(column, low, high)
+
+    corrected: Dict[str, int] = {}
+    for column in COUNTED_COLUMNS:
+        model = column.counter.class_
+        async with async_session_maker() as session:
+            low, high = (await session.execute(select(func.min(model.id), func.max(model.id)))).one()
+        if low is None:
+            corrected[column.name] = 0
+            continue
+
+        chunks = _id_ranges(low, high, chunk_size)
+        changed = await asyncio.gather(*(run(column, start, end) for start, end in chunks))
+        corrected[column.name] = sum(changed)
+        logger.info(f"Reconciled {column.name} in {len(chunks)} chunks: {corrected[column.name]} rows corrected")
+
+    return corrected
@@ -0,0 +1,92 @@
+"""
+Total-count strategies for paginated listings
+
+Counting the full filtered set often costs more than fetching the page, so
+listings pick one of:
+
+- ``exact``: ``COUNT(*)`` over the filtered query, cached per filter set
+- ``cached``: a recent exact count for the same normalized filter set
+- ``estimated``: the PostgreSQL planner row estimate, used when it is above
+  ``COUNT_ESTIMATE_THRESHOLD`` and exact precision no longer matters
+- ``skipped``: the client passed ``include_total=false``
+
+Exact counts and estimates share one cache, so a filter set costs at most
+one ``EXPLAIN`` or ``COUNT(*)`` per ``COUNT_CACHE_TTL``. SQLite has no
+planner estimate and always counts.
+"""
+import json
+from typing import Hashable, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import is_postgresql
+from app.core.logging import logger
+
+COUNT_EXACT = "exact"
+COUNT_CACHED = "cached"
+COUNT_ESTIMATED = "estimated"
+COUNT_SKIPPED = "skipped"
+
+_count_cache = TTLCache(
+    max_size=settings.COUNT_CACHE_SIZE,
+    ttl=settings.COUNT_CACHE_TTL
+)
+
+
+async def estimate_row_count(db: AsyncSession, query: Select) -> Optional[int]:
+    """Get the planner's row estimate for a query (PostgreSQL only)"""
+    connection = await db.connection()
+    if connection.dialect.name != "postgresql":
+        return None
+
+    try:
+        compiled = query.compile(
+            dialect=connection.dialect,
+            compile_kwargs={"literal_binds": True}
+        )
+        result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.warning(f"Row estimate failed, falling back to exact count: {e}")
+        return None
+
+
+async def count_results(
+    db: AsyncSession,
+    query: Select,
+    cache_key: Hashable,
+    include_total: bool = True
+) -> Tuple[Optional[int], str]:
+    """Get the total for a filtered query and the strategy that produced it"""
+    if not include_total:
+        return None, COUNT_SKIPPED
+
+    cached = _count_cache.get(cache_key)
+    if cached is not None:
+        total, strategy = cached
+        return total, COUNT_CACHED if strategy == COUNT_EXACT else strategy
+
+    if is_postgresql():
+        estimate = await estimate_row_count(db, query)
+        if estimate is not None and estimate >= settings.COUNT_ESTIMATE_THRESHOLD:
+            _count_cache.set(cache_key, (estimate, COUNT_ESTIMATED))
+            return estimate, COUNT_ESTIMATED
+
+    count_query = select(func.count()).select_from(query.order_by(None).subquery())
+    total = (await db.execute(count_query)).scalar() or 0
+    _count_cache.set(cache_key, (total, COUNT_EXACT))
+    return total, COUNT_EXACT
+
+
+def page_count(total: Optional[int], size: int) -> Optional[int]:
+    """Get the number of pages for a total, if known"""
+    if total is None:
+        return None
+    return (total + size - 1) // size
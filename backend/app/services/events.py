@@ -0,0 +1,61 @@
+"""
+Product change events for PurpleShop in-memory services
+
+Routers publish an event after every committed product write. In-process
+structures (search index, caches, counters) subscribe to keep themselves in
+sync without polling the database.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.logging import logger
+
+ProductSnapshot = Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class ProductEvent:
+    """A committed change to a product row"""
+    action: str  # "created", "updated" or "deleted"
+    product_id: int
+    current: Optional[ProductSnapshot] = None  # Row after the change
+    previous: Optional[ProductSnapshot] = None  # Row before the change
+
+
+ProductEventHandler = Callable[[ProductEvent], None]
+
+
+class ProductEventBus:
+    """Synchronous fan-out of product events to subscribers"""
+
+    def __init__(self):
+        self._handlers: List[ProductEventHandler] = []
+
+    def subscribe(self, handler: ProductEventHandler) -> ProductEventHandler:
+        """Register a handler, usable as a decorator"""
+        self._handlers.append(handler)
+        return handler
+
+    def publish(self, event: ProductEvent) -> None:
+        """Deliver an event to every handler; one failing handler does not stop the rest"""
+        for handler in self._handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(
+                    f"Product event handler {handler.__qualname__} failed "
+                    f"for product {event.product_id}: {e}",
+                    exc_info=True
+                )
+
+
+def product_snapshot(product) -> ProductSnapshot:
+    """Capture the column values of a product instance"""
+    return {
+        column.name: getattr(product, column.name)
+        for column in product.__table__.columns
+    }
+
+
+# Global event bus
+product_events = ProductEventBus()
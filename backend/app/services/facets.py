@@ -0,0 +1,179 @@
+"""
+Faceted search counts for product listings
+
+All requested facets are computed for the current filter set in one
+statement: ``GROUP BY GROUPING SETS`` on PostgreSQL, a ``UNION ALL`` of
+group-bys elsewhere. Results are cached per normalized filter set.
+"""
+import enum
+from typing import Dict, Hashable, List, Optional, Sequence
+
+from sqlalchemy import String, case, cast, func, literal, literal_column, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.product import Product, ProductCondition, ProductType
+from app.utils.exceptions import ValidationException
+
+FREE_BUCKET = "free"
+
+
+def price_bucket_labels() -> List[str]:
+    """Get the price facet labels in ascending order"""
+    bounds = settings.PRICE_FACET_BUCKETS
+    labels = [FREE_BUCKET]
+    lower = 0
+    for upper in bounds:
+        labels.append(f"{lower}-{upper}")
+        lower = upper
+    labels.append(f"{lower}+")
+    return labels
+
+
+def price_bucket() -> ColumnElement:
+    """
+    SQL expression assigning each product to a price bucket.
+
+    Bounds and labels are rendered inline rather than as bind parameters so
+    the expression in the select list and GROUP BY is textually identical.
+    """
+    labels = [literal_column(f"'{label}'") for label in price_bucket_labels()]
+    whens = [(Product.price.is_(None) | (Product.price == literal_column("0")), labels[0])]
+    for upper, label in zip(settings.PRICE_FACET_BUCKETS, labels[1:]):
+        whens.append((Product.price < literal_column(str(int(upper))), label))
+    return case(*whens, else_=labels[-1])
+
+
+def price_bucket_label(price: Optional[float]) -> str:
+    """Get the price facet label of a price, matching price_bucket()"""
+    labels = price_bucket_labels()
+    if not price:
+        return labels[0]
+    for upper, label in zip(settings.PRICE_FACET_BUCKETS, labels[1:]):
+        if price < int(upper):
+            return label
+    return labels[-1]
+
+
+FACET_COLUMNS = {
+    "category": lambda: Product.category,
+    "subcategory": lambda: Product.subcategory,
+    "condition": lambda: Product.condition,
+    "product_type": lambda: Product.product_type,
+    "location": lambda: Product.location,
+    "price": price_bucket,
+}
+
+_ENUM_FACETS = {
+    "condition": ProductCondition,
+    "product_type": ProductType,
+}
+
+_facet_cache = TTLCache(
+    max_size=settings.FACET_CACHE_SIZE,
+    ttl=settings.FACET_CACHE_TTL
+)
+
+
+def parse_facets(value: Optional[str]) -> List[str]:
+    """Parse a comma-separated facet list, validating names"""
+    if not value:
+        return []
+    facets = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in facets if name not in FACET_COLUMNS]
+    if unknown:
+        raise ValidationException(
+            f"Unknown facets: {', '.join(unknown)}. "
+            f"Available: {', '.join(FACET_COLUMNS)}"
+        )
+    return sorted(set(facets))
+
+
+def facet_value(facet: str, value) -> Optional[str]:
+    """Normalize a grouped value to its public representation"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    enum_type = _ENUM_FACETS.get(facet)
+    if enum_type is not None and isinstance(value, str) and value in enum_type.__members__:
+        return enum_type[value].value
+    return value
+
+
+def format_facet_counts(counts: Dict[str, Dict[Optional[str], int]]) -> Dict[str, List[dict]]:
+    """Order facet value counts for the response: price by bucket, others by count"""
+    response = {}
+    for facet, values in counts.items():
+        if facet == "price":
+            order = {label: i for i, label in enumerate(price_bucket_labels())}
+            items = sorted(values.items(), key=lambda item: order.get(item[0], len(order)))
+        else:
+            items = sorted(values.items(), key=lambda item: (-item[1], str(item[0])))
+        response[facet] = [{"value": value, "count": count} for value, count in items]
+    return response
+
+
+def _grouping_sets_query(where: ColumnElement, facets: Sequence[str]):
+    """One GROUPING SETS aggregate over all facets (PostgreSQL)"""
+    columns = [FACET_COLUMNS[facet]() for facet in facets]
+    return (
+        select(
+            *columns,
+            *[func.grouping(column) for column in columns],
+            func.count()
+        )
+        .where(where)
+        .group_by(func.grouping_sets(*columns))
+    )
+
+
+def _union_query(where: ColumnElement, facets: Sequence[str]):
+    """UNION ALL of one group-by per facet, for databases without GROUPING SETS"""
+    selects = []
+    for facet in facets:
+        column = FACET_COLUMNS[facet]()
+        selects.append(
+            select(
+                literal(facet).label("facet"),
+                cast(column, String).label("value"),
+                func.count().label("count")
+            )
+            .where(where)
+            .group_by(column)
+        )
+    return union_all(*selects)
+
+
+async def compute_facets(
+    db: AsyncSession,
+    where: ColumnElement,
+    facets: Sequence[str],
+    cache_key: Hashable
+) -> Dict[str, List[dict]]:
+    """Get value counts for each requested facet under a filter condition"""
+    key = (cache_key, tuple(facets))
+    cached = _facet_cache.get(key)
+    if cached is not None:
+        return cached
+
+    counts: Dict[str, Dict[Optional[str], int]] = {facet: {} for facet in facets}
+    connection = await db.connection()
+
+    if connection.dialect.name == "postgresql":
+        result = await db.execute(_grouping_sets_query(where, facets))
+        width = len(facets)
+        for row in result.all():
+            values, grouping, count = row[:width], row[width:2 * width], row[-1]
+            # GROUPING(col) is 0 for the column this row was grouped by
+            index = list(grouping).index(0)
+            facet = facets[index]
+            counts[facet][facet_value(facet, values[index])] = count
+    else:
+        result = await db.execute(_union_query(where, facets))
+        for facet, value, count in result.all():
+            counts[facet][facet_value(facet, value)] = count
+
+    response = format_facet_counts(counts)
+    _facet_cache.set(key, response)
+    return response
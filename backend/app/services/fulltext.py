@@ -0,0 +1,124 @@
+"""
+PostgreSQL full-text search for PurpleShop products
+
+Products carry a ``search_vector`` tsvector column maintained by a trigger
+and served by a GIN index. The column is managed here with raw DDL instead of
+being mapped on the model so that SQLite deployments keep working and the
+vector is never loaded with ordinary product rows.
+"""
+from typing import Optional, Tuple
+from sqlalchemy import cast, func, inspect, literal, literal_column, text
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.core.logging import logger
+
+# Text search configurations for the locales shipped by the frontend
+SEARCH_LANGUAGES = {
+    "en": "english",
+    "es": "spanish",
+    "fr": "french",
+    "de": "german",
+    "it": "italian",
+    "pt": "portuguese",
+}
+
+search_vector = literal_column("products.search_vector", type_=TSVECTOR)
+
+
+def _language_case_sql(column: str) -> str:
+    """Build a SQL CASE mapping a language code column to its regconfig"""
+    branches = " ".join(
+        f"WHEN '{code}' THEN '{config}'::regconfig"
+        for code, config in SEARCH_LANGUAGES.items()
+    )
+    return f"CASE {column} {branches} ELSE 'english'::regconfig END"
+
+
+def _document_sql(prefix: str, config: str) -> str:
+    """Build the weighted tsvector expression for a product row"""
+    return (
+        f"setweight(to_tsvector({config}, coalesce({prefix}title, '')), 'A') || "
+        f"setweight(to_tsvector({config}, coalesce({prefix}tags, '')), 'B') || "
+        f"setweight(to_tsvector({config}, coalesce({prefix}brand, '') || ' ' || "
+        f"coalesce({prefix}model, '')), 'B') || "
+        f"setweight(to_tsvector({config}, coalesce({prefix}description, '')), 'C')"
+    )
+
+
+FULLTEXT_DDL = [
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    f"""
+    CREATE OR REPLACE FUNCTION products_search_vector_update() RETURNS trigger AS $$
+    DECLARE
+        config regconfig := {_language_case_sql("NEW.language")};
+    BEGIN
+        NEW.search_vector := {_document_sql("NEW.", "config")};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS products_search_vector_trigger ON products",
+    """
+    CREATE TRIGGER products_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, tags, brand, model, language
+    ON products
+    FOR EACH ROW EXECUTE FUNCTION products_search_vector_update()
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector "
+    "ON products USING gin (search_vector)",
+]
+
+# Touching the language column fires the trigger for rows created before it
+BACKFILL_SQL = (
+    "UPDATE products SET language = language WHERE search_vector IS NULL"
+)
+
+
+async def install_language(conn: AsyncConnection) -> None:
+    """Add the language column to a products table created before it (idempotent)"""
+    columns = await conn.run_sync(
+        lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns("products")}
+    )
+    if "language" not in columns:
+        await conn.execute(text("ALTER TABLE products ADD COLUMN language VARCHAR(5) NOT NULL DEFAULT 'en'"))
+        logger.info("Added the products.language column")
+
+
+async def install_fulltext_search(conn: AsyncConnection) -> None:
+    """Create the search column, trigger and GIN index (idempotent)"""
+    for statement in FULLTEXT_DDL:
+        await conn.execute(text(statement))
+
+    result = await conn.execute(text(BACKFILL_SQL))
+    if result.rowcount:
+        logger.info(f"Backfilled search vectors for {result.rowcount} products")
+
+
+def resolve_search_config(language: Optional[str]) -> str:
+    """Get the text search configuration for a language code"""
+    language = (language or settings.SEARCH_DEFAULT_LANGUAGE).lower()[:2]
+    return SEARCH_LANGUAGES.get(language, SEARCH_LANGUAGES["en"])
+
+
+def fulltext_search(
+    term: str,
+    language: Optional[str] = None
+) -> Tuple[ColumnElement, ColumnElement]:
+    """
+    Build a full-text match condition and its relevance expression.
+
+    The query is parsed with the requested language analyzer and OR-ed with
+    the ``simple`` analyzer so that brand names and words from listings
+    written in another language still match.
+    """
+    config = cast(literal(resolve_search_config(language)), REGCONFIG)
+    tsquery = func.websearch_to_tsquery(config, term).op("||")(
+        func.websearch_to_tsquery(cast(literal("simple"), REGCONFIG), term)
+    )
+
+    condition = search_vector.op("@@")(tsquery)
+    rank = func.ts_rank(search_vector, tsquery)
+    return condition, rank
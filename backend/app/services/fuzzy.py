@@ -0,0 +1,119 @@
+"""
+Typo-tolerant product search using PostgreSQL trigram similarity
+
+Trigram GIN indexes on title, brand and model serve the ``<%`` word
+similarity operator. A materialized vocabulary of the words appearing in
+active listings backs the "did you mean" suggestions.
+"""
+import re
+from typing import List, Tuple
+from sqlalchemy import func, literal, or_, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.database import engine
+from app.core.logging import logger
+from app.models.product import Product
+
+FUZZY_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_products_title_trgm "
+    "ON products USING gin (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_products_brand_trgm "
+    "ON products USING gin (brand gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_products_model_trgm "
+    "ON products USING gin (model gin_trgm_ops)",
+    """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS product_search_terms AS
+    SELECT word, ndoc
+    FROM ts_stat(
+        'SELECT to_tsvector(''simple'', coalesce(title, '''') || '' '' || '
+        'coalesce(brand, '''') || '' '' || coalesce(model, '''')) '
+        'FROM products WHERE status = ''ACTIVE'''
+    )
+    WHERE length(word) > 2
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_product_search_terms_word "
+    "ON product_search_terms (word)",
+    "CREATE INDEX IF NOT EXISTS ix_product_search_terms_word_trgm "
+    "ON product_search_terms USING gin (word gin_trgm_ops)",
+]
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+async def install_fuzzy_search(conn: AsyncConnection) -> None:
+    """Create the trigram extension, indexes and vocabulary view (idempotent)"""
+    for statement in FUZZY_DDL:
+        await conn.execute(text(statement))
+
+
+async def refresh_search_vocabulary() -> None:
+    """Rebuild the suggestion vocabulary from the current listings"""
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("REFRESH MATERIALIZED VIEW CONCURRENTLY product_search_terms")
+        )
+    logger.debug("Search vocabulary refreshed")
+
+
+async def set_similarity_threshold(db: AsyncSession, threshold: float) -> None:
+    """Set the word similarity threshold for the current transaction"""
+    await db.execute(
+        text("SELECT set_config('pg_trgm.word_similarity_threshold', :value, true)"),
+        {"value": str(threshold)}
+    )
+
+
+def fuzzy_search(term: str) -> Tuple[ColumnElement, ColumnElement]:
+    """
+    Build a trigram match condition and its similarity expression.
+
+    ``term <% column`` is true when the term is similar enough to some
+    word sequence in the column, which tolerates typos in long titles.
+    """
+    term = term.lower()
+    columns = (Product.title, Product.brand, Product.model)
+    condition = or_(*[literal(term).op("<%")(column) for column in columns])
+    similarity = func.greatest(*[
+        func.coalesce(func.word_similarity(term, column), 0)
+        for column in columns
+    ])
+    return condition, similarity
+
+
+async def get_search_suggestions(
+    db: AsyncSession,
+    term: str,
+    limit: int = 5
+) -> List[str]:
+    """
+    Get "did you mean" suggestions for a search term.
+
+    A single word returns the closest vocabulary words. Several words return
+    one corrected phrase with each word replaced by its closest match.
+    """
+    words = _WORD_RE.findall(term.lower())
+    if not words:
+        return []
+
+    query = text(
+        "SELECT word FROM product_search_terms "
+        "WHERE word % :word "
+        "ORDER BY similarity(word, :word) DESC, ndoc DESC "
+        "LIMIT :limit"
+    )
+
+    if len(words) == 1:
+        result = await db.execute(query, {"word": words[0], "limit": limit})
+        return [row[0] for row in result.all() if row[0] != words[0]]
+
+    corrected = []
+    for word in words:
+        result = await db.execute(query, {"word": word, "limit": 1})
+        match = result.scalar_one_or_none()
+        corrected.append(match or word)
+
+    if corrected == words:
+        return []
+    return [" ".join(corrected)]
@@ -0,0 +1,169 @@
+"""
+Geospatial product queries for PurpleShop
+
+Radius searches first narrow candidates with a geohash prefix cover, which a
+partial B-tree index on the ``geohash`` of active products serves, then apply
+an exact haversine post-filter. With ``USE_POSTGIS`` enabled, PostgreSQL deployments use a GiST
+geography index with ``ST_DWithin`` instead.
+
+Tables created before the ``geohash`` column get it added at startup, and
+products stored before it are backfilled in id batches, so they match
+radius searches too.
+"""
+import math
+
+from sqlalchemy import and_, bindparam, event, func, inspect, or_, select, text, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.core.database import async_session_maker, engine
+from app.core.logging import logger
+from app.models.product import Product
+from app.utils.geo import (
+    EARTH_RADIUS_KM,
+    geohash_cover,
+    geohash_encode,
+    geohash_prefix_upper_bound,
+    haversine_km
+)
+
+_GEOGRAPHY_SQL = (
+    "(ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography)"
+)
+
+POSTGIS_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS postgis",
+    f"CREATE INDEX IF NOT EXISTS ix_products_geography ON products "
+    f"USING gist ({_GEOGRAPHY_SQL}) "
+    f"WHERE latitude IS NOT NULL AND longitude IS NOT NULL",
+]
+
+
+def use_postgis() -> bool:
+    """Check whether PostGIS queries are enabled for this database"""
+    return settings.USE_POSTGIS and engine.dialect.name == "postgresql"
+
+
+async def install_postgis(conn: AsyncConnection) -> None:
+    """Create the PostGIS extension and geography index (idempotent)"""
+    for statement in POSTGIS_DDL:
+        await conn.execute(text(statement))
+
+
+async def install_geohash(conn: AsyncConnection) -> None:
+    """Add the geohash column to a products table created before it (idempotent)"""
+    columns = await conn.run_sync(
+        lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns("products")}
+    )
+    if "geohash" not in columns:
+        await conn.execute(text("ALTER TABLE products ADD COLUMN geohash VARCHAR(12)"))
+        logger.info("Added the products.geohash column")
+
+
+async def backfill_geohashes(batch_size: int = 1000) -> int:
+    """Fill the geohash of products with coordinates but none, committing per batch"""
+    products = Product.__table__
+    filled = 0
+    last_id = 0
+    while True:
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(products.c.id, products.c.latitude, products.c.longitude)
+                .where(
+                    products.c.id > last_id,
+                    products.c.geohash.is_(None),
+                    products.c.latitude.isnot(None),
+                    products.c.longitude.isnot(None)
+                )
+                .order_by(products.c.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+
+            # Derived data: leave updated_at as it was
+            await session.execute(
+                update(products)
+                .where(products.c.id == bindparam("product_id"))
+                .values(geohash=bindparam("cell"), updated_at=products.c.updated_at),
+                [
+                    {"product_id": row.id, "cell": geohash_encode(row.latitude, row.longitude)}
+                    for row in rows
+                ]
+            )
+            await session.commit()
+
+        filled += len(rows)
+        last_id = rows[-1].id
+    return filled
+
+
+def _sqlite_haversine(lat1, lon1, lat2, lon2):
+    """SQLite user function wrapping haversine_km, NULL-safe"""
+    if None in (lat1, lon1, lat2, lon2):
+        return None
+    return haversine_km(lat1, lon1, lat2, lon2)
+
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _register_sqlite_functions(dbapi_connection, connection_record):
+        """Expose haversine_km() to SQL on every SQLite connection"""
+        dbapi_connection.create_function("haversine_km", 4, _sqlite_haversine)
+
+
+def _point_sql(latitude: float, longitude: float) -> ColumnElement:
+    """Build a geography point for PostGIS comparisons"""
+    return func.ST_SetSRID(
+        func.ST_MakePoint(longitude, latitude), 4326
+    ).op("::")(text("geography"))
+
+
+def distance_km(latitude: float, longitude: float) -> ColumnElement:
+    """SQL expression for the distance in km from a point to each product"""
+    if use_postgis():
+        return func.ST_Distance(
+            text(_GEOGRAPHY_SQL), _point_sql(latitude, longitude)
+        ) / 1000.0
+
+    if engine.dialect.name == "sqlite":
+        return func.haversine_km(Product.latitude, Product.longitude, latitude, longitude)
+
+    d_lat = func.radians(Product.latitude - latitude)
+    d_lon = func.radians(Product.longitude - longitude)
+    a = (
+        func.power(func.sin(d_lat / 2), 2)
+        + math.cos(math.radians(latitude))
+        * func.cos(func.radians(Product.latitude))
+        * func.power(func.sin(d_lon / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * func.asin(func.least(1.0, func.sqrt(a)))
+
+
+def geohash_prefilter(latitude: float, longitude: float, radius_km: float) -> ColumnElement:
+    """Index-friendly condition keeping products in the cells covering a circle"""
+    ranges = []
+    for prefix in geohash_cover(latitude, longitude, radius_km):
+        upper = geohash_prefix_upper_bound(prefix)
+        if upper is None:
+            ranges.append(Product.geohash >= prefix)
+        else:
+            ranges.append(and_(Product.geohash >= prefix, Product.geohash < upper))
+    return or_(*ranges)
+
+
+def radius_filter(latitude: float, longitude: float, radius_km: float) -> ColumnElement:
+    """Condition keeping products within ``radius_km`` of a point"""
+    if use_postgis():
+        return func.ST_DWithin(
+            text(_GEOGRAPHY_SQL),
+            _point_sql(latitude, longitude),
+            radius_km * 1000.0
+        )
+
+    return and_(
+        geohash_prefilter(latitude, longitude, radius_km),
+        distance_km(latitude, longitude) <= radius_km
+    )
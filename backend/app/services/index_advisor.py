@@ -0,0 +1,169 @@
+"""
+Index advisor for PurpleShop listing queries
+
+Replays the query shapes issued by the routers through ``EXPLAIN``, using
+filter values sampled from the data, and reports which plans still read a
+table sequentially. On small development databases a sequential scan is
+often simply cheapest; ``strict`` mode disables it in the planner so the
+report shows whether a usable index exists at all.
+"""
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import Select
+
+from app.core.database import engine
+from app.models.favorite import Favorite
+from app.models.product import Product, ProductStatus
+from app.routers.products import apply_product_filters
+from app.schemas.product import ProductSearchParams
+
+PAGE_LIMIT = 21
+
+
+@dataclass
+class QueryPlanReport:
+    """Plan summary of one replayed query"""
+    name: str
+    sql: str
+    seq_scans: List[str] = field(default_factory=list)
+    indexes: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Whether the plan avoids sequential scans"""
+        return not self.seq_scans
+
+
+async def _most_common(conn: AsyncConnection, column) -> Any:
+    """Get the most frequent value of a product column among active products"""
+    result = await conn.execute(
+        select(column)
+        .where(Product.status_is(ProductStatus.ACTIVE), column.isnot(None))
+        .group_by(column)
+        .order_by(func.count().desc())
+        .limit(1)
+    )
+    return result.scalar()
+
+
+async def _sample_values(conn: AsyncConnection) -> Dict[str, Any]:
+    """Pick realistic filter values from the data"""
+    samples = {
+        "category": await _most_common(conn, Product.category),
+        "subcategory": await _most_common(conn, Product.subcategory),
+        "location": await _most_common(conn, Product.location),
+        "product_type": await _most_common(conn, Product.product_type),
+        "seller_id": await _most_common(conn, Product.seller_id),
+    }
+    result = await conn.execute(
+        select(Favorite.user_id).group_by(Favorite.user_id).order_by(func.count().desc()).limit(1)
+    )
+    samples["favorites_user_id"] = result.scalar()
+    return samples
+
+
+def _newest(query: Select) -> Select:
+    """Order a product query like the listing endpoints and take one page"""
+    return query.order_by(Product.created_at.desc(), Product.id.desc()).limit(PAGE_LIMIT)
+
+
+def advisor_queries(samples: Dict[str, Any]) -> List[Tuple[str, Select]]:
+    """Build the router query shapes to check"""
+    active = select(Product).where(Product.status_is(ProductStatus.ACTIVE))
+    product_type = samples["product_type"]
+    listings = [
+        ("products: newest", {}),
+        ("products: category", {"category": samples["category"]}),
+        ("products: category + location", {
+            "category": samples["category"],
+            "location": samples["location"]
+        }),
+        ("products: subcategory", {"subcategory": samples["subcategory"]}),
+        ("products: location", {"location": samples["location"]}),
+        ("products: product_type", {
+            "product_type": product_type.value if product_type is not None else None
+        }),
+        ("products: price range", {"min_price": 10, "max_price": 100}),
+        ("products: seller", {"seller_id": samples["seller_id"]}),
+    ]
+
+    queries = [
+        (name, _newest(apply_product_filters(active, ProductSearchParams(**params))))
+        for name, params in listings
+    ]
+    queries.append((
+        "users: products",
+        _newest(
+            select(Product).where(
+                Product.seller_id == samples["seller_id"],
+                Product.status_is(ProductStatus.ACTIVE)
+            )
+        )
+    ))
+    queries.append((
+        "users: favorites",
+        select(Product, Favorite.created_at, Favorite.id)
+        .join(Favorite, Product.id == Favorite.product_id)
+        .where(
+            Favorite.user_id == samples["favorites_user_id"],
+            Product.status_is(ProductStatus.ACTIVE)
+        )
+        .order_by(Favorite.created_at.desc(), Favorite.id.desc())
+        .limit(PAGE_LIMIT)
+    ))
+    queries.append((
+        "categories: counts",
+        select(Product.category, func.count(Product.id))
+        .where(Product.status_is(ProductStatus.ACTIVE))
+        .group_by(Product.category)
+    ))
+    return queries
+
+
+def _walk_postgres_plan(node: dict, report: QueryPlanReport) -> None:
+    """Collect scan types from a PostgreSQL JSON plan tree"""
+    if node.get("Node Type") == "Seq Scan":
+        report.seq_scans.append(node.get("Relation Name", "?"))
+    if "Index Name" in node:
+        report.indexes.append(node["Index Name"])
+    for child in node.get("Plans", []):
+        _walk_postgres_plan(child, report)
+
+
+async def _explain(conn: AsyncConnection, name: str, query: Select) -> QueryPlanReport:
+    """Explain one query on the current connection"""
+    sql = str(query.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    report = QueryPlanReport(name=name, sql=sql)
+
+    if conn.dialect.name == "postgresql":
+        plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        _walk_postgres_plan(plan[0]["Plan"], report)
+    else:
+        rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")).all()
+        for row in rows:
+            detail = row[-1]
+            if detail.startswith("SCAN ") and "USING" not in detail:
+                report.seq_scans.append(detail.split()[1])
+            elif "USING" in detail and "INDEX" in detail:
+                report.indexes.append(detail.split("INDEX", 1)[1].split()[0])
+    return report
+
+
+async def advise_indexes(strict: bool = False) -> List[QueryPlanReport]:
+    """Explain every router query shape and report its scans"""
+    async with engine.connect() as conn:
+        if strict and conn.dialect.name == "postgresql":
+            await conn.execute(text("SET LOCAL enable_seqscan = off"))
+        samples = await _sample_values(conn)
+        reports = [
+            await _explain(conn, name, query)
+            for name, query in advisor_queries(samples)
+        ]
+        await conn.rollback()
+    return reports
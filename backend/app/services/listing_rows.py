@@ -0,0 +1,94 @@
+"""
+Read-only product listing rows for PurpleShop
+
+Listings only serialize their products, so they skip the ORM: a Core
+``SELECT`` of the columns the public product schema shows, outer joined
+with the seller's public columns, is read into ``__slots__`` records
+that ``serialize_product`` handles like ``Product`` instances. Nothing
+enters the session identity map and no attribute instrumentation runs.
+Writes and the product page keep loading ORM instances.
+"""
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.models.product import Product, ProductStatus
+from app.models.user import User
+from app.schemas.product import Product as ProductSchema
+
+_products = Product.__table__
+_users = User.__table__
+
+# Product columns in the public schema, then the seller summary's
+PRODUCT_COLUMNS = tuple(name for name in ProductSchema.model_fields if name in _products.c)
+SELLER_COLUMNS = ("id", "display_name", "avatar_url", "location")
+
+_SELLER_START = len(PRODUCT_COLUMNS)
+_SELLER_END = _SELLER_START + len(SELLER_COLUMNS)
+
+
+class SellerRecord:
+    """Public columns of a listed product's seller"""
+
+    __slots__ = SELLER_COLUMNS
+
+
+class ProductRecord:
+    """Listing columns of a product, read without the ORM"""
+
+    __slots__ = PRODUCT_COLUMNS + ("seller",)
+
+
+def listing_select() -> Select:
+    """
+    ``SELECT`` the listing columns of products with their seller's.
+
+    Filter, order and add columns as on ``select(Product)``; extra
+    columns come after the listing ones in each row.
+    """
+    return select(
+        *(_products.c[name] for name in PRODUCT_COLUMNS),
+        *(_users.c[name].label(f"seller_{name}") for name in SELLER_COLUMNS)
+    ).select_from(
+        _products.outerjoin(_users, _users.c.id == _products.c.seller_id)
+    )
+
+
+def product_record(row: Row) -> ProductRecord:
+    """Read the listing columns at the start of a row into a record"""
+    record = ProductRecord.__new__(ProductRecord)
+    for name, value in zip(PRODUCT_COLUMNS, row):
+        setattr(record, name, value)
+
+    seller = None
+    if row[_SELLER_START] is not None:
+        seller = SellerRecord.__new__(SellerRecord)
+        for name, value in zip(SELLER_COLUMNS, row[_SELLER_START:_SELLER_END]):
+            setattr(seller, name, value)
+    record.seller = seller
+    return record
+
+
+def product_records(rows: Iterable[Row]) -> List[ProductRecord]:
+    """Read the listing columns of rows into records"""
+    return [product_record(row) for row in rows]
+
+
+async def load_product_records(
+    db: AsyncSession,
+    ids: Sequence[int],
+    limit: Optional[int] = None
+) -> List[ProductRecord]:
+    """Load active products by primary key, in the order of ``ids``"""
+    if not ids:
+        return []
+    result = await db.execute(
+        listing_select().where(
+            Product.id.in_(ids),
+            Product.status == ProductStatus.ACTIVE
+        )
+    )
+    records = {record.id: record for record in product_records(result)}
+    return [records[pid] for pid in ids if pid in records][:limit]
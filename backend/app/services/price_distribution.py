@@ -0,0 +1,128 @@
+"""
+Price distributions per category for PurpleShop
+
+Each category and location keeps a DDSketch of its active products'
+prices, adjusted from product write events and rebuilt from a
+``GROUP BY`` at startup and every ``PRICE_SKETCH_REFRESH_SECONDS``.
+Category pages merge the sketches of the category's locations into
+percentiles and a histogram over the price facet buckets, at a cost set
+by the number of sketch bins rather than products.
+"""
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.logging import logger
+from app.models.product import Product, ProductStatus
+from app.services.events import ProductEvent, ProductSnapshot, product_events
+from app.services.facets import price_bucket_labels
+from app.utils.ddsketch import DDSketch
+
+Cell = Tuple[str, str]  # (category, location)
+
+
+class PriceCell:
+    """Prices of the active products of one category and location"""
+
+    __slots__ = ("sketch", "unpriced")
+
+    def __init__(self):
+        self.sketch = DDSketch(settings.PRICE_SKETCH_ACCURACY)
+        self.unpriced = 0  # Products without a price, in the free bucket
+
+    def add(self, price: Optional[float], count: int = 1) -> None:
+        """Count a price in, or out with a negative count"""
+        if price is None:
+            self.unpriced += count
+        else:
+            self.sketch.add(max(price, 0.0), count)
+
+
+class PriceDistributions:
+    """Price sketches of every category and location"""
+
+    def __init__(self):
+        self.cells: Dict[Cell, PriceCell] = {}
+        self.locations: Dict[str, set] = defaultdict(set)  # Category -> locations with a cell
+        self._merged: Dict[str, PriceCell] = {}  # Category-wide cells, until the next change
+
+    def add(self, cell: Cell, price: Optional[float], count: int = 1) -> None:
+        """Count a product's price in, or out with a negative count"""
+        price_cell = self.cells.get(cell)
+        if price_cell is None:
+            price_cell = self.cells[cell] = PriceCell()
+            self.locations[cell[0]].add(cell[1])
+        price_cell.add(price, count)
+        self._merged.pop(cell[0], None)
+
+    def category(self, category: str) -> PriceCell:
+        """Get the merged prices of every location of a category"""
+        merged = self._merged.get(category)
+        if merged is None:
+            merged = PriceCell()
+            for location in self.locations.get(category, ()):
+                cell = self.cells[(category, location)]
+                merged.sketch.merge(cell.sketch)
+                merged.unpriced += cell.unpriced
+            self._merged[category] = merged
+        return merged
+
+
+# Global price distributions of this worker
+price_distributions = PriceDistributions()
+
+
+def _price_entry(snapshot: Optional[ProductSnapshot]) -> Optional[Tuple[Cell, Optional[float]]]:
+    """Get the cell and price of an active product snapshot"""
+    if snapshot is None or snapshot.get("status") != ProductStatus.ACTIVE:
+        return None
+    return (snapshot["category"], snapshot["location"]), snapshot.get("price")
+
+
+@product_events.subscribe
+def _on_product_event(event: ProductEvent) -> None:
+    """Keep the price sketches in sync with product writes"""
+    old, new = _price_entry(event.previous), _price_entry(event.current)
+    if old == new:
+        return
+    if old is not None:
+        price_distributions.add(*old, count=-1)
+    if new is not None:
+        price_distributions.add(*new)
+
+
+async def rebuild_price_distributions() -> None:
+    """Rebuild every price sketch from the products table and swap them in"""
+    global price_distributions
+    distributions = PriceDistributions()
+    async with async_session_maker() as session:
+        result = await session.stream(
+            select(Product.category, Product.location, Product.price, func.count(Product.id))
+            .where(Product.status_is(ProductStatus.ACTIVE))
+            .group_by(Product.category, Product.location, Product.price)
+        )
+        async for category, location, price, count in result:
+            distributions.add((category, location), price, count)
+
+    price_distributions = distributions
+    logger.info(f"Price sketches rebuilt for {len(distributions.cells)} categories and locations")
+
+
+def get_price_distribution(category: str) -> Dict[str, Any]:
+    """Get approximate price percentiles and a facet-bucket histogram of a category"""
+    cell = price_distributions.category(category)
+    percentiles = {}
+    for percentile in settings.PRICE_PERCENTILES:
+        value = cell.sketch.quantile(percentile / 100)
+        percentiles[f"p{percentile}"] = round(value, 2) if value is not None else None
+
+    counts = cell.sketch.bucket_counts(settings.PRICE_FACET_BUCKETS)
+    counts[0] += cell.unpriced
+    histogram: List[dict] = [
+        {"value": label, "count": count}
+        for label, count in zip(price_bucket_labels(), counts)
+    ]
+    return {"price_percentiles": percentiles, "price_histogram": histogram}
@@ -0,0 +1,259 @@
+"""
+Product statistics rollup for PurpleShop
+
+``product_stats`` holds one row per status, type, category and location
+with the product count and price aggregates of that cell. Product writes
+move their product between cells in the same transaction, so the stats
+endpoints read a few rollup rows instead of aggregating ``products``.
+Minimum and maximum prices are recomputed from the cell's products only
+when the product holding them leaves. A periodic check recomputes every
+cell from source and corrects drift.
+"""
+import math
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.database import async_session_maker, is_postgresql
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.models.product import Product, ProductStatus, ProductType
+from app.models.product_stats import ProductStats
+from app.services.events import ProductSnapshot
+
+Cell = Tuple[ProductStatus, ProductType, str, str]  # (status, product_type, category, location)
+
+CELL_COLUMNS = ("status", "product_type", "category", "location")
+AGGREGATE_COLUMNS = ("product_count", "priced_count", "price_sum", "min_price", "max_price")
+
+_stats = ProductStats.__table__
+_products = Product.__table__
+
+
+def _cell(snapshot: ProductSnapshot) -> Cell:
+    """Get the cell of a product snapshot"""
+    return tuple(snapshot[column] for column in CELL_COLUMNS)
+
+
+def _cell_filter(table, cell: Cell) -> ColumnElement:
+    """Condition matching the rows of a cell in ``products`` or ``product_stats``"""
+    return and_(*(table.c[column] == value for column, value in zip(CELL_COLUMNS, cell)))
+
+
+def _upsert(values: Dict[str, Any]):
+    """INSERT ... ON CONFLICT on the cell key, for PostgreSQL or SQLite"""
+    insert = postgresql_insert if is_postgresql() else sqlite_insert
+    return insert(_stats).values(values)
+
+
+async def _add(db: AsyncSession, cell: Cell, price: Optional[float]) -> None:
+    """Count a product into a cell"""
+    statement = _upsert({
+        **dict(zip(CELL_COLUMNS, cell)),
+        "product_count": 1,
+        "priced_count": int(price is not None),
+        "price_sum": price or 0.0,
+        "min_price": price,
+        "max_price": price,
+    })
+    new = statement.excluded
+    stored = _stats.c
+    statement = statement.on_conflict_do_update(
+        index_elements=[stored[column] for column in CELL_COLUMNS],
+        set_={
+            "product_count": stored.product_count + new.product_count,
+            "priced_count": stored.priced_count + new.priced_count,
+            "price_sum": stored.price_sum + new.price_sum,
+            "min_price": case(
+                (or_(stored.min_price.is_(None), new.min_price < stored.min_price), new.min_price),
+                else_=stored.min_price
+            ),
+            "max_price": case(
+                (or_(stored.max_price.is_(None), new.max_price > stored.max_price), new.max_price),
+                else_=stored.max_price
+            ),
+        }
+    )
+    await db.execute(statement)
+
+
+async def _remove(db: AsyncSession, cell: Cell, price: Optional[float]) -> None:
+    """Count a product out of a cell; the product must already be flushed out of it"""
+    stored = _stats.c
+    values: Dict[str, Any] = {"product_count": stored.product_count - 1}
+    if price is not None:
+        priced = select(_products.c.price).where(
+            _cell_filter(_products, cell),
+            _products.c.price.isnot(None)
+        ).subquery()
+        values.update({
+            "priced_count": stored.priced_count - 1,
+            "price_sum": stored.price_sum - price,
+            "min_price": case(
+                (stored.min_price >= price, select(func.min(priced.c.price)).scalar_subquery()),
+                else_=stored.min_price
+            ),
+            "max_price": case(
+                (stored.max_price <= price, select(func.max(priced.c.price)).scalar_subquery()),
+                else_=stored.max_price
+            ),
+        })
+    await db.execute(update(_stats).where(_cell_filter(_stats, cell)).values(values))
+
+
+async def sync_product_stats(
+    db: AsyncSession,
+    previous: Optional[ProductSnapshot],
+    current: Optional[ProductSnapshot]
+) -> None:
+    """
+    Move a product between stats cells.
+
+    ``previous`` and ``current`` are the product before and after the
+    write, ``None`` for a product that did not or no longer exists. Call
+    before committing the write.
+    """
+    old = (_cell(previous), previous["price"]) if previous else None
+    new = (_cell(current), current["price"]) if current else None
+    if old == new:
+        return
+
+    # Min/max recomputation reads the products table, so it must see the write
+    await db.flush()
+    # Cells in key order, so concurrent moves lock rows in the same order
+    changes = sorted(
+        [(entry, change) for entry, change in ((old, _remove), (new, _add)) if entry],
+        key=lambda item: item[0][0]
+    )
+    for (cell, price), change in changes:
+        await change(db, cell, price)
+
+
+async def _active_cells(db: AsyncSession, *conditions: ColumnElement) -> List[ProductStats]:
+    """Get the non-empty cells of active products"""
+    result = await db.execute(
+        select(ProductStats).where(
+            ProductStats.status == ProductStatus.ACTIVE,
+            ProductStats.product_count > 0,
+            *conditions
+        )
+    )
+    return list(result.scalars().all())
+
+
+async def get_stats_summary(db: AsyncSession) -> Dict[str, Any]:
+    """Get active product totals by type and category with the average price"""
+    by_type = {product_type.value: 0 for product_type in ProductType}
+    by_category: Dict[str, int] = defaultdict(int)
+    total = priced = 0
+    price_sum = 0.0
+    for cell in await _active_cells(db):
+        total += cell.product_count
+        by_type[cell.product_type.value] += cell.product_count
+        by_category[cell.category] += cell.product_count
+        priced += cell.priced_count
+        price_sum += cell.price_sum
+
+    return {
+        "total_products": total,
+        "products_by_type": by_type,
+        "products_by_category": dict(by_category),
+        "average_price": round(price_sum / priced, 2) if priced else 0.0
+    }
+
+
+async def get_category_stats(db: AsyncSession, category: str) -> Dict[str, Any]:
+    """Get price statistics and location and type breakdowns of a category"""
+    cells = await _active_cells(db, ProductStats.category == category)
+    by_location: Dict[str, int] = defaultdict(int)
+    by_type: Dict[ProductType, int] = defaultdict(int)
+    for cell in cells:
+        by_location[cell.location] += cell.product_count
+        by_type[cell.product_type] += cell.product_count
+
+    priced = sum(cell.priced_count for cell in cells)
+    min_prices = [cell.min_price for cell in cells if cell.min_price is not None]
+    max_prices = [cell.max_price for cell in cells if cell.max_price is not None]
+    return {
+        "statistics": {
+            "total_products": priced,  # Products with a price, as the price figures
+            "average_price": sum(cell.price_sum for cell in cells) / priced if priced else None,
+            "min_price": min(min_prices) if min_prices else None,
+            "max_price": max(max_prices) if max_prices else None,
+        },
+        "locations": [
+            {"name": name, "product_count": count}
+            for name, count in sorted(by_location.items(), key=lambda item: -item[1])
+        ],
+        "product_types": [
+            {"type": product_type, "product_count": count}
+            for product_type, count in sorted(by_type.items(), key=lambda item: -item[1])
+        ]
+    }
+
+
+def _same(stored: Dict[str, Any], actual: Dict[str, Any]) -> bool:
+    """Compare aggregates, allowing for float rounding in price sums"""
+    for column in AGGREGATE_COLUMNS:
+        a, b = stored[column], actual[column]
+        if a == b:
+            continue
+        if a is None or b is None or not math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6):
+            return False
+    return True
+
+
+async def check_product_stats() -> int:
+    """Recompute every cell from the products table, correct the ones that drifted and get how many"""
+    async with async_session_maker() as session:
+        # Locking the rollup first waits out in-flight writes, whose product
+        # changes are then visible to the aggregate below
+        result = await session.execute(select(_stats).with_for_update())
+        stored = {
+            tuple(row[column] for column in CELL_COLUMNS): row
+            for row in result.mappings().all()
+        }
+        initial = not stored
+
+        result = await session.execute(
+            select(
+                *(_products.c[column] for column in CELL_COLUMNS),
+                func.count(_products.c.id).label("product_count"),
+                func.count(_products.c.price).label("priced_count"),
+                func.coalesce(func.sum(_products.c.price), 0.0).label("price_sum"),
+                func.min(_products.c.price).label("min_price"),
+                func.max(_products.c.price).label("max_price")
+            ).group_by(*(_products.c[column] for column in CELL_COLUMNS))
+        )
+        corrected = 0
+        for row in result.mappings().all():
+            cell = tuple(row[column] for column in CELL_COLUMNS)
+            current = stored.pop(cell, None)
+            if current is not None and _same(current, row):
+                continue
+            statement = _upsert(dict(row))
+            await session.execute(statement.on_conflict_do_update(
+                index_elements=[_stats.c[column] for column in CELL_COLUMNS],
+                set_={column: statement.excluded[column] for column in AGGREGATE_COLUMNS}
+            ))
+            corrected += 1
+
+        # Cells no product belongs to anymore
+        if stored:
+            await session.execute(
+                delete(_stats).where(_stats.c.id.in_([row["id"] for row in stored.values()]))
+            )
+            corrected += sum(1 for row in stored.values() if row["product_count"])
+        await session.commit()
+
+    if initial:
+        logger.info(f"Product stats built with {corrected} cells")
+    elif corrected:
+        metrics.increment("product_stats.corrected_cells", corrected)
+        logger.warning(f"Product stats check corrected {corrected} cells")
+    return corrected
@@ -0,0 +1,155 @@
+"""
+"Users who favorited this also favorited" recommendations for PurpleShop
+
+A batch job, ``manage.py recommendations``, streams ``favorites`` in user
+order, builds the sparse item-item co-occurrence matrix of users'
+favorites and keeps the top ``RECOMMENDATIONS_NEIGHBORS`` active neighbors
+of every product in ``product_neighbors``. It reads every favorite and
+holds up to ``RECOMMENDATIONS_MAX_PENDING_PAIRS`` partial sums, so it runs
+once on a schedule rather than in every API worker. A user's
+recommendations merge the neighbor lists of their recent favorites in
+memory.
+"""
+import asyncio
+import json
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_maker, is_postgresql
+from app.core.logging import logger
+from app.models.favorite import Favorite
+from app.models.product import Product, ProductStatus
+from app.models.related import ProductNeighbors
+from app.services.listing_rows import ProductRecord, load_product_records
+from app.utils.cooccurrence import CooccurrenceMatrix, Neighbors
+
+WRITE_BATCH_SIZE = 1000
+
+
+async def _accumulate_favorites(session: AsyncSession, matrix: CooccurrenceMatrix) -> int:
+    """
+    Feed every user's favorites into the matrix, one chunk of users at a time.
+
+    A chunk ends with the last user it reaches completely; that user's rows
+    are read again with the next chunk, unless the chunk holds a single user,
+    whose basket is then cut at the chunk size.
+    """
+    batch_size = settings.RECOMMENDATIONS_BATCH_SIZE
+    last_user = 0
+    favorites = 0
+    while True:
+        result = await session.execute(
+            select(Favorite.user_id, Favorite.product_id)
+            .where(Favorite.user_id > last_user)
+            .order_by(Favorite.user_id, Favorite.product_id)
+            .limit(batch_size)
+        )
+        rows = result.all()
+        if not rows:
+            break
+
+        users = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        items = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+        if len(rows) == batch_size and users[0] != users[-1]:
+            complete = np.searchsorted(users, users[-1])
+            users, items = users[:complete], items[:complete]
+
+        # The pair expansion is pure NumPy; keep it off the event loop
+        await asyncio.to_thread(matrix.add_baskets, users, items)
+        favorites += len(users)
+        last_user = int(users[-1])
+        if len(rows) < batch_size:
+            break
+    return favorites
+
+
+async def _active_product_ids(session: AsyncSession) -> np.ndarray:
+    """Get the ids of every active product"""
+    result = await session.execute(
+        select(Product.id).where(Product.status_is(ProductStatus.ACTIVE))
+    )
+    return np.fromiter(result.scalars(), dtype=np.int64)
+
+
+async def rebuild_recommendations() -> int:
+    """Recompute product_neighbors from all favorites; returns the products stored"""
+    matrix = CooccurrenceMatrix(
+        max_basket=settings.RECOMMENDATIONS_MAX_USER_FAVORITES,
+        max_pending=settings.RECOMMENDATIONS_MAX_PENDING_PAIRS
+    )
+    async with async_session_maker() as session:
+        favorites = await _accumulate_favorites(session, matrix)
+        active = await _active_product_ids(session)
+        neighbors = await asyncio.to_thread(
+            matrix.top_neighbors,
+            settings.RECOMMENDATIONS_NEIGHBORS,
+            settings.RECOMMENDATIONS_MIN_COOCCURRENCE,
+            active
+        )
+
+        # Replace the whole table in one transaction; readers keep the old
+        # rows until it commits. Rows are upserted so a run overlapping this
+        # one overwrites them instead of failing on the primary key.
+        await session.execute(delete(ProductNeighbors))
+        insert = postgresql_insert if is_postgresql() else sqlite_insert
+        statement = insert(ProductNeighbors)
+        statement = statement.on_conflict_do_update(
+            index_elements=[ProductNeighbors.id],
+            set_={"neighbors": statement.excluded.neighbors, "updated_at": func.now()}
+        )
+        rows = [
+            {
+                "id": product_id,
+                "neighbors": json.dumps([[neighbor, round(score, 4)] for neighbor, score in similar])
+            }
+            for product_id, similar in neighbors.items()
+        ]
+        for start in range(0, len(rows), WRITE_BATCH_SIZE):
+            await session.execute(statement, rows[start:start + WRITE_BATCH_SIZE])
+        await session.commit()
+
+    logger.info(f"Recommendations rebuilt from {favorites} favorites for {len(rows)} products")
+    return len(rows)
+
+
+async def get_recommendations(db: AsyncSession, user_id: int, limit: int) -> List[ProductRecord]:
+    """
+    Recommend active products from the neighbors of a user's favorites.
+
+    Candidates score the sum of their similarity to each recent favorite;
+    products the user already favorited are left out.
+    """
+    result = await db.execute(
+        select(Favorite.product_id)
+        .where(Favorite.user_id == user_id)
+        .order_by(Favorite.created_at.desc(), Favorite.id.desc())
+        .limit(settings.RECOMMENDATIONS_MAX_USER_FAVORITES)
+    )
+    favorite_ids = result.scalars().all()
+    if not favorite_ids:
+        return []
+
+    result = await db.execute(
+        select(ProductNeighbors.neighbors).where(ProductNeighbors.id.in_(favorite_ids))
+    )
+    favorited = set(favorite_ids)
+    scores: Dict[int, float] = defaultdict(float)
+    for neighbors in result.scalars():
+        similar: Neighbors = json.loads(neighbors) if neighbors else []
+        for product_id, score in similar:
+            if product_id not in favorited:
+                scores[product_id] += score
+    if not scores:
+        return []
+
+    # Over-fetch so products sold since the last rebuild can be skipped
+    ranked = sorted(scores, key=lambda product_id: (-scores[product_id], product_id))
+    ranked = ranked[:limit * 2]
+    return await load_product_records(db, ranked, limit)
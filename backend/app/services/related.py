@@ -0,0 +1,183 @@
+"""
+Related products for PurpleShop
+
+Each active product's most similar listings in its category are
+precomputed with TF-IDF over title, brand, model, tags and description and
+stored with their summaries in ``product_related``, keyed by the product
+id, so ``get_product`` reads them by joining its own query. Writes mark
+their categories for the next refresh, so summaries of edited, sold or
+deleted products lag by up to ``RELATED_REFRESH_SECONDS``.
+
+Categories touched by product writes are recomputed by a short periodic
+task; a full rebuild runs daily, from ``manage.py related`` and at startup
+when nothing is stored yet. Every worker runs these tasks, so rows are
+upserted and workers refreshing the same category overwrite each other
+with the same result instead of conflicting.
+"""
+import asyncio
+import json
+from collections import Counter
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_maker, is_postgresql
+from app.core.logging import logger
+from app.models.product import Product, ProductStatus
+from app.models.related import ProductRelated
+from app.services.events import ProductEvent, product_events
+from app.utils.inverted_index import document_terms
+from app.utils.similarity import Neighbours, tfidf_matrix, top_k_similar
+
+_DOCUMENT_COLUMNS = [
+    Product.id,
+    Product.title,
+    Product.brand,
+    Product.model,
+    Product.tags,
+    Product.description,
+]
+
+# Compact product fields returned as ProductDetail.related_products
+SUMMARY_COLUMNS = [
+    Product.id,
+    Product.title,
+    Product.price,
+    Product.main_image_url,
+    Product.location,
+    Product.product_type,
+    Product.condition,
+]
+
+_DOCUMENT_KEYS = {column.key for column in _DOCUMENT_COLUMNS}
+_LOAD_COLUMNS = _DOCUMENT_COLUMNS + [
+    column for column in SUMMARY_COLUMNS if column.key not in _DOCUMENT_KEYS
+]
+
+# Categories written to since their related products were computed
+_dirty_categories: Set[str] = set()
+
+
+@product_events.subscribe
+def _on_product_event(event: ProductEvent) -> None:
+    """Mark the categories a product write touches for recomputation"""
+    for snapshot in (event.previous, event.current):
+        if snapshot is not None and snapshot.get("category"):
+            _dirty_categories.add(snapshot["category"])
+
+
+async def install_related_summaries(conn: AsyncConnection) -> None:
+    """Add the summaries column to a product_related table created before it (idempotent)"""
+    columns = await conn.run_sync(
+        lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns("product_related")}
+    )
+    if "summaries" not in columns:
+        await conn.execute(text("ALTER TABLE product_related ADD COLUMN summaries TEXT"))
+        logger.info("Added the product_related.summaries column")
+
+
+async def _load_category(
+    session: AsyncSession,
+    category: str
+) -> Tuple[List[dict], List[Counter]]:
+    """Get the summaries and weighted terms of a category's newest active products"""
+    result = await session.execute(
+        select(*_LOAD_COLUMNS)
+        .where(
+            Product.status_is(ProductStatus.ACTIVE),
+            Product.category == category
+        )
+        .order_by(Product.id.desc())
+        .limit(settings.RELATED_MAX_CATEGORY_SIZE)
+    )
+    summaries, documents = [], []
+    for row in result.all():
+        summaries.append({column.key: row._mapping[column.key] for column in SUMMARY_COLUMNS})
+        documents.append(document_terms(row._mapping))
+    return summaries, documents
+
+
+def _neighbours(documents: List[Counter]) -> List[Neighbours]:
+    """Rank every document's most similar documents"""
+    matrix = tfidf_matrix(documents, settings.RELATED_MAX_FEATURES)
+    return top_k_similar(
+        matrix,
+        settings.RELATED_PRODUCTS_COUNT,
+        settings.RELATED_MIN_SIMILARITY
+    )
+
+
+async def refresh_category(session: AsyncSession, category: str) -> int:
+    """Recompute and store the related products of one category"""
+    summaries, documents = await _load_category(session, category)
+    # The matrix products release the GIL, so keep them off the event loop
+    neighbours = await asyncio.to_thread(_neighbours, documents)
+
+    if summaries:
+        insert = postgresql_insert if is_postgresql() else sqlite_insert
+        statement = insert(ProductRelated)
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[ProductRelated.id],
+                set_={"summaries": statement.excluded.summaries, "updated_at": func.now()}
+            ),
+            [
+                {
+                    "id": summary["id"],
+                    "summaries": json.dumps([summaries[row] for row, _ in similar])
+                }
+                for summary, similar in zip(summaries, neighbours)
+            ]
+        )
+    await session.commit()
+    return len(summaries)
+
+
+async def refresh_related_products() -> None:
+    """Recompute the categories written to since the last refresh"""
+    pending = list(_dirty_categories)
+    _dirty_categories.clear()
+
+    try:
+        async with async_session_maker() as session:
+            while pending:
+                await refresh_category(session, pending[-1])
+                pending.pop()
+    finally:
+        _dirty_categories.update(pending)  # Retry what failed on the next run
+
+
+async def rebuild_related_products() -> int:
+    """Recompute the related products of every category"""
+    products = 0
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(Product.category)
+            .where(Product.status_is(ProductStatus.ACTIVE))
+            .distinct()
+        )
+        categories = result.scalars().all()
+        for category in categories:
+            products += await refresh_category(session, category)
+
+    logger.info(f"Related products rebuilt for {products} products in {len(categories)} categories")
+    return products
+
+
+async def start_related_products() -> None:
+    """Build the related products at startup when none are stored yet"""
+    async with async_session_maker() as session:
+        stored = await session.scalar(
+            select(ProductRelated.id).where(ProductRelated.summaries.isnot(None)).limit(1)
+        )
+    if stored is None:
+        await rebuild_related_products()
+
+
+def related_products(summaries: Optional[str]) -> List[dict]:
+    """Decode the stored related product summaries of a product"""
+    return json.loads(summaries) if summaries else []
@@ -0,0 +1,319 @@
+"""
+Listing result cache for PurpleShop
+
+Caches the id page, total and extras of a ``list_products`` response under
+a canonical key of its filters, sort, page and facets, so repeated landing
+page queries skip the database until a write could change them.
+
+Each entry is tagged with the category, location and product type it
+filters on, ``*`` standing for "any". A product write evicts the tags of
+the product's old and new values in every wildcard combination, which are
+exactly the listings the product could enter or leave.
+
+The ``memory`` backend is a per-worker LRU: writes only reach the worker
+that made them through the in-process event bus, so with several workers
+the others keep serving a listing for up to ``RESULT_CACHE_TTL`` after it
+changed. The ``redis`` backend shares entries and invalidations between
+workers.
+
+Every tag also has a generation, bumped by each invalidation. A request
+that misses reads its tag's generation before querying, and its page is
+only stored if no write invalidated the tag in between, so a query that
+raced a write cannot cache the pre-write result.
+"""
+import asyncio
+import enum
+import hashlib
+import itertools
+import json
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from app.core.cache import TaggedTTLCache
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.schemas.base import CursorParams, PaginationParams
+from app.schemas.product import ProductSearchParams
+from app.services.events import ProductEvent, ProductSnapshot, product_events
+
+ANY = "*"
+INVALIDATION_FIELDS = ("category", "location", "product_type")
+
+CacheTag = Tuple[str, str, str]
+
+
+@dataclass
+class CachedPage:
+    """One cached listing page"""
+    ids: List[int]
+    total: Optional[int]
+    total_strategy: str
+    next_cursor: Optional[str] = None
+    distances: Optional[List[Optional[float]]] = None  # Per id, for geo searches
+    suggestions: Optional[List[str]] = None
+    facets: Optional[Dict[str, List[dict]]] = None
+
+
+def _tag_value(value: Any) -> str:
+    """Normalize a filter or column value for tagging"""
+    if value is None:
+        return ANY
+    if isinstance(value, enum.Enum):
+        value = value.value
+    return str(value).lower()
+
+
+def listing_cache_key(
+    search_params: ProductSearchParams,
+    pagination: PaginationParams,
+    cursor_params: CursorParams,
+    facets: Sequence[str]
+) -> str:
+    """Get the canonical key of a listing request"""
+    return json.dumps([
+        search_params.cache_key(),
+        search_params.sort,
+        pagination.page if not cursor_params.cursor else None,
+        pagination.size,
+        pagination.include_total,
+        cursor_params.cursor,
+        sorted(facets),
+    ])
+
+
+def listing_cache_tag(search_params: ProductSearchParams) -> CacheTag:
+    """Get the invalidation tag of a listing's filters"""
+    return tuple(_tag_value(getattr(search_params, field)) for field in INVALIDATION_FIELDS)
+
+
+def product_cache_tags(snapshot: ProductSnapshot) -> Set[CacheTag]:
+    """Get every listing tag a product row falls under"""
+    values = [(_tag_value(snapshot.get(field)), ANY) for field in INVALIDATION_FIELDS]
+    return set(itertools.product(*values))
+
+
+class MemoryResultStore:
+    """Per-worker LRU of cached pages"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self._cache = TaggedTTLCache(max_size=max_size, ttl=ttl)
+        self._generations: Dict[CacheTag, int] = {}
+        metrics.gauge("result_cache.size", lambda: len(self._cache))
+
+    async def get(self, key: str) -> Optional[CachedPage]:
+        """Get a live page"""
+        return self._cache.get(key)
+
+    async def generation(self, tag: CacheTag) -> int:
+        """Get the number of invalidations of a tag so far"""
+        return self._generations.get(tag, 0)
+
+    async def set(self, key: str, page: CachedPage, tag: CacheTag, generation: int) -> bool:
+        """Store a page unless its tag was invalidated since ``generation``"""
+        if self._generations.get(tag, 0) != generation:
+            return False
+        self._cache.set(key, page, tags=[tag])
+        return True
+
+    def invalidate(self, tags: Set[CacheTag]) -> None:
+        """Drop the pages stored under any of the tags"""
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+        metrics.increment("result_cache.invalidations", self._cache.invalidate(tags))
+
+
+class RedisResultStore:
+    """
+    Cached pages shared through Redis.
+
+    Pages are JSON strings expiring after ``REDIS_CACHE_TTL``; each tag is a
+    set of the keys stored under it plus a generation counter. Size is
+    bounded by the TTL and the server's ``maxmemory`` LRU policy.
+    Invalidations run in the background so writes do not wait on Redis.
+    """
+
+    PREFIX = "purpleshop:listing"
+
+    def __init__(self, url: str, ttl: int):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self.ttl = ttl
+        self._pending: Set[asyncio.Task] = set()  # Invalidations in flight
+
+    def _key(self, key: str) -> str:
+        """Get the Redis key of a page"""
+        return f"{self.PREFIX}:{hashlib.sha1(key.encode()).hexdigest()}"
+
+    def _tag_key(self, tag: CacheTag) -> str:
+        """Get the Redis key of a tag's key set"""
+        return f"{self.PREFIX}:tag:{json.dumps(tag)}"
+
+    def _generation_key(self, tag: CacheTag) -> str:
+        """Get the Redis key of a tag's generation counter"""
+        return f"{self.PREFIX}:generation:{json.dumps(tag)}"
+
+    async def get(self, key: str) -> Optional[CachedPage]:
+        """Get a live page"""
+        data = await self._redis.get(self._key(key))
+        return CachedPage(**json.loads(data)) if data is not None else None
+
+    async def generation(self, tag: CacheTag) -> int:
+        """Get the number of invalidations of a tag so far"""
+        return int(await self._redis.get(self._generation_key(tag)) or 0)
+
+    async def set(self, key: str, page: CachedPage, tag: CacheTag, generation: int) -> bool:
+        """Store a page and add it to its tag's key set, unless the tag was invalidated since ``generation``"""
+        from redis.exceptions import WatchError
+
+        redis_key = self._key(key)
+        tag_key = self._tag_key(tag)
+        generation_key = self._generation_key(tag)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            await pipe.watch(generation_key)
+            if int(await pipe.get(generation_key) or 0) != generation:
+                return False
+            pipe.multi()
+            pipe.set(redis_key, json.dumps(asdict(page)), ex=self.ttl)
+            pipe.sadd(tag_key, redis_key)
+            pipe.expire(tag_key, self.ttl)
+            try:
+                await pipe.execute()
+            except WatchError:  # Invalidated while storing
+                return False
+        return True
+
+    def invalidate(self, tags: Set[CacheTag]) -> None:
+        """Schedule dropping the pages stored under any of the tags"""
+        task = asyncio.get_running_loop().create_task(self._invalidate(tags))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _invalidate(self, tags: Set[CacheTag]) -> None:
+        """Drop the pages and key sets of the tags"""
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.incr(self._generation_key(tag))
+                for tag_key in tag_keys:
+                    pipe.smembers(tag_key)
+                members = (await pipe.execute())[len(tags):]
+            keys = set().union(*members)
+            await self._redis.delete(*keys, *tag_keys)
+        except Exception as e:
+            metrics.increment("result_cache.errors")
+            logger.warning(f"Result cache invalidation failed: {e}")
+            return
+        metrics.increment("result_cache.invalidations", len(keys))
+
+    async def close(self) -> None:
+        """Finish pending invalidations and close the connection pool"""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        await self._redis.close()
+
+
+class ListingResultCache:
+    """Result cache front end counting hits and misses; backend errors count as misses"""
+
+    def __init__(self, store):
+        self.store = store
+
+    async def get(self, key: str) -> Optional[CachedPage]:
+        """Get a cached page"""
+        try:
+            page = await self.store.get(key)
+        except Exception as e:
+            metrics.increment("result_cache.errors")
+            logger.warning(f"Result cache read failed: {e}")
+            return None
+        metrics.increment("result_cache.hits" if page is not None else "result_cache.misses")
+        return page
+
+    async def generation(self, tag: CacheTag) -> Optional[int]:
+        """Get a tag's generation, or None when the backend fails"""
+        try:
+            return await self.store.generation(tag)
+        except Exception as e:
+            metrics.increment("result_cache.errors")
+            logger.warning(f"Result cache read failed: {e}")
+            return None
+
+    async def set(self, key: str, page: CachedPage, tag: CacheTag, generation: Optional[int]) -> None:
+        """Store a page under its listing tag if no write invalidated the tag since ``generation``"""
+        if generation is None:
+            return
+        try:
+            stored = await self.store.set(key, page, tag, generation)
+        except Exception as e:
+            metrics.increment("result_cache.errors")
+            logger.warning(f"Result cache write failed: {e}")
+            return
+        if not stored:
+            metrics.increment("result_cache.stale_fills")
+
+    def invalidate(self, tags: Set[CacheTag]) -> None:
+        """Evict every page stored under the tags"""
+        self.store.invalidate(tags)
+
+
+# Global result cache, created at startup when RESULT_CACHE_ENABLED is set
+result_cache: Optional[ListingResultCache] = None
+
+
+@product_events.subscribe
+def _on_product_event(event: ProductEvent) -> None:
+    """Evict the listings a product write could change"""
+    if result_cache is None:
+        return
+    tags: Set[CacheTag] = set()
+    for snapshot in (event.previous, event.current):
+        if snapshot is not None:
+            tags |= product_cache_tags(snapshot)
+    result_cache.invalidate(tags)
+
+
+async def get_cached_listing(key: str) -> Optional[CachedPage]:
+    """Get a cached listing page, if the cache is enabled"""
+    if result_cache is None:
+        return None
+    return await result_cache.get(key)
+
+
+async def listing_cache_generation(search_params: ProductSearchParams) -> Optional[int]:
+    """Get the generation of a listing's tag, read before querying the page it will cache"""
+    if result_cache is None:
+        return None
+    return await result_cache.generation(listing_cache_tag(search_params))
+
+
+async def cache_listing(
+    key: str,
+    search_params: ProductSearchParams,
+    generation: Optional[int],
+    page: CachedPage
+) -> None:
+    """Store a listing page under its filters' tag, unless a write invalidated it since ``generation``"""
+    if result_cache is not None:
+        await result_cache.set(key, page, listing_cache_tag(search_params), generation)
+
+
+def start_result_cache() -> None:
+    """Create the result cache for the configured backend"""
+    global result_cache
+    if settings.RESULT_CACHE_BACKEND == "redis":
+        store = RedisResultStore(settings.REDIS_URL, settings.REDIS_CACHE_TTL)
+    else:
+        store = MemoryResultStore(settings.RESULT_CACHE_SIZE, settings.RESULT_CACHE_TTL)
+    result_cache = ListingResultCache(store)
+    logger.info(f"Listing result cache started ({settings.RESULT_CACHE_BACKEND})")
+
+
+async def stop_result_cache() -> None:
+    """Release the result cache, finishing pending Redis invalidations"""
+    global result_cache
+    if result_cache is not None and isinstance(result_cache.store, RedisResultStore):
+        await result_cache.store.close()
+    result_cache = None
@@ -0,0 +1,334 @@
+"""
+Pluggable product search backends for PurpleShop
+
+``postgres`` uses the full-text column on PostgreSQL, ``memory`` keeps an
+in-process BM25 inverted index for SQLite and single-node deployments, and
+``database`` falls back to ``ilike`` matching. The in-memory index can be
+sharded across worker processes on multi-core hosts: documents are routed to
+a shard by id and every query fans out to all shards. Shards are spawned
+per app worker, so ``SEARCH_INDEX_SHARDS`` multiplies with the worker count.
+
+A shard that died or misses the ``SEARCH_INDEX_TIMEOUT_SECONDS`` deadline
+makes the query raise ``SearchIndexUnavailable``; listings then fall back to
+``ilike`` matching. So do queries matching more than
+``SEARCH_INDEX_MAX_CANDIDATES`` products: listing filters and totals are
+applied in SQL over the candidates, so a cut candidate list would drop
+matches and undercount.
+"""
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.database import async_session_maker, engine
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.models.product import Product, ProductStatus
+from app.services.events import ProductEvent, ProductSnapshot, product_events
+from app.utils.inverted_index import (
+    FIELD_WEIGHTS,
+    InvertedIndex,
+    SearchHit,
+    merge_hits,
+    shard_worker
+)
+
+_TEXT_COLUMNS = [getattr(Product, field) for field in FIELD_WEIGHTS]
+
+
+class SearchIndexUnavailable(Exception):
+    """The in-memory index cannot answer, because a shard is dead or too slow"""
+
+
+def get_search_backend() -> str:
+    """Resolve the configured search backend for the current database"""
+    backend = settings.SEARCH_BACKEND
+    is_postgres = engine.dialect.name == "postgresql"
+    if backend == "auto":
+        return "postgres" if is_postgres else "memory"
+    if backend == "postgres" and not is_postgres:
+        return "database"
+    return backend
+
+
+def document_fields(snapshot: ProductSnapshot) -> Dict[str, Optional[str]]:
+    """Extract the indexed text fields from a product snapshot"""
+    return {field: snapshot.get(field) for field in FIELD_WEIGHTS}
+
+
+class LocalSearchIndex:
+    """Single in-process inverted index"""
+
+    def __init__(self):
+        self.index = InvertedIndex()
+
+    def start(self) -> None:
+        """Nothing to start for an in-process index"""
+
+    def stop(self) -> None:
+        """Nothing to stop for an in-process index"""
+
+    def add(self, doc_id: int, fields: Dict[str, Optional[str]]) -> None:
+        """Index or re-index a product"""
+        self.index.add(doc_id, fields)
+
+    def add_many(self, documents: List[tuple]) -> None:
+        """Index a batch of products"""
+        self.index.add_many(documents)
+
+    def remove(self, doc_id: int) -> None:
+        """Remove a product from the index"""
+        self.index.remove(doc_id)
+
+    def clear(self) -> None:
+        """Drop every indexed product"""
+        self.index = InvertedIndex()
+
+    async def search(self, query: str, limit: int) -> List[SearchHit]:
+        """Get the top BM25 hits for a query"""
+        return self.index.search(query, limit)
+
+
+class ShardedSearchIndex:
+    """
+    Inverted index partitioned across worker processes.
+
+    Each shard owns the documents with ``doc_id % shards == n``. Commands are
+    sent through per-shard queues; search replies come back on one shared
+    queue and are resolved to asyncio futures by a dispatcher thread, so the
+    event loop never blocks on a worker.
+    """
+
+    def __init__(self, shards: int):
+        self.shards = shards
+        self._context = multiprocessing.get_context("spawn")
+        self._inboxes = []
+        self._processes = []
+        self._outbox = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._pending: Dict[int, tuple] = {}
+        self._request_ids = itertools.count()
+        self._dead: set = set()  # Shards already reported dead
+
+    def start(self) -> None:
+        """Spawn the shard processes and the reply dispatcher"""
+        self._outbox = self._context.Queue()
+        for shard in range(self.shards):
+            inbox = self._context.Queue()
+            process = self._context.Process(
+                target=shard_worker,
+                args=(inbox, self._outbox),
+                name=f"search-shard-{shard}",
+                daemon=True
+            )
+            process.start()
+            self._inboxes.append(inbox)
+            self._processes.append(process)
+
+        self._dispatcher = threading.Thread(
+            target=self._dispatch_replies,
+            name="search-shard-dispatcher",
+            daemon=True
+        )
+        self._dispatcher.start()
+
+    def stop(self) -> None:
+        """Stop the shard processes and the reply dispatcher"""
+        for inbox in self._inboxes:
+            inbox.put(("stop",))
+        for process in self._processes:
+            process.join(timeout=5)
+        if self._outbox is not None:
+            self._outbox.put(None)
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout=5)
+        self._inboxes, self._processes = [], []
+
+    def _dispatch_replies(self) -> None:
+        """Resolve pending search futures as shard replies arrive"""
+        while True:
+            reply = self._outbox.get()
+            if reply is None:
+                break
+            request_id, hits = reply
+            pending = self._pending.pop(request_id, None)
+            if pending is None:
+                continue
+            loop, future = pending
+            loop.call_soon_threadsafe(_resolve_future, future, hits)
+
+    def _inbox_for(self, doc_id: int):
+        """Get the command queue of the shard owning a product"""
+        return self._inboxes[doc_id % self.shards]
+
+    def add(self, doc_id: int, fields: Dict[str, Optional[str]]) -> None:
+        """Index or re-index a product on its shard"""
+        self._inbox_for(doc_id).put(("add", doc_id, fields))
+
+    def add_many(self, documents: List[tuple]) -> None:
+        """Index a batch of products, one message per shard"""
+        batches: Dict[int, list] = {}
+        for doc_id, fields in documents:
+            batches.setdefault(doc_id % self.shards, []).append((doc_id, fields))
+        for shard, batch in batches.items():
+            self._inboxes[shard].put(("add_many", batch))
+
+    def remove(self, doc_id: int) -> None:
+        """Remove a product from its shard"""
+        self._inbox_for(doc_id).put(("remove", doc_id))
+
+    def clear(self) -> None:
+        """Drop every indexed product on all shards"""
+        for inbox in self._inboxes:
+            inbox.put(("clear",))
+
+    def _check_shards(self) -> None:
+        """Raise SearchIndexUnavailable when a shard process has exited"""
+        dead = [shard for shard, process in enumerate(self._processes) if not process.is_alive()]
+        if not dead:
+            return
+        for shard in set(dead) - self._dead:
+            metrics.increment("search_index.dead_shards")
+            logger.error(
+                f"Search shard {shard} exited with code {self._processes[shard].exitcode}; "
+                f"searches fall back to SQL until restart"
+            )
+        self._dead.update(dead)
+        raise SearchIndexUnavailable(f"Search shards {dead} are not running")
+
+    async def search(self, query: str, limit: int) -> List[SearchHit]:
+        """Query every shard concurrently and merge the top hits"""
+        self._check_shards()
+        loop = asyncio.get_running_loop()
+        requests = []
+        for inbox in self._inboxes:
+            request_id = next(self._request_ids)
+            future = loop.create_future()
+            self._pending[request_id] = (loop, future)
+            inbox.put(("search", request_id, query, limit))
+            requests.append((request_id, future))
+
+        futures = [future for _, future in requests]
+        try:
+            _, late = await asyncio.wait(futures, timeout=settings.SEARCH_INDEX_TIMEOUT_SECONDS)
+        finally:
+            for request_id, _ in requests:
+                self._pending.pop(request_id, None)
+        if late:
+            slow = [shard for shard, future in enumerate(futures) if future in late]
+            for future in late:
+                future.cancel()
+            metrics.increment("search_index.timeouts")
+            logger.warning(
+                f"Search shards {slow} did not answer within "
+                f"{settings.SEARCH_INDEX_TIMEOUT_SECONDS}s; falling back to SQL"
+            )
+            self._check_shards()
+            raise SearchIndexUnavailable(f"Search shards {slow} timed out")
+        return merge_hits([future.result() for future in futures], limit)
+
+
+def _resolve_future(future: asyncio.Future, hits: List[SearchHit]) -> None:
+    """Set a search result unless the waiting request was cancelled"""
+    if not future.done():
+        future.set_result(hits)
+
+
+def _create_search_index():
+    """Create a local or sharded index based on the configured shard count"""
+    shards = settings.SEARCH_INDEX_SHARDS or os.cpu_count() or 1
+    if shards <= 1:
+        return LocalSearchIndex()
+    return ShardedSearchIndex(shards)
+
+
+# Global in-memory index, created when the memory backend is active
+product_search_index = None
+
+
+@product_events.subscribe
+def _on_product_event(event: ProductEvent) -> None:
+    """Keep the in-memory index in sync with product writes"""
+    if product_search_index is None:
+        return
+    current = event.current
+    if current is not None and current.get("status") == ProductStatus.ACTIVE:
+        product_search_index.add(event.product_id, document_fields(current))
+    else:
+        product_search_index.remove(event.product_id)
+
+
+async def rebuild_search_index() -> None:
+    """Load every active product into the in-memory index"""
+    batch_size = settings.SEARCH_INDEX_REBUILD_BATCH
+    product_search_index.clear()
+
+    async with async_session_maker() as session:
+        total = (await session.execute(
+            select(func.count(Product.id)).where(Product.status == ProductStatus.ACTIVE)
+        )).scalar() or 0
+        logger.info(f"Rebuilding search index for {total} products")
+
+        indexed = 0
+        last_id = 0
+        while True:
+            result = await session.execute(
+                select(Product.id, *_TEXT_COLUMNS)
+                .where(
+                    Product.status == ProductStatus.ACTIVE,
+                    Product.id > last_id
+                )
+                .order_by(Product.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+
+            product_search_index.add_many([
+                (row[0], dict(zip(FIELD_WEIGHTS, row[1:]))) for row in rows
+            ])
+            indexed += len(rows)
+            last_id = rows[-1][0]
+            logger.info(f"Search index: {indexed}/{total} products indexed")
+
+    logger.info("Search index rebuild complete")
+
+
+async def start_search_index() -> None:
+    """Start the in-memory index and fill it from the products table"""
+    global product_search_index
+    product_search_index = _create_search_index()
+    product_search_index.start()
+    await rebuild_search_index()
+
+
+def stop_search_index() -> None:
+    """Stop the in-memory index and its worker processes"""
+    global product_search_index
+    if product_search_index is not None:
+        product_search_index.stop()
+        product_search_index = None
+
+
+async def search_product_ids(query: str) -> Optional[Dict[int, float]]:
+    """
+    Get the BM25 scores of every product matching a query.
+
+    Returns None when the index is unavailable or more than
+    ``SEARCH_INDEX_MAX_CANDIDATES`` products match.
+    """
+    limit = settings.SEARCH_INDEX_MAX_CANDIDATES
+    try:
+        hits = await product_search_index.search(query, limit + 1)
+    except SearchIndexUnavailable:
+        return None
+    if len(hits) > limit:
+        metrics.increment("search_index.overflows")
+        return None
+    return {doc_id: score for score, doc_id in hits}
@@ -0,0 +1,208 @@
+"""
+Search-as-you-type suggestions for PurpleShop
+
+Completions come from an in-memory ranked trie over product titles, brands,
+brand + model pairs and popular search queries. Each active product adds
+its weight, which grows with its views and favorites, to its phrases;
+product write events move that weight incrementally, and the trie is
+rebuilt every ``SUGGEST_REFRESH_SECONDS`` to pick up counter changes and
+writes made by other workers.
+"""
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.logging import logger
+from app.models.product import Product, ProductStatus
+from app.services.events import ProductEvent, ProductSnapshot, product_events
+from app.utils.trie import CompletionTrie, normalize_phrase
+
+MAX_PHRASE_LENGTH = 100
+
+_SUGGEST_COLUMNS = [
+    Product.title,
+    Product.brand,
+    Product.model,
+    Product.views_count,
+    Product.favorites_count,
+]
+
+
+def product_weight(views_count: Optional[int], favorites_count: Optional[int]) -> float:
+    """Completion weight of a product, growing slowly with its popularity"""
+    return 1.0 + math.log1p(views_count or 0) + 2.0 * math.log1p(favorites_count or 0)
+
+
+def product_phrases(
+    title: Optional[str],
+    brand: Optional[str],
+    model: Optional[str]
+) -> List[str]:
+    """Get the completion phrases of a product"""
+    phrases = []
+    for text in (title, brand, f"{brand} {model}" if brand and model else None):
+        phrase = normalize_phrase(text)[:MAX_PHRASE_LENGTH]
+        if phrase and phrase not in phrases:
+            phrases.append(phrase)
+    return phrases
+
+
+class SuggestionIndex:
+    """Completion trie plus the per-product weight it holds"""
+
+    def __init__(self):
+        self.trie = CompletionTrie(k=settings.SUGGEST_MAX_RESULTS)
+        self._contributions: Dict[int, Tuple[List[str], float]] = {}
+
+    def add_product(self, product_id: int, fields: Dict) -> None:
+        """Add or replace a product's contribution"""
+        self.remove_product(product_id)
+        phrases = product_phrases(fields.get("title"), fields.get("brand"), fields.get("model"))
+        weight = product_weight(fields.get("views_count"), fields.get("favorites_count"))
+        for phrase in phrases:
+            self.trie.add(phrase, weight)
+        self._contributions[product_id] = (phrases, weight)
+
+    def remove_product(self, product_id: int) -> None:
+        """Withdraw exactly what a product contributed"""
+        contribution = self._contributions.pop(product_id, None)
+        if contribution is None:
+            return
+        phrases, weight = contribution
+        for phrase in phrases:
+            self.trie.add(phrase, -weight)
+
+    def add_query(self, query: str, weight: float) -> None:
+        """Add weight to a popular search query"""
+        self.trie.add(query[:MAX_PHRASE_LENGTH], weight)
+
+    def complete(self, prefix: str, limit: int) -> List[str]:
+        """Get the best completions for a prefix"""
+        return [phrase for phrase, _ in self.trie.complete(prefix, limit)]
+
+
+class PopularQueries:
+    """
+    Bounded counter of searched queries.
+
+    A query becomes a suggestion once it has been searched
+    ``SUGGEST_MIN_QUERY_COUNT`` times; when the counter is full, the least
+    searched half is dropped so one-off queries do not pile up.
+    """
+
+    def __init__(self, max_size: int, min_count: int):
+        self.max_size = max_size
+        self.min_count = min_count
+        self.counts: Counter = Counter()
+
+    def record(self, query: str) -> int:
+        """Count a search and get the query's search count"""
+        self.counts[query] += 1
+        count = self.counts[query]
+        if len(self.counts) > self.max_size:
+            self.counts = Counter(dict(self.counts.most_common(self.max_size // 2)))
+        return count
+
+    def popular(self) -> List[Tuple[str, int]]:
+        """Get every query searched often enough to suggest"""
+        return [(query, count) for query, count in self.counts.items() if count >= self.min_count]
+
+
+# Global suggestion index, created at startup when SUGGEST_ENABLED is set
+suggestion_index: Optional[SuggestionIndex] = None
+
+# Index being filled by a rebuild; it receives write events as well
+_building_index: Optional[SuggestionIndex] = None
+
+popular_queries = PopularQueries(
+    max_size=settings.SUGGEST_TRACKED_QUERIES,
+    min_count=settings.SUGGEST_MIN_QUERY_COUNT
+)
+
+
+def _apply_event(index: SuggestionIndex, event: ProductEvent) -> None:
+    """Apply one product write to a suggestion index"""
+    current: Optional[ProductSnapshot] = event.current
+    if current is not None and current.get("status") == ProductStatus.ACTIVE:
+        index.add_product(event.product_id, current)
+    else:
+        index.remove_product(event.product_id)
+
+
+@product_events.subscribe
+def _on_product_event(event: ProductEvent) -> None:
+    """Keep the suggestion index in sync with product writes"""
+    for index in (suggestion_index, _building_index):
+        if index is not None:
+            _apply_event(index, event)
+
+
+def record_search(query: str) -> None:
+    """Count a search query that returned results"""
+    query = normalize_phrase(query)
+    if not query or len(query) > MAX_PHRASE_LENGTH:
+        return
+    count = popular_queries.record(query)
+    if suggestion_index is None or count < popular_queries.min_count:
+        return
+    # Reaching the threshold adds every search counted so far
+    suggestion_index.add_query(query, float(count) if count == popular_queries.min_count else 1.0)
+
+
+async def rebuild_suggestions() -> None:
+    """Fill a fresh suggestion index from the products table and swap it in"""
+    global suggestion_index, _building_index
+    batch_size = settings.SEARCH_INDEX_REBUILD_BATCH
+    _building_index = index = SuggestionIndex()
+
+    try:
+        async with async_session_maker() as session:
+            last_id = 0
+            while True:
+                result = await session.execute(
+                    select(Product.id, *_SUGGEST_COLUMNS)
+                    .where(
+                        Product.status_is(ProductStatus.ACTIVE),
+                        Product.id > last_id
+                    )
+                    .order_by(Product.id)
+                    .limit(batch_size)
+                )
+                rows = result.all()
+                if not rows:
+                    break
+
+                for row in rows:
+                    index.add_product(row[0], row._mapping)
+                last_id = rows[-1][0]
+
+        for query, count in popular_queries.popular():
+            index.add_query(query, float(count))
+        index.trie.refresh()
+
+        suggestion_index = index
+        logger.info(f"Suggestion index rebuilt with {len(index.trie)} phrases")
+    finally:
+        _building_index = None
+
+
+async def start_suggestions() -> None:
+    """Build the suggestion index at startup"""
+    await rebuild_suggestions()
+
+
+def stop_suggestions() -> None:
+    """Release the suggestion index"""
+    global suggestion_index
+    suggestion_index = None
+
+
+def suggest(prefix: str, limit: int) -> List[str]:
+    """Get completions for a typed prefix"""
+    if suggestion_index is None:
+        return []
+    return suggestion_index.complete(prefix, limit)
@@ -0,0 +1,207 @@
+"""
+Normalized product tags for PurpleShop
+
+Tags live in the ``tags`` table, linked to products through
+``product_tags``; the ``(tag_id, product_id)`` index answers any-of and
+all-of tag filters without scanning products. ``Tag.product_count`` holds
+the number of active products per tag and is adjusted on every product
+write, so the tag cloud is a single indexed read.
+"""
+import json
+import math
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.core.database import is_postgresql
+from app.models.product import Product, ProductStatus
+from app.models.tag import ProductTag, Tag
+
+TAG_MAX_LENGTH = 50
+
+
+def normalize_tags(tags: Optional[Iterable[str]]) -> List[str]:
+    """Lowercase, trim and de-duplicate tags, keeping their order"""
+    normalized = []
+    for tag in tags or []:
+        name = " ".join(str(tag).lower().split())[:TAG_MAX_LENGTH]
+        if name and name not in normalized:
+            normalized.append(name)
+    return normalized
+
+
+def parse_tags(value: Optional[str]) -> List[str]:
+    """Parse a comma-separated tag filter"""
+    if not value:
+        return []
+    return normalize_tags(value.split(","))
+
+
+async def _resolve_tag_ids(db: AsyncSession, names: List[str]) -> Dict[str, int]:
+    """Get tag ids by name, creating missing tags"""
+    if not names:
+        return {}
+    result = await db.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names)))
+    ids = dict(result.all())
+
+    missing = sorted(name for name in names if name not in ids)
+    if missing:
+        # A concurrent write may create the same tags: skip those, then read every id
+        insert = postgresql_insert if is_postgresql() else sqlite_insert
+        await db.execute(
+            insert(Tag)
+            .values([{"name": name, "product_count": 0} for name in missing])
+            .on_conflict_do_nothing(index_elements=[Tag.name])
+        )
+        result = await db.execute(select(Tag.name, Tag.id).where(Tag.name.in_(missing)))
+        ids.update(result.all())
+    return ids
+
+
+async def _adjust_counts(db: AsyncSession, tag_ids: Set[int], delta: int) -> None:
+    """Add ``delta`` to the product count of several tags"""
+    if tag_ids:
+        await db.execute(
+            update(Tag)
+            .where(Tag.id.in_(tag_ids))
+            .values(product_count=Tag.product_count + delta)
+        )
+
+
+async def sync_product_tags(
+    db: AsyncSession,
+    product: Product,
+    tags: Optional[List[str]] = None,
+    was_active: bool = False
+) -> None:
+    """
+    Store a product's tags and keep tag counts current.
+
+    ``tags`` replaces the product's tags when given; otherwise only the
+    counts are adjusted, for status changes. ``was_active`` is the status
+    before the write. Call before committing the write.
+    """
+    result = await db.execute(
+        select(ProductTag.tag_id).where(ProductTag.product_id == product.id)
+    )
+    old_ids = set(result.scalars().all())
+    new_ids = old_ids
+
+    if tags is not None:
+        names = normalize_tags(tags)[:settings.MAX_TAGS_PER_PRODUCT]
+        ids = await _resolve_tag_ids(db, names)
+        new_ids = set(ids.values())
+
+        removed = old_ids - new_ids
+        if removed:
+            result = await db.execute(
+                select(ProductTag).where(
+                    ProductTag.product_id == product.id,
+                    ProductTag.tag_id.in_(removed)
+                )
+            )
+            for link in result.scalars().all():
+                await db.delete(link)
+        db.add_all([
+            ProductTag(product_id=product.id, tag_id=tag_id)
+            for tag_id in new_ids - old_ids
+        ])
+        product.tags = json.dumps(names) if names else None
+
+    counted_before = old_ids if was_active else set()
+    counted_after = new_ids if product.status == ProductStatus.ACTIVE else set()
+    await _adjust_counts(db, counted_after - counted_before, 1)
+    await _adjust_counts(db, counted_before - counted_after, -1)
+
+
+def tag_filter(tags: List[str], mode: str = "any") -> ColumnElement:
+    """
+    Condition keeping products tagged with any or all of ``tags``.
+
+    Both modes resolve product ids from the ``(tag_id, product_id)`` index;
+    all-of keeps the ids linked to every requested tag.
+    """
+    links = (
+        select(ProductTag.product_id)
+        .join(Tag, Tag.id == ProductTag.tag_id)
+        .where(Tag.name.in_(tags))
+    )
+    if mode == "all" and len(tags) > 1:
+        links = links.group_by(ProductTag.product_id).having(
+            func.count(ProductTag.tag_id) == len(tags)
+        )
+    return Product.id.in_(links)
+
+
+async def get_tag_cloud(db: AsyncSession, limit: int, min_count: int = 1) -> List[dict]:
+    """Get the most used tags with a 1-5 display weight on a log scale"""
+    result = await db.execute(
+        select(Tag.name, Tag.product_count)
+        .where(Tag.product_count >= min_count)
+        .order_by(Tag.product_count.desc(), Tag.name)
+        .limit(limit)
+    )
+    rows = result.all()
+    if not rows:
+        return []
+
+    high = math.log(rows[0][1] + 1)
+    low = math.log(rows[-1][1] + 1)
+    spread = (high - low) or 1.0
+    return [
+        {
+            "name": name,
+            "product_count": count,
+            "weight": 1 + round(4 * (math.log(count + 1) - low) / spread)
+        }
+        for name, count in sorted(rows, key=lambda row: row[0])
+    ]
+
+
+async def recount_tags(db: AsyncSession) -> None:
+    """Recompute every tag's active product count from the links"""
+    active_links = (
+        select(func.count(ProductTag.id))
+        .join(Product, Product.id == ProductTag.product_id)
+        .where(
+            ProductTag.tag_id == Tag.id,
+            Product.status_is(ProductStatus.ACTIVE)
+        )
+        .scalar_subquery()
+    )
+    await db.execute(update(Tag).values(product_count=active_links))
+
+
+async def backfill_product_tags(db: AsyncSession, batch_size: int = 1000) -> int:
+    """Copy the JSON ``Product.tags`` of every product into product_tags"""
+    migrated = 0
+    last_id = 0
+    while True:
+        result = await db.execute(
+            select(Product)
+            .where(Product.id > last_id, Product.tags.isnot(None))
+            .order_by(Product.id)
+            .limit(batch_size)
+        )
+        products = result.scalars().all()
+        if not products:
+            break
+
+        for product in products:
+            try:
+                tags = json.loads(product.tags)
+            except ValueError:
+                tags = product.tags.split(",")
+            await sync_product_tags(db, product, tags if isinstance(tags, list) else [])
+        await db.commit()
+        migrated += len(products)
+        last_id = products[-1].id
+
+    await recount_tags(db)
+    await db.commit()
+    return migrated
@@ -0,0 +1,147 @@
+"""
+In-memory category taxonomy for PurpleShop
+
+The navigation menu needs the category → subcategory tree with active
+product counts and the list of locations. They are held in memory,
+adjusted from product write events and rebuilt from a single GROUP BY
+at startup and every ``TAXONOMY_REFRESH_SECONDS``, which also bounds how
+stale they get for writes made by other workers.
+
+Each view is serialized once per change and served with an ETag, so
+clients polling an unchanged menu get an empty 304.
+"""
+import hashlib
+import json
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+
+from app.core.database import async_session_maker
+from app.core.logging import logger
+from app.models.product import Product, ProductStatus
+from app.services.events import ProductEvent, ProductSnapshot, product_events
+
+Place = Tuple[str, Optional[str], str]  # (category, subcategory, location)
+
+
+@dataclass(frozen=True)
+class TaxonomyPayload:
+    """A serialized taxonomy view and its ETag"""
+    body: bytes
+    etag: str
+
+
+def _place(snapshot: Optional[ProductSnapshot]) -> Optional[Place]:
+    """Get where an active product sits in the taxonomy, or None when inactive"""
+    if snapshot is None or snapshot.get("status") != ProductStatus.ACTIVE:
+        return None
+    return snapshot["category"], snapshot.get("subcategory"), snapshot["location"]
+
+
+class Taxonomy:
+    """Active product counts per category, subcategory and location"""
+
+    def __init__(self, places: Optional[Counter] = None):
+        self.places: Counter = places or Counter()  # Place -> active products
+        self._payloads: Dict[str, TaxonomyPayload] = {}
+
+    def move(self, old: Optional[Place], new: Optional[Place]) -> None:
+        """Count a product out of one place and into another"""
+        if old == new:
+            return
+        if old is not None:
+            self.places[old] -= 1
+            if self.places[old] <= 0:
+                del self.places[old]
+        if new is not None:
+            self.places[new] += 1
+        self._payloads.clear()
+
+    def tree(self) -> Dict[str, Any]:
+        """Categories by product count, with their subcategories"""
+        categories: Counter = Counter()
+        subcategories: Dict[str, Counter] = {}
+        for (category, subcategory, _), count in self.places.items():
+            categories[category] += count
+            if subcategory is not None:
+                subcategories.setdefault(category, Counter())[subcategory] += count
+
+        return {
+            "categories": [
+                {"name": name, "product_count": count}
+                for name, count in categories.most_common()
+            ],
+            "subcategories": {
+                category: [
+                    {"name": name, "product_count": count}
+                    for name, count in subcategories[category].most_common()
+                ]
+                for category in sorted(subcategories)
+            }
+        }
+
+    def names(self) -> Dict[str, Any]:
+        """Sorted category and location names"""
+        return {
+            "categories": sorted({category for category, _, _ in self.places}),
+            "locations": sorted({location for _, _, location in self.places})
+        }
+
+    def payload(self, view: str) -> TaxonomyPayload:
+        """Get a view serialized with its ETag, built once per change"""
+        payload = self._payloads.get(view)
+        if payload is None:
+            build: Callable[[], Dict[str, Any]] = getattr(self, view)
+            body = json.dumps(build(), separators=(",", ":"), ensure_ascii=False).encode()
+            etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+            payload = self._payloads[view] = TaxonomyPayload(body=body, etag=etag)
+        return payload
+
+
+# Global taxonomy of this worker
+taxonomy = Taxonomy()
+
+
+@product_events.subscribe
+def _on_product_event(event: ProductEvent) -> None:
+    """Keep the taxonomy counts in sync with product writes"""
+    taxonomy.move(_place(event.previous), _place(event.current))
+
+
+async def rebuild_taxonomy() -> None:
+    """Recount the taxonomy from the products table and swap it in"""
+    global taxonomy
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(Product.category, Product.subcategory, Product.location, func.count(Product.id))
+            .where(Product.status_is(ProductStatus.ACTIVE))
+            .group_by(Product.category, Product.subcategory, Product.location)
+        )
+        places = Counter({
+            (category, subcategory, location): count
+            for category, subcategory, location, count in result.all()
+        })
+
+    taxonomy = Taxonomy(places)
+    logger.info(f"Taxonomy rebuilt with {len(places)} category/location pairs")
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+def taxonomy_response(request: Request, view: str) -> Response:
+    """Serve a taxonomy view, or 304 when the client already has it"""
+    payload = taxonomy.payload(view)
+    headers = {"ETag": payload.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, payload.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
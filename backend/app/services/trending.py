@@ -0,0 +1,237 @@
+"""
+Trending products for PurpleShop
+
+Every view and favorite adds weight to a product's exponentially decayed
+popularity, with a half-life of ``TRENDING_HALF_LIFE_HOURS``. Scores are
+kept in log space relative to a fixed epoch, ``log(sum(w * e^(λ·t)))``:
+an event at time ``t`` is one ``logaddexp`` and no score ever has to be
+decayed, because all of them shrink by the same factor as time passes.
+
+The top ``TRENDING_TOP_K`` products overall, per category, per location
+and per category and location are kept in bounded heaps that
+``/products/trending`` reads directly. Each worker ranks the traffic it
+serves; at startup the ranking is seeded from recent favorites and daily
+unique-viewer sketches.
+"""
+import math
+import time
+from datetime import datetime, time as day_time, timedelta, timezone
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.models.favorite import Favorite
+from app.models.product import Product, ProductStatus
+from app.models.view_sketch import ProductViewSketch
+from app.services.events import ProductEvent, product_events
+from app.utils.hyperloglog import HyperLogLog
+from app.utils.topk import TopK
+
+ALL = ("all",)
+
+Place = Tuple[Optional[str], Optional[str]]  # (category, location)
+
+
+def _logaddexp(a: float, b: float) -> float:
+    """Stable ``log(e^a + e^b)``"""
+    high, low = (a, b) if a >= b else (b, a)
+    return high + math.log1p(math.exp(low - high))
+
+
+def trending_groups(category: Optional[str], location: Optional[str]) -> List[Hashable]:
+    """Get the ranking groups a product with this category and location is in"""
+    groups: List[Hashable] = [ALL]
+    if category:
+        groups.append(("category", category))
+    if location:
+        groups.append(("location", location))
+    if category and location:
+        groups.append(("category_location", category, location))
+    return groups
+
+
+class TrendingIndex:
+    """Decayed product scores and the top-k heaps over them"""
+
+    def __init__(self, k: int, half_life_hours: float):
+        self.k = k
+        self.rate = math.log(2) / (half_life_hours * 3600)
+        self.scores: Dict[int, float] = {}  # Log-space scores
+        self.places: Dict[int, Place] = {}
+        self.heaps: Dict[Hashable, TopK] = {}
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def _offer(self, product_id: int, score: float) -> None:
+        """Offer a score to the heaps of a product's groups"""
+        for group in trending_groups(*self.places[product_id]):
+            heap = self.heaps.get(group)
+            if heap is None:
+                heap = self.heaps[group] = TopK(self.k)
+            heap.update(product_id, score)
+
+    def record(
+        self,
+        product_id: int,
+        category: Optional[str],
+        location: Optional[str],
+        weight: float,
+        at: Optional[float] = None
+    ) -> None:
+        """Add weighted activity at a Unix time (now by default)"""
+        at = time.time() if at is None else at
+        self.move(product_id, (category, location))
+        self.places[product_id] = (category, location)
+
+        increment = math.log(weight) + self.rate * at
+        score = self.scores.get(product_id)
+        score = increment if score is None else _logaddexp(score, increment)
+        self.scores[product_id] = score
+        self._offer(product_id, score)
+
+    def move(self, product_id: int, place: Place) -> None:
+        """Re-rank a scored product under a new category and location"""
+        score = self.scores.get(product_id)
+        if score is None or self.places[product_id] == place:
+            return
+        self.remove(product_id)
+        self.scores[product_id] = score
+        self.places[product_id] = place
+        self._offer(product_id, score)
+
+    def remove(self, product_id: int) -> None:
+        """Forget a product"""
+        self.scores.pop(product_id, None)
+        place = self.places.pop(product_id, None)
+        if place is not None:
+            for group in trending_groups(*place):
+                heap = self.heaps.get(group)
+                if heap is not None:
+                    heap.remove(product_id)
+
+    def current_score(self, score: float, now: Optional[float] = None) -> float:
+        """Convert a log-space score to its decayed weight at a time"""
+        now = time.time() if now is None else now
+        return math.exp(score - self.rate * now)
+
+    def top(self, group: Hashable, limit: int) -> List[Tuple[int, float]]:
+        """Get the trending products of a group with their current scores"""
+        heap = self.heaps.get(group)
+        if heap is None:
+            return []
+        now = time.time()
+        return [(product_id, self.current_score(score, now)) for product_id, score in heap.items(limit)]
+
+    def compact(self, min_score: float) -> None:
+        """Drop products whose decayed score fell below ``min_score`` and refill the heaps"""
+        floor = math.log(min_score) + self.rate * time.time()
+        for product_id in [pid for pid, score in self.scores.items() if score < floor]:
+            self.remove(product_id)
+        self.heaps = {}
+        for product_id, score in self.scores.items():
+            self._offer(product_id, score)
+
+
+# Global trending index of this worker
+trending_index = TrendingIndex(
+    k=settings.TRENDING_TOP_K,
+    half_life_hours=settings.TRENDING_HALF_LIFE_HOURS
+)
+
+metrics.gauge("trending.products", lambda: len(trending_index))
+
+
+@product_events.subscribe
+def _on_product_event(event: ProductEvent) -> None:
+    """Drop products that stop being active and move products that change place"""
+    current = event.current
+    if current is None or current.get("status") != ProductStatus.ACTIVE:
+        trending_index.remove(event.product_id)
+        return
+
+    trending_index.move(event.product_id, (current.get("category"), current.get("location")))
+
+
+def record_product_view(product: Product) -> None:
+    """Count a product page view towards trending"""
+    if settings.TRENDING_ENABLED:
+        trending_index.record(product.id, product.category, product.location, settings.TRENDING_VIEW_WEIGHT)
+
+
+def record_product_favorite(product: Product) -> None:
+    """Count a new favorite towards trending"""
+    if settings.TRENDING_ENABLED:
+        trending_index.record(product.id, product.category, product.location, settings.TRENDING_FAVORITE_WEIGHT)
+
+
+def get_trending(
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+    limit: int = 20
+) -> List[Tuple[int, float]]:
+    """Get trending product ids and scores for a category and/or location"""
+    if category and location:
+        group: Hashable = ("category_location", category, location)
+    elif category:
+        group = ("category", category)
+    elif location:
+        group = ("location", location)
+    else:
+        group = ALL
+    return trending_index.top(group, limit)
+
+
+async def start_trending() -> None:
+    """Seed the trending index from recent favorites and viewer sketches"""
+    horizon = settings.TRENDING_HALF_LIFE_HOURS * settings.TRENDING_SEED_HALF_LIVES
+    since = datetime.now(timezone.utc) - timedelta(hours=horizon)
+    seeded = 0
+
+    async with async_session_maker() as session:
+        result = await session.stream(
+            select(Product.id, Product.category, Product.location, Favorite.created_at)
+            .join(Favorite, Favorite.product_id == Product.id)
+            .where(
+                Product.status_is(ProductStatus.ACTIVE),
+                Favorite.created_at >= since
+            )
+        )
+        async for product_id, category, location, created_at in result:
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)  # SQLite drops the offset
+            trending_index.record(
+                product_id, category, location,
+                settings.TRENDING_FAVORITE_WEIGHT, created_at.timestamp()
+            )
+            seeded += 1
+
+        # Unique viewers per day, counted at the day's midpoint
+        result = await session.stream(
+            select(Product.id, Product.category, Product.location, ProductViewSketch.day, ProductViewSketch.sketch)
+            .join(ProductViewSketch, ProductViewSketch.product_id == Product.id)
+            .where(
+                Product.status_is(ProductStatus.ACTIVE),
+                ProductViewSketch.day >= since.date()
+            )
+        )
+        async for product_id, category, location, day, sketch in result:
+            viewers = HyperLogLog.from_bytes(sketch).count()
+            if viewers:
+                midday = datetime.combine(day, day_time(12), tzinfo=timezone.utc).timestamp()
+                trending_index.record(
+                    product_id, category, location,
+                    settings.TRENDING_VIEW_WEIGHT * viewers, midday
+                )
+                seeded += 1
+
+    logger.info(f"Trending index seeded from {seeded} favorites and daily view counts")
+
+
+async def compact_trending() -> None:
+    """Forget products that stopped trending and refill heaps emptied by removals"""
+    trending_index.compact(settings.TRENDING_MIN_SCORE)
@@ -0,0 +1,179 @@
+"""
+Approximate unique viewers per product for PurpleShop
+
+Each product page view adds the viewer (user id, or client IP for
+anonymous views) to a HyperLogLog sketch of that product and day. Sketches
+are buffered per worker and merged into ``product_view_sketches`` every
+``UNIQUE_VIEWERS_FLUSH_SECONDS``; counts merge the daily sketches of the
+last ``UNIQUE_VIEWERS_WINDOW_DAYS`` days. Viewer identities are only ever
+hashed into registers, never stored.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.models.user import User
+from app.models.view_sketch import ProductViewSketch
+from app.utils.hyperloglog import HyperLogLog
+
+FLUSH_BATCH_SIZE = 500
+
+SketchKey = Tuple[int, date]  # (product_id, day)
+
+
+def today() -> date:
+    """Get the current UTC day, the unit of sketch buckets"""
+    return datetime.now(timezone.utc).date()
+
+
+def viewer_key(user: Optional[User], client_host: Optional[str]) -> Optional[str]:
+    """Identify a viewer by user id, or by IP address when anonymous"""
+    if user is not None:
+        return f"user:{user.id}"
+    if client_host:
+        return f"ip:{client_host}"
+    return None
+
+
+class ViewerSketches:
+    """Per-worker buffer of daily viewer sketches"""
+
+    def __init__(self, max_pending: int, precision: int):
+        self.max_pending = max_pending
+        self.precision = precision
+        self.pending: Dict[SketchKey, HyperLogLog] = {}
+
+    def record(self, product_id: int, viewer: str) -> None:
+        """Add a viewer to today's sketch of a product"""
+        key = (product_id, today())
+        sketch = self.pending.get(key)
+        if sketch is None:
+            if len(self.pending) >= self.max_pending:
+                metrics.increment("unique_viewers.dropped")
+                return
+            sketch = self.pending[key] = HyperLogLog(self.precision)
+        sketch.add(viewer)
+
+    def _restore(self, sketches: Dict[SketchKey, HyperLogLog]) -> None:
+        """Merge back sketches whose flush failed"""
+        for key, sketch in sketches.items():
+            if key in self.pending:
+                self.pending[key].merge(sketch)
+            elif len(self.pending) < self.max_pending:
+                self.pending[key] = sketch
+            else:
+                metrics.increment("unique_viewers.dropped")
+
+    async def _flush_batch(
+        self,
+        session: AsyncSession,
+        sketches: Dict[SketchKey, HyperLogLog]
+    ) -> None:
+        """Merge a batch of sketches into their stored rows"""
+        result = await session.execute(
+            select(ProductViewSketch)
+            .where(tuple_(ProductViewSketch.product_id, ProductViewSketch.day).in_(list(sketches)))
+            .order_by(ProductViewSketch.product_id, ProductViewSketch.day)
+            .with_for_update()
+        )
+        stored = {(row.product_id, row.day): row for row in result.scalars().all()}
+        for (product_id, day), sketch in sorted(sketches.items()):
+            row = stored.get((product_id, day))
+            if row is None:
+                session.add(ProductViewSketch(
+                    product_id=product_id,
+                    day=day,
+                    sketch=sketch.to_bytes()
+                ))
+            else:
+                merged = HyperLogLog.from_bytes(row.sketch)
+                merged.merge(sketch)
+                row.sketch = merged.to_bytes()
+
+    async def flush(self) -> int:
+        """Merge the buffered sketches into the database and get how many"""
+        if not self.pending:
+            return 0
+        sketches, self.pending = self.pending, {}
+
+        keys = sorted(sketches)
+        try:
+            async with async_session_maker() as session:
+                for start in range(0, len(keys), FLUSH_BATCH_SIZE):
+                    batch = keys[start:start + FLUSH_BATCH_SIZE]
+                    await self._flush_batch(session, {key: sketches[key] for key in batch})
+                await session.commit()
+        except Exception:
+            metrics.increment("unique_viewers.flush_errors")
+            self._restore(sketches)
+            raise
+
+        metrics.increment("unique_viewers.flushed", len(sketches))
+        return len(sketches)
+
+
+# Global sketch buffer of this worker
+viewer_sketches = ViewerSketches(
+    max_pending=settings.UNIQUE_VIEWERS_MAX_PENDING,
+    precision=settings.UNIQUE_VIEWERS_PRECISION
+)
+
+metrics.gauge("unique_viewers.pending_sketches", lambda: len(viewer_sketches.pending))
+
+
+def record_viewer(product_id: int, viewer: Optional[str]) -> None:
+    """Count a product page view towards its unique viewers"""
+    if viewer:
+        viewer_sketches.record(product_id, viewer)
+
+
+async def unique_viewer_counts(db: AsyncSession, product_ids: Sequence[int]) -> Dict[int, int]:
+    """Estimate each product's distinct viewers over the counting window"""
+    if not product_ids:
+        return {}
+    since = today() - timedelta(days=settings.UNIQUE_VIEWERS_WINDOW_DAYS - 1)
+    result = await db.execute(
+        select(ProductViewSketch.product_id, ProductViewSketch.sketch)
+        .where(
+            ProductViewSketch.product_id.in_(product_ids),
+            ProductViewSketch.day >= since
+        )
+    )
+
+    merged = {product_id: HyperLogLog(settings.UNIQUE_VIEWERS_PRECISION) for product_id in product_ids}
+    for product_id, sketch in result.all():
+        merged[product_id].merge(HyperLogLog.from_bytes(sketch))
+
+    # Include what this worker has not flushed yet
+    days = [since + timedelta(days=offset) for offset in range(settings.UNIQUE_VIEWERS_WINDOW_DAYS)]
+    for product_id, total in merged.items():
+        for day in days:
+            sketch = viewer_sketches.pending.get((product_id, day))
+            if sketch is not None:
+                total.merge(sketch)
+
+    return {product_id: sketch.count() for product_id, sketch in merged.items()}
+
+
+async def flush_viewer_sketches() -> None:
+    """Write buffered viewer sketches to the database"""
+    sketches = await viewer_sketches.flush()
+    if sketches:
+        logger.debug(f"Flushed {sketches} viewer sketches")
+
+
+async def prune_viewer_sketches() -> None:
+    """Delete daily sketches older than the retention period"""
+    cutoff = today() - timedelta(days=settings.UNIQUE_VIEWERS_RETENTION_DAYS)
+    async with async_session_maker() as session:
+        result = await session.execute(
+            delete(ProductViewSketch).where(ProductViewSketch.day < cutoff)
+        )
+        await session.commit()
+    logger.info(f"Pruned {result.rowcount} viewer sketches older than {cutoff}")
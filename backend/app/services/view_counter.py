@@ -0,0 +1,100 @@
+"""
+Write-behind product view counter for PurpleShop
+
+Product page views are counted in memory per worker and added to the
+sharded ``views`` counter in batches every ``VIEW_COUNTER_FLUSH_SECONDS``,
+so reading a product never writes its row. Views still pending when a worker dies are lost; the
+buffer is bounded and views past its size are dropped and counted.
+"""
+import time
+from collections import Counter
+from typing import Optional
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.services.counter_shards import increment_shards
+
+FLUSH_BATCH_SIZE = 1000
+
+
+class ViewCounter:
+    """Buffered per-product view increments"""
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self.pending: Counter = Counter()
+        self.pending_since: Optional[float] = None  # When the oldest pending view was counted
+
+    def record(self, product_id: int) -> None:
+        """Count one view"""
+        if product_id not in self.pending and len(self.pending) >= self.max_pending:
+            metrics.increment("view_counter.dropped")
+            return
+        if self.pending_since is None:
+            self.pending_since = time.monotonic()
+        self.pending[product_id] += 1
+
+    def flush_lag(self) -> float:
+        """Get how long the oldest pending view has waited, in seconds"""
+        if self.pending_since is None:
+            return 0.0
+        return time.monotonic() - self.pending_since
+
+    def _restore(self, counts: Counter, since: Optional[float]) -> None:
+        """Put back views whose flush failed, dropping what no longer fits"""
+        for product_id, views in counts.items():
+            if product_id in self.pending or len(self.pending) < self.max_pending:
+                self.pending[product_id] += views
+            else:
+                metrics.increment("view_counter.dropped", views)
+        if since is not None and (self.pending_since is None or since < self.pending_since):
+            self.pending_since = since
+
+    async def flush(self) -> int:
+        """Add the pending views to the database and get how many were written"""
+        if not self.pending:
+            return 0
+        counts, since = self.pending, self.pending_since
+        self.pending, self.pending_since = Counter(), None
+
+        product_ids = sorted(counts)
+        try:
+            async with async_session_maker() as session:
+                for start in range(0, len(product_ids), FLUSH_BATCH_SIZE):
+                    batch = product_ids[start:start + FLUSH_BATCH_SIZE]
+                    await increment_shards(session, "views", {pid: counts[pid] for pid in batch})
+                await session.commit()
+        except Exception:
+            metrics.increment("view_counter.flush_errors")
+            self._restore(counts, since)
+            raise
+
+        views = sum(counts.values())
+        metrics.increment("view_counter.flushed", views)
+        return views
+
+
+# Global view counter of this worker
+view_counter = ViewCounter(max_pending=settings.VIEW_COUNTER_MAX_PENDING)
+
+metrics.gauge("view_counter.pending_products", lambda: len(view_counter.pending))
+metrics.gauge("view_counter.flush_lag_seconds", view_counter.flush_lag)
+
+
+def record_view(product_id: int) -> None:
+    """Count a product page view"""
+    view_counter.record(product_id)
+
+
+def pending_views(product_id: int) -> int:
+    """Get the views of a product this worker has not flushed yet"""
+    return view_counter.pending.get(product_id, 0)
+
+
+async def flush_views() -> None:
+    """Write buffered views to the database"""
+    views = await view_counter.flush()
+    if views:
+        logger.debug(f"Flushed {views} product views")
@@ -0,0 +1,238 @@
+"""
+Roaring-style compressed bitmaps for PurpleShop
+
+Values are split into a 16-bit high key and a 16-bit low part. Each high key
+owns one container: a sorted list of low parts while it holds at most
+``ARRAY_CONTAINER_MAX`` values, or a 65536-bit Python ``int`` bitset once it
+grows denser. Sparse sets stay small and dense sets get word-parallel
+intersections.
+"""
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+ARRAY_CONTAINER_MAX = 4096
+
+Container = Union[List[int], int]
+
+try:
+    _popcount = int.bit_count  # Python 3.10+
+except AttributeError:
+    def _popcount(bits: int) -> int:
+        """Count the set bits of an int"""
+        return bin(bits).count("1")
+
+
+def _cardinality(container: Container) -> int:
+    """Count the values in a container"""
+    if isinstance(container, list):
+        return len(container)
+    return _popcount(container)
+
+
+def _to_bitset(values: Iterable[int]) -> int:
+    """Convert low parts to a bitset container"""
+    bits = 0
+    for value in values:
+        bits |= 1 << value
+    return bits
+
+
+def _to_array(bits: int) -> List[int]:
+    """Convert a bitset container to a sorted list container"""
+    values = []
+    while bits:
+        lowest = bits & -bits
+        values.append(lowest.bit_length() - 1)
+        bits ^= lowest
+    return values
+
+
+def _optimize(container: Container) -> Optional[Container]:
+    """Pick the cheaper representation for a container, or None if empty"""
+    if isinstance(container, list):
+        if not container:
+            return None
+        if len(container) > ARRAY_CONTAINER_MAX:
+            return _to_bitset(container)
+        return container
+    if not container:
+        return None
+    if _popcount(container) <= ARRAY_CONTAINER_MAX:
+        return _to_array(container)
+    return container
+
+
+def _intersect(a: Container, b: Container) -> Optional[Container]:
+    """Intersect two containers"""
+    if isinstance(a, list) and isinstance(b, list):
+        if len(a) > len(b):
+            a, b = b, a
+        other = set(b)
+        return _optimize([value for value in a if value in other])
+    if isinstance(a, list):
+        return _optimize([value for value in a if b >> value & 1])
+    if isinstance(b, list):
+        return _optimize([value for value in b if a >> value & 1])
+    return _optimize(a & b)
+
+
+def _union(a: Container, b: Container) -> Container:
+    """Union two containers"""
+    if isinstance(a, list) and isinstance(b, list):
+        return _optimize(sorted(set(a).union(b)))
+    if isinstance(a, list):
+        a = _to_bitset(a)
+    if isinstance(b, list):
+        b = _to_bitset(b)
+    return a | b
+
+
+def _iter_descending(container: Container) -> Iterator[int]:
+    """Iterate the low parts of a container from highest to lowest"""
+    if isinstance(container, list):
+        yield from reversed(container)
+        return
+    bits = container
+    while bits:
+        highest = bits.bit_length() - 1
+        yield highest
+        bits ^= 1 << highest
+
+
+class RoaringBitmap:
+    """Compressed set of non-negative 32-bit integers"""
+
+    __slots__ = ("_containers",)
+
+    def __init__(self, values: Iterable[int] = ()):
+        self._containers: Dict[int, Container] = {}
+        for value in values:
+            self.add(value)
+
+    def __len__(self) -> int:
+        return sum(_cardinality(c) for c in self._containers.values())
+
+    def __bool__(self) -> bool:
+        return bool(self._containers)
+
+    def __contains__(self, value: int) -> bool:
+        container = self._containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & 0xFFFF
+        if isinstance(container, list):
+            index = bisect_left(container, low)
+            return index < len(container) and container[index] == low
+        return bool(container >> low & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        for high in sorted(self._containers):
+            container = self._containers[high]
+            base = high << 16
+            if isinstance(container, list):
+                for low in container:
+                    yield base | low
+            else:
+                for low in _to_array(container):
+                    yield base | low
+
+    def __and__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        result = RoaringBitmap()
+        small, large = sorted((self, other), key=lambda b: len(b._containers))
+        for high, container in small._containers.items():
+            match = large._containers.get(high)
+            if match is None:
+                continue
+            merged = _intersect(container, match)
+            if merged is not None:
+                result._containers[high] = merged
+        return result
+
+    def __or__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        result = self.copy()
+        for high, container in other._containers.items():
+            current = result._containers.get(high)
+            if current is None:
+                result._containers[high] = container if isinstance(container, int) else list(container)
+            else:
+                result._containers[high] = _union(current, container)
+        return result
+
+    def copy(self) -> "RoaringBitmap":
+        """Get an independent copy of the bitmap"""
+        result = RoaringBitmap()
+        result._containers = {
+            high: container if isinstance(container, int) else list(container)
+            for high, container in self._containers.items()
+        }
+        return result
+
+    def add(self, value: int) -> None:
+        """Add a value"""
+        high, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(high)
+        if container is None:
+            self._containers[high] = [low]
+        elif isinstance(container, list):
+            index = bisect_left(container, low)
+            if index == len(container) or container[index] != low:
+                insort(container, low)
+                if len(container) > ARRAY_CONTAINER_MAX:
+                    self._containers[high] = _to_bitset(container)
+        else:
+            self._containers[high] = container | (1 << low)
+
+    def discard(self, value: int) -> None:
+        """Remove a value if present"""
+        high, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(high)
+        if container is None:
+            return
+        if isinstance(container, list):
+            index = bisect_left(container, low)
+            if index < len(container) and container[index] == low:
+                container.pop(index)
+            updated = _optimize(container)
+        else:
+            updated = _optimize(container & ~(1 << low))
+        if updated is None:
+            del self._containers[high]
+        else:
+            self._containers[high] = updated
+
+    def descending(self, below: Optional[int] = None) -> Iterator[int]:
+        """Iterate values from highest to lowest, optionally only those below a bound"""
+        for high in sorted(self._containers, reverse=True):
+            base = high << 16
+            container = self._containers[high]
+            if below is not None:
+                if base >= below:
+                    continue
+                limit = below - base
+                if isinstance(container, list):
+                    container = container[:bisect_left(container, limit)]
+                elif limit <= 0xFFFF:
+                    container &= (1 << limit) - 1
+            for low in _iter_descending(container):
+                yield base | low
+
+    @classmethod
+    def intersect_all(cls, bitmaps: Iterable["RoaringBitmap"]) -> "RoaringBitmap":
+        """Intersect several bitmaps, smallest first, into a new bitmap"""
+        ordered = sorted(bitmaps, key=len)
+        if not ordered:
+            return cls()
+        result = ordered[0]
+        for bitmap in ordered[1:]:
+            if not result:
+                break
+            result = result & bitmap
+        return result.copy() if result is ordered[0] else result
+
+    @classmethod
+    def union_all(cls, bitmaps: Iterable["RoaringBitmap"]) -> "RoaringBitmap":
+        """Union several bitmaps"""
+        result = cls()
+        for bitmap in bitmaps:
+            result = result | bitmap
+        return result
@@ -0,0 +1,135 @@
+"""
+Sparse item-item co-occurrence with NumPy
+
+Baskets (a user's favorited items) are streamed in chunks. Every chunk is
+turned into the item pairs its baskets contain, encoded as one int64 key
+per pair, and summed into a COO-style list of ``(key, count, weight)``
+that is compacted whenever it grows past ``max_pending`` entries, so
+memory follows the number of distinct pairs rather than the number of
+favorites.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+PAIR_SHIFT = np.int64(32)
+PAIR_MASK = np.int64((1 << 32) - 1)
+
+Neighbors = List[Tuple[int, float]]  # (item, score), best first
+
+
+def _sum_by_key(keys: np.ndarray, *values: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Sum value arrays over equal keys, returning the unique keys first"""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return (unique,) + tuple(
+        np.bincount(inverse, weights=value, minlength=len(unique)).astype(value.dtype)
+        for value in values
+    )
+
+
+class CooccurrenceMatrix:
+    """
+    Symmetric item-item co-occurrence counts built from baskets.
+
+    Pairs are weighted by ``1 / log2(1 + basket size)`` so that users who
+    favorite everything contribute less per pair; scores are the weighted
+    co-occurrence normalized by both items' weighted totals (cosine).
+    """
+
+    def __init__(self, max_basket: int = 100, max_pending: int = 20_000_000):
+        self.max_basket = max_basket
+        self.max_pending = max_pending
+        self._pairs: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._items: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._pending = 0
+
+    def add_baskets(self, users: np.ndarray, items: np.ndarray) -> None:
+        """Add complete baskets given as parallel arrays sorted by user"""
+        if len(users) == 0:
+            return
+        users = np.asarray(users, dtype=np.int64)
+        items = np.asarray(items, dtype=np.int64)
+
+        # Group boundaries, then cap every basket at max_basket items
+        starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+        sizes = np.diff(np.r_[starts, len(users)])
+        rank = np.arange(len(users)) - np.repeat(starts, sizes)
+        keep = rank < self.max_basket
+        users, items = users[keep], items[keep]
+        starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+        sizes = np.diff(np.r_[starts, len(users)])
+
+        basket_weight = 1.0 / np.log2(1.0 + sizes)
+        item_weight = np.repeat(basket_weight, sizes)
+        self._items.append(_sum_by_key(items, np.ones(len(items)), item_weight))
+
+        # Every item against every item of its basket, keeping a < b
+        per_item = np.repeat(sizes, sizes)
+        left = np.repeat(np.arange(len(items)), per_item)
+        offset = np.arange(len(left)) - np.repeat(np.cumsum(per_item) - per_item, per_item)
+        right = np.repeat(np.repeat(starts, sizes), per_item) + offset
+        a, b = items[left], items[right]
+        forward = a < b
+        if not forward.any():
+            return
+
+        keys = (a[forward] << PAIR_SHIFT) | b[forward]
+        weights = np.repeat(item_weight, per_item)[forward]
+        self._pairs.append(_sum_by_key(keys, np.ones(len(keys)), weights))
+        self._pending += len(self._pairs[-1][0])
+        if self._pending > self.max_pending:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Merge the accumulated partial sums"""
+        for parts in (self._pairs, self._items):
+            if len(parts) > 1:
+                merged = _sum_by_key(*(np.concatenate(column) for column in zip(*parts)))
+                parts[:] = [merged]
+        self._pending = len(self._pairs[0][0]) if self._pairs else 0
+
+    def top_neighbors(
+        self,
+        n: int,
+        min_count: int = 1,
+        candidates: Optional[np.ndarray] = None
+    ) -> Dict[int, Neighbors]:
+        """
+        Prune to the ``n`` best-scoring neighbors of every item.
+
+        Pairs seen in fewer than ``min_count`` baskets are dropped; when
+        ``candidates`` is given, only those items are kept as neighbors.
+        """
+        self._compact()
+        if not self._pairs:
+            return {}
+        keys, counts, weights = self._pairs[0]
+        item_ids, _, item_weights = self._items[0]
+
+        supported = counts >= min_count
+        keys, weights = keys[supported], weights[supported]
+        a, b = keys >> PAIR_SHIFT, keys & PAIR_MASK
+
+        # Cosine over the weighted item totals
+        totals = item_weights[np.searchsorted(item_ids, a)] * item_weights[np.searchsorted(item_ids, b)]
+        scores = weights / np.sqrt(totals)
+
+        # Both directions of every pair, restricted to candidate neighbors
+        source = np.concatenate([a, b])
+        target = np.concatenate([b, a])
+        scores = np.concatenate([scores, scores])
+        if candidates is not None:
+            allowed = np.isin(target, candidates)
+            source, target, scores = source[allowed], target[allowed], scores[allowed]
+
+        order = np.lexsort((target, -scores, source))
+        source, target, scores = source[order], target[order], scores[order]
+        starts = np.flatnonzero(np.r_[True, source[1:] != source[:-1]])
+        sizes = np.diff(np.r_[starts, len(source)])
+        top = (np.arange(len(source)) - np.repeat(starts, sizes)) < n
+        source, target, scores = source[top], target[top], scores[top]
+
+        neighbors: Dict[int, Neighbors] = {}
+        for item, neighbor, score in zip(source.tolist(), target.tolist(), scores.tolist()):
+            neighbors.setdefault(item, []).append((neighbor, score))
+        return neighbors
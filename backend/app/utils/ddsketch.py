@@ -0,0 +1,93 @@
+"""
+DDSketch quantile sketch
+
+Values are counted in logarithmic bins of ratio ``gamma = (1 + a) / (1 - a)``,
+so every quantile is returned within relative accuracy ``a`` (1% by
+default) of a value actually present. Bins are plain counters: sketches
+merge by adding counts and, unlike t-digest or KLL, values can be removed
+again, which lets a sketch follow edits and deletions. The number of
+bins grows with the logarithm of the value range, not with the count.
+"""
+import math
+from typing import Dict, List, Optional, Sequence
+
+
+class DDSketch:
+    """Mergeable quantile sketch of non-negative values, supporting removal"""
+
+    __slots__ = ("relative_accuracy", "gamma", "_log_gamma", "bins", "zero_count", "count")
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("DDSketch relative accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _index(self, value: float) -> int:
+        """Get the bin of a positive value"""
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        """Get the representative value of a bin, within the accuracy of all its values"""
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        """Count a value ``count`` times; a negative count removes it"""
+        if value < 0:
+            raise ValueError("DDSketch only holds non-negative values")
+        if value == 0:
+            self.zero_count += count
+        else:
+            index = self._index(value)
+            total = self.bins.get(index, 0) + count
+            if total > 0:
+                self.bins[index] = total
+            else:
+                self.bins.pop(index, None)
+        self.count += count
+
+    def remove(self, value: float, count: int = 1) -> None:
+        """Uncount a value previously added"""
+        self.add(value, -count)
+
+    def merge(self, other: "DDSketch") -> None:
+        """Add the counts of another sketch with the same accuracy"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge DDSketches of different accuracy")
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Get the approximate value at quantile ``q`` (0-1), or None when empty"""
+        if self.count <= 0 or not 0 <= q <= 1:
+            return None
+        rank = q * (self.count - 1)
+        cumulative = self.zero_count
+        if rank < cumulative:
+            return 0.0
+        index = None
+        for index in sorted(self.bins):
+            cumulative += self.bins[index]
+            if cumulative > rank:
+                break
+        return self._value(index) if index is not None else 0.0
+
+    def bucket_counts(self, bounds: Sequence[float]) -> List[int]:
+        """
+        Count values per range: zero, then ``(0, b1)``, ``[b1, b2)``, ... ``[bn, inf)``.
+
+        Values are placed by their bin's representative value, so counts
+        near a bound may shift by the sketch's relative accuracy.
+        """
+        counts = [self.zero_count] + [0] * (len(bounds) + 1)
+        for index, count in self.bins.items():
+            value = self._value(index)
+            position = next((i for i, bound in enumerate(bounds) if value < bound), len(bounds))
+            counts[position + 1] += count
+        return counts
@@ -0,0 +1,112 @@
+"""
+Geospatial helpers for PurpleShop: great-circle distances and geohashes
+"""
+import math
+from typing import List, Optional
+
+EARTH_RADIUS_KM = 6371.0088
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9  # ~4.8m x 4.8m cells
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometers"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def geohash_encode(
+    latitude: Optional[float],
+    longitude: Optional[float],
+    precision: int = GEOHASH_PRECISION
+) -> Optional[str]:
+    """Encode a coordinate as a geohash string"""
+    if latitude is None or longitude is None:
+        return None
+
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # Geohash interleaves bits starting with longitude
+
+    while len(chars) < precision:
+        value, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if value >= middle:
+            bits = (bits << 1) | 1
+            bounds[0] = middle
+        else:
+            bits <<= 1
+            bounds[1] = middle
+        even = not even
+
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def geohash_cell_size_km(precision: int, latitude: float) -> tuple:
+    """Get the (height, width) of a geohash cell in kilometers at a latitude"""
+    total_bits = 5 * precision
+    lat_bits = total_bits // 2
+    lon_bits = total_bits - lat_bits
+    height = (180.0 / 2 ** lat_bits) * 111.32
+    width = (360.0 / 2 ** lon_bits) * 111.32 * max(math.cos(math.radians(latitude)), 0.01)
+    return height, width
+
+
+def geohash_cover(latitude: float, longitude: float, radius_km: float) -> List[str]:
+    """
+    Get geohash prefixes whose cells cover a circle.
+
+    The precision is the finest one whose cells are at least as large as the
+    radius, so the cell holding the center plus its eight neighbours always
+    contain the whole circle.
+    """
+    precision = 1
+    for candidate in range(GEOHASH_PRECISION, 0, -1):
+        height, width = geohash_cell_size_km(candidate, latitude)
+        if height >= radius_km and width >= radius_km:
+            precision = candidate
+            break
+
+    height, width = geohash_cell_size_km(precision, latitude)
+    lat_step = height / 111.32
+    lon_step = width / (111.32 * max(math.cos(math.radians(latitude)), 0.01))
+
+    cells = set()
+    for d_lat in (-lat_step, 0.0, lat_step):
+        for d_lon in (-lon_step, 0.0, lon_step):
+            lat = max(-89.999999, min(89.999999, latitude + d_lat))
+            lon = (longitude + d_lon + 180.0) % 360.0 - 180.0
+            cells.add(geohash_encode(lat, lon, precision))
+    return sorted(cells)
+
+
+def geohash_prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    Get the smallest geohash prefix sorting after every hash starting with
+    ``prefix``, or None if there is none. Incrementing within the geohash
+    alphabet keeps range scans independent of the database collation.
+    """
+    chars = list(prefix)
+    while chars:
+        position = _BASE32.index(chars[-1])
+        if position + 1 < len(_BASE32):
+            chars[-1] = _BASE32[position + 1]
+            return "".join(chars)
+        chars.pop()
+    return None
@@ -0,0 +1,97 @@
+"""
+HyperLogLog cardinality sketch
+
+A sketch of precision ``p`` keeps ``2**p`` one-byte registers and
+estimates distinct counts with a standard error of about
+``1.04 / sqrt(2**p)`` (3.25% at the default ``p = 10``, 1 KiB). Sketches of
+the same precision merge by taking register maxima, so daily sketches can
+be combined into any window.
+
+Serialized sketches start with a format byte: sparse sketches store
+``(register, value)`` pairs and dense ones the raw registers, whichever is
+smaller.
+"""
+import hashlib
+import math
+from typing import Iterable, Union
+
+import numpy as np
+
+SPARSE = 0
+DENSE = 1
+
+_PAIR = np.dtype([("index", ">u2"), ("rank", "u1")])
+
+
+def _hash64(value: Union[str, bytes]) -> int:
+    """Stable 64-bit hash, identical across processes"""
+    if isinstance(value, str):
+        value = value.encode()
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """Mergeable distinct-count sketch"""
+
+    __slots__ = ("p", "m", "registers")
+
+    def __init__(self, p: int = 10):
+        if not 4 <= p <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16")
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add(self, value: Union[str, bytes]) -> None:
+        """Count an item"""
+        x = _hash64(value)
+        index = x >> (64 - self.p)
+        rest = x & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Fold another sketch of the same precision into this one"""
+        if other.p != self.p:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        """Estimate the number of distinct items added"""
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m) if m >= 128 else {16: 0.673, 32: 0.697, 64: 0.709}[m]
+        estimate = alpha * m * m / float(np.ldexp(1.0, -self.registers.astype(np.int32)).sum())
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # Linear counting for small sets
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        """Serialize compactly"""
+        indexes = np.flatnonzero(self.registers)
+        if len(indexes) * _PAIR.itemsize < self.m:
+            pairs = np.empty(len(indexes), dtype=_PAIR)
+            pairs["index"] = indexes
+            pairs["rank"] = self.registers[indexes]
+            return bytes([SPARSE, self.p]) + pairs.tobytes()
+        return bytes([DENSE, self.p]) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        """Load a serialized sketch"""
+        sketch = cls(data[1])
+        if data[0] == DENSE:
+            sketch.registers = np.frombuffer(data, dtype=np.uint8, count=sketch.m, offset=2).copy()
+        else:
+            pairs = np.frombuffer(data, dtype=_PAIR, offset=2)
+            sketch.registers[pairs["index"]] = pairs["rank"]
+        return sketch
+
+    @classmethod
+    def union(cls, sketches: Iterable["HyperLogLog"], p: int = 10) -> "HyperLogLog":
+        """Merge several sketches into a new one"""
+        merged = cls(p)
+        for sketch in sketches:
+            merged.merge(sketch)
+        return merged
@@ -0,0 +1,153 @@
+"""
+In-memory inverted index with BM25 scoring
+
+This module has no application imports so that it can be loaded cheaply in
+search shard worker processes.
+"""
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Field weights applied to term frequencies (a lightweight BM25F)
+FIELD_WEIGHTS = {
+    "title": 3,
+    "brand": 2,
+    "model": 2,
+    "tags": 2,
+    "description": 1,
+}
+
+SearchHit = Tuple[float, int]  # (score, product_id)
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    """Lowercase, strip accents and split text into word tokens"""
+    if not value:
+        return []
+    normalized = unicodedata.normalize("NFKD", value.lower())
+    normalized = "".join(c for c in normalized if not unicodedata.combining(c))
+    return [token for token in _TOKEN_RE.findall(normalized) if len(token) > 1]
+
+
+def document_terms(fields: Dict[str, Optional[str]]) -> Counter:
+    """Get weighted term frequencies for a document's text fields"""
+    terms: Counter = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(fields.get(field)):
+            terms[token] += weight
+    return terms
+
+
+class InvertedIndex:
+    """
+    Postings-list index over product text with Okapi BM25 ranking.
+
+    Postings map each term to ``{doc_id: weighted_tf}``. Every document's
+    term counter is kept so updates and removals only touch its own postings.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_terms: Dict[int, Counter] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, doc_id: int, fields: Dict[str, Optional[str]]) -> None:
+        """Index a document, replacing any previous version"""
+        self.remove(doc_id)
+        terms = document_terms(fields)
+        if not terms:
+            return
+
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = frequency
+
+        length = sum(terms.values())
+        self.doc_terms[doc_id] = terms
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+
+    def add_many(self, documents: Iterable[Tuple[int, Dict[str, Optional[str]]]]) -> None:
+        """Index a batch of documents"""
+        for doc_id, fields in documents:
+            self.add(doc_id, fields)
+
+    def remove(self, doc_id: int) -> None:
+        """Remove a document from the index if present"""
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+
+        self.total_length -= self.doc_lengths.pop(doc_id)
+
+    def search(self, query: str, limit: int = 100) -> List[SearchHit]:
+        """Get the top documents for a query as ``(score, doc_id)`` pairs"""
+        doc_count = len(self.doc_lengths)
+        if not doc_count:
+            return []
+
+        average_length = self.total_length / doc_count
+        scores: Dict[int, float] = {}
+
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + (
+                    idf * frequency * (self.k1 + 1) / (frequency + norm)
+                )
+
+        return heapq.nlargest(limit, ((score, doc_id) for doc_id, score in scores.items()))
+
+
+def merge_hits(shard_hits: Sequence[List[SearchHit]], limit: int) -> List[SearchHit]:
+    """Merge per-shard top lists into a global top list"""
+    return heapq.nlargest(limit, (hit for hits in shard_hits for hit in hits))
+
+
+def shard_worker(inbox, outbox) -> None:
+    """
+    Main loop of a search shard process.
+
+    Commands arrive in order on ``inbox`` so a search always sees every
+    update queued before it. Only searches produce a reply on ``outbox``.
+    """
+    index = InvertedIndex()
+    while True:
+        command = inbox.get()
+        operation = command[0]
+
+        if operation == "add":
+            index.add(command[1], command[2])
+        elif operation == "add_many":
+            index.add_many(command[1])
+        elif operation == "remove":
+            index.remove(command[1])
+        elif operation == "clear":
+            index = InvertedIndex()
+        elif operation == "search":
+            request_id, query, limit = command[1:]
+            outbox.put((request_id, index.search(query, limit)))
+        elif operation == "stop":
+            break
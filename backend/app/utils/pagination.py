@@ -0,0 +1,128 @@
+"""
+Keyset (cursor) pagination helpers for PurpleShop API
+
+A cursor is an opaque, URL-safe token holding the sort mode and the sort
+key values of the last row of a page. The next page is everything strictly
+after that key in sort order, which an index on the same columns serves
+without an OFFSET scan and which stays stable under concurrent inserts.
+Decoding checks the sort mode and each value's type against its column, so
+a cursor replayed on another sort or crafted by hand is a validation error
+rather than a failed query.
+
+Cursor values are bound with their column's type, and datetimes are
+compared in one text format on SQLite, which stores ``CURRENT_TIMESTAMP``
+defaults without the fractional seconds Python datetimes bind with.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, List, Sequence
+
+from sqlalchemy import DateTime, func, literal, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.utils.exceptions import ValidationException
+
+
+class _comparable_datetime(FunctionElement):
+    """A datetime expression compared as stored, or normalised on SQLite"""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(_comparable_datetime)
+def _compile_comparable_datetime(element, compiler, **kw):
+    """Compare datetimes natively"""
+    return compiler.process(list(element.clauses)[0], **kw)
+
+
+@compiles(_comparable_datetime, "sqlite")
+def _compile_comparable_datetime_sqlite(element, compiler, **kw):
+    """Compare SQLite's text datetimes with millisecond precision in one format"""
+    return compiler.process(func.strftime("%Y-%m-%d %H:%M:%f", list(element.clauses)[0]), **kw)
+
+
+def _comparable(expression: ColumnElement) -> ColumnElement:
+    """Wrap datetime expressions so they compare consistently on every dialect"""
+    if isinstance(expression.type, DateTime):
+        return _comparable_datetime(expression)
+    return expression
+
+
+def _encode_value(value: Any) -> Any:
+    """Encode a key value as JSON, tagging datetimes"""
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if hasattr(value, "value"):  # Enums
+        return value.value
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """Decode a key value produced by _encode_value"""
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def _matches_type(value: Any, column: ColumnElement) -> bool:
+    """Check that a decoded key value can be bound with its column's type; sort keys are never NULL"""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:  # Untyped expressions: distances and ranks, which are numbers
+        python_type = float
+    if isinstance(value, bool):
+        return python_type is bool
+    if python_type in (float, Decimal):
+        return isinstance(value, (int, float))
+    return isinstance(value, python_type)
+
+
+def encode_cursor(values: Sequence[Any], sort: str) -> str:
+    """Encode the sort mode and the sort key of the last row of a page as a cursor"""
+    payload = json.dumps(
+        {"sort": sort, "key": [_encode_value(v) for v in values]},
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[ColumnElement], sort: str) -> List[Any]:
+    """Decode a cursor of a sort mode into values for the columns of its sort key"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, binascii.Error):
+        raise ValidationException("Invalid pagination cursor")
+
+    if not isinstance(payload, dict) or payload.get("sort") != sort:
+        raise ValidationException("Pagination cursor does not belong to this sort order")
+    values = payload.get("key")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValidationException("Invalid pagination cursor")
+
+    try:
+        values = [_decode_value(v) for v in values]
+    except (TypeError, ValueError):
+        raise ValidationException("Invalid pagination cursor")
+    if not all(_matches_type(value, column) for value, column in zip(values, columns)):
+        raise ValidationException("Invalid pagination cursor")
+    return values
+
+
+def keyset_condition(
+    columns: Sequence[ColumnElement],
+    values: Sequence[Any],
+    descending: bool = True
+) -> ColumnElement:
+    """Build the row-value comparison selecting rows after a cursor"""
+    key = tuple_(*(_comparable(column) for column in columns))
+    after = tuple_(*(
+        _comparable(literal(value, type_=column.type))
+        for column, value in zip(columns, values)
+    ))
+    return key < after if descending else key > after
@@ -0,0 +1,92 @@
+"""
+Compiled response serializers
+
+``compile_serializer`` reads a Pydantic response schema once and generates
+a plain function that builds the schema's JSON shape from any object with
+matching attributes (ORM instances, row records). Field order, float
+coercion and defaults follow the schema, so the output matches
+``Schema(**data).model_dump(mode="json")`` without validating or
+reflecting per object. Values already loaded into an instance's
+``__dict__`` are read from it directly, skipping the ORM attribute
+descriptors. ``JSONBytesResponse`` writes such payloads with
+orjson; routers return it directly, which also skips FastAPI's
+``response_model`` re-validation.
+"""
+import typing
+from typing import Any, Callable, Dict, Iterable, Optional, Type
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+JSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS  # "Z" suffix like Pydantic
+
+Serializer = Callable[[Any], Dict[str, Any]]
+
+
+def _to_float(value: Any) -> Optional[float]:
+    """Coerce to float like a Pydantic float field, keeping None"""
+    return value if value is None or value.__class__ is float else float(value)
+
+
+def _is_float(annotation: Any) -> bool:
+    """Check whether a field is typed float or Optional[float]"""
+    if annotation is float:
+        return True
+    return typing.get_origin(annotation) is typing.Union and set(typing.get_args(annotation)) == {float, type(None)}
+
+
+def compile_serializer(
+    schema: Type[BaseModel],
+    converters: Optional[Dict[str, Callable[[Any], Any]]] = None,
+    defaults: Iterable[str] = ()
+) -> Serializer:
+    """
+    Generate ``serialize(obj) -> dict`` for a response schema.
+
+    Fields are read as attributes of ``obj`` unless a converter computes
+    them from ``obj``; fields listed in ``defaults`` are not read and get
+    the schema default, for callers to fill in.
+    """
+    converters = converters or {}
+    defaults = set(defaults)
+    namespace: Dict[str, Any] = {"_to_float": _to_float, "_no_dict": {}}
+    entries = []
+    for position, (name, field) in enumerate(schema.model_fields.items()):
+        if name in converters:
+            namespace[f"_convert_{position}"] = converters[name]
+            expression = f"_convert_{position}(obj)"
+        elif name in defaults:
+            namespace[f"_default_{position}"] = field.get_default(call_default_factory=True)
+            expression = f"_default_{position}"
+        else:
+            expression = f"(values[{name!r}] if {name!r} in values else obj.{name})"
+            if _is_float(field.annotation):
+                expression = f"_to_float{expression}"
+        entries.append(f"        {name!r}: {expression},")
+
+    function_name = f"serialize_{schema.__name__.lower()}"
+    source = "\n".join([
+        f"def {function_name}(obj):",
+        "    values = getattr(obj, '__dict__', _no_dict)",
+        "    return {",
+        *entries,
+        "    }",
+    ])
+    exec(compile(source, f"<serializer {schema.__module__}.{schema.__name__}>", "exec"), namespace)
+    return namespace[function_name]
+
+
+def dumps(payload: Any) -> bytes:
+    """Encode a serialized payload as JSON bytes"""
+    return orjson.dumps(payload, option=JSON_OPTIONS)
+
+
+class JSONBytesResponse(Response):
+    """JSON response for payloads already in their public shape"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
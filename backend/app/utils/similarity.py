@@ -0,0 +1,83 @@
+"""
+TF-IDF vectors and cosine top-k neighbours with NumPy
+
+Documents are weighted term counters; vectors use sublinear term
+frequencies and smoothed IDF, L2-normalized so a dot product is the cosine
+similarity. Similarities are computed a block of rows at a time to bound
+memory at ``block_size * n_documents`` floats.
+"""
+from collections import Counter
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+Neighbours = List[Tuple[int, float]]  # (row, similarity), most similar first
+
+
+def tfidf_matrix(documents: Sequence[Counter], max_features: int) -> np.ndarray:
+    """
+    Build the L2-normalized TF-IDF matrix of some documents.
+
+    Terms found in a single document cannot make two documents similar, so
+    only terms shared by at least two are kept, the ``max_features`` most
+    common of them.
+    """
+    document_frequency: Counter = Counter()
+    for terms in documents:
+        document_frequency.update(terms.keys())
+
+    shared = [(count, term) for term, count in document_frequency.items() if count > 1]
+    shared.sort(reverse=True)
+    vocabulary = {term: column for column, (_, term) in enumerate(shared[:max_features])}
+
+    matrix = np.zeros((len(documents), len(vocabulary)), dtype=np.float32)
+    for row, terms in enumerate(documents):
+        for term, frequency in terms.items():
+            column = vocabulary.get(term)
+            if column is not None:
+                matrix[row, column] = 1.0 + np.log(frequency)
+    if not vocabulary:
+        return matrix
+
+    frequencies = np.array(
+        [document_frequency[term] for term in vocabulary],
+        dtype=np.float32
+    )
+    matrix *= np.log((1.0 + len(documents)) / (1.0 + frequencies)) + 1.0
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def top_k_similar(
+    matrix: np.ndarray,
+    k: int,
+    min_similarity: float = 0.0,
+    block_size: int = 512
+) -> List[Neighbours]:
+    """Get the ``k`` most cosine-similar other rows of every row"""
+    rows = matrix.shape[0]
+    neighbours: List[Neighbours] = []
+    k = min(k, rows - 1)
+    if k <= 0:
+        return [[] for _ in range(rows)]
+
+    for start in range(0, rows, block_size):
+        stop = min(start + block_size, rows)
+        scores = matrix[start:stop] @ matrix.T
+        scores[np.arange(stop - start), np.arange(start, stop)] = -1.0  # Not itself
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        for columns, values in zip(top.tolist(), top_scores.tolist()):
+            neighbours.append([
+                (column, score)
+                for column, score in zip(columns, values)
+                if score > min_similarity
+            ])
+    return neighbours
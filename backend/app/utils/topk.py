@@ -0,0 +1,63 @@
+"""
+Bounded top-k of items whose scores change
+
+A min-heap holds the current top ``k``; updated scores are pushed as new
+entries and outdated ones are skipped when they reach the top, so an
+update costs ``O(log k)``. The heap is compacted once outdated entries
+outnumber live ones.
+"""
+import heapq
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class TopK:
+    """The ``k`` highest-scoring items"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self.scores: Dict[Hashable, float] = {}  # Live members
+        self._heap: List[Tuple[float, Hashable]] = []
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self.scores
+
+    def _pop_outdated(self) -> None:
+        """Drop heap entries that no longer match a member's score"""
+        heap = self._heap
+        while heap and self.scores.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def min_score(self) -> float:
+        """Get the lowest member score, or -inf while not full"""
+        if len(self.scores) < self.k:
+            return float("-inf")
+        self._pop_outdated()
+        return self._heap[0][0]
+
+    def update(self, item: Hashable, score: float) -> bool:
+        """Offer an item's new score and get whether it is a member"""
+        if item not in self.scores:
+            if score <= self.min_score():
+                return False
+            if len(self.scores) >= self.k:
+                _, evicted = heapq.heappop(self._heap)
+                del self.scores[evicted]
+
+        self.scores[item] = score
+        heapq.heappush(self._heap, (score, item))
+        if len(self._heap) > 2 * max(len(self.scores), self.k):
+            self._heap = [(s, i) for i, s in self.scores.items()]
+            heapq.heapify(self._heap)
+        return True
+
+    def remove(self, item: Hashable) -> None:
+        """Remove an item; its heap entry is dropped lazily"""
+        self.scores.pop(item, None)
+
+    def items(self, limit: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+        """Get members, highest score first"""
+        ranked = sorted(self.scores.items(), key=lambda entry: entry[1], reverse=True)
+        return ranked[:limit] if limit is not None else ranked
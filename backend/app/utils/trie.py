@@ -0,0 +1,126 @@
+"""
+Ranked completion trie for search-as-you-type
+
+Each node caches the top-k completions of its subtree, so a lookup costs
+one walk down the typed prefix. Weight changes mark the nodes on the
+changed keys' paths dirty; their caches are rebuilt from the children's
+caches on the next lookup that reaches them.
+"""
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+Completion = Tuple[str, float]
+
+
+def normalize_phrase(text: Optional[str]) -> str:
+    """Lowercase and collapse whitespace"""
+    return " ".join((text or "").lower().split())
+
+
+class _Node:
+    """Trie node with a cached top-k of its subtree"""
+
+    __slots__ = ("children", "entries", "top", "dirty")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.entries: Dict[str, float] = {}  # Phrases whose key ends here
+        self.top: List[Tuple[float, str]] = []
+        self.dirty = False
+
+
+class CompletionTrie:
+    """
+    Prefix index from keys to weighted phrases.
+
+    A phrase is reachable from its own start and from the start of each of
+    its first ``word_starts`` words, so "iph" completes "apple iphone 13".
+    Weights added for the same phrase accumulate; a phrase whose weight
+    drops to zero is removed.
+    """
+
+    def __init__(self, k: int = 10, max_key_length: int = 40, word_starts: int = 4):
+        self.k = k
+        self.max_key_length = max_key_length
+        self.word_starts = word_starts
+        self.root = _Node()
+        self.weights: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def _keys(self, phrase: str) -> List[str]:
+        """Get the lookup keys of a phrase"""
+        words = phrase.split(" ")
+        keys = []
+        for start in range(min(len(words), self.word_starts)):
+            key = " ".join(words[start:])[:self.max_key_length]
+            if key and key not in keys:
+                keys.append(key)
+        return keys
+
+    def add(self, phrase: str, weight: float) -> None:
+        """Add weight to a phrase (negative to remove weight)"""
+        phrase = normalize_phrase(phrase)
+        if not phrase:
+            return
+
+        total = self.weights.get(phrase, 0.0) + weight
+        if total <= 1e-9:
+            total = 0.0
+            self.weights.pop(phrase, None)
+        else:
+            self.weights[phrase] = total
+
+        for key in self._keys(phrase):
+            node = self.root
+            node.dirty = True
+            for char in key:
+                child = node.children.get(char)
+                if child is None:
+                    if not total:
+                        break
+                    child = node.children[char] = _Node()
+                node = child
+                node.dirty = True
+            else:
+                if total:
+                    node.entries[phrase] = total
+                else:
+                    node.entries.pop(phrase, None)
+
+    def _refresh(self, node: _Node) -> List[Tuple[float, str]]:
+        """Rebuild the cached top-k of a dirty node from its children"""
+        if not node.dirty:
+            return node.top
+
+        best: Dict[str, float] = dict(node.entries)
+        empty = []
+        for char, child in node.children.items():
+            top = self._refresh(child)
+            if not top and not child.children:
+                empty.append(char)
+            for score, phrase in top:
+                if score > best.get(phrase, 0.0):
+                    best[phrase] = score
+        for char in empty:
+            del node.children[char]
+
+        node.top = heapq.nlargest(self.k, ((score, phrase) for phrase, score in best.items()))
+        node.dirty = False
+        return node.top
+
+    def refresh(self) -> None:
+        """Rebuild every dirty cache, e.g. after a bulk load"""
+        self._refresh(self.root)
+
+    def complete(self, prefix: str, limit: Optional[int] = None) -> List[Completion]:
+        """Get the best weighted phrases reachable from a prefix"""
+        prefix = normalize_phrase(prefix)[:self.max_key_length]
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        top = self._refresh(node)
+        return [(phrase, score) for score, phrase in top[:limit or self.k]]
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for PurpleShop backend
+"""
+import argparse
+import asyncio
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.logging import logger
+
+
+async def run_indexes(args) -> None:
+    """Create missing indexes concurrently and drop retired ones"""
+    from app.core.indexes import sync_indexes
+
+    statements = await sync_indexes(dry_run=args.dry_run, drop_retired=not args.keep_retired)
+    if not statements:
+        logger.info("✅ Indexes are up to date")
+    for statement in statements:
+        print(f"{statement};")
+
+
+async def run_advise(args) -> None:
+    """Report router queries that still fall back to sequential scans"""
+    from app.services.index_advisor import advise_indexes
+
+    reports = await advise_indexes(strict=args.strict)
+    width = max(len(report.name) for report in reports)
+    for report in reports:
+        if report.ok:
+            detail = ", ".join(report.indexes) or "no table scan"
+            print(f"OK    {report.name:<{width}}  {detail}")
+        else:
+            print(f"SCAN  {report.name:<{width}}  seq scan on {', '.join(report.seq_scans)}")
+            if args.verbose:
+                print(f"      {report.sql}")
+
+    slow = sum(1 for report in reports if not report.ok)
+    logger.info(f"🔎 {slow}/{len(reports)} queries use sequential scans")
+
+
+async def run_tags(args) -> None:
+    """Copy JSON product tags into the normalized tag tables"""
+    from app.core.database import async_session_maker
+    from app.services.tags import backfill_product_tags
+
+    async with async_session_maker() as session:
+        migrated = await backfill_product_tags(session)
+    logger.info(f"🏷️ Tags backfilled for {migrated} products")
+
+
+async def run_geohash(args) -> None:
+    """Add the geohash column where missing and fill it for existing products"""
+    from app.services.geo import backfill_geohashes, install_geohash
+
+    async with engine.begin() as conn:
+        await install_geohash(conn)
+    filled = await backfill_geohashes(args.batch_size)
+    logger.info(f"📍 Geohashes backfilled for {filled} products")
+
+
+async def run_related(args) -> None:
+    """Recompute the related products of every category"""
+    from app.services.related import rebuild_related_products
+
+    products = await rebuild_related_products()
+    logger.info(f"🔗 Related products computed for {products} products")
+
+
+async def run_recommendations(args) -> None:
+    """Rebuild favorites co-occurrence neighbors"""
+    from app.services.recommendations import rebuild_recommendations
+
+    products = await rebuild_recommendations()
+    logger.info(f"⭐ Recommendation neighbors stored for {products} products")
+
+
+async def run_counts(args) -> None:
+    """Recompute denormalized counts from their source rows"""
+    from app.services.counters import reconcile_counts
+
+    corrected = await reconcile_counts(chunk_size=args.chunk_size, concurrency=args.concurrency)
+    for name, rows in corrected.items():
+        print(f"{name:<24}  {rows} corrected")
+    logger.info(f"🧮 Counts reconciled, {sum(corrected.values())} rows corrected")
+
+
+def _sample_products(count: int) -> list:
+    """Build detached products with sellers, shaped like a listing page"""
+    from datetime import datetime, timezone
+
+    from app.models.product import Product, ProductCondition, ProductStatus, ProductType
+    from app.models.user import User
+
+    now = datetime.now(timezone.utc)
+    seller = User(id=1, email="seller@example.com", username="seller", first_name="Sam", last_name="Seller",
+                  location="Paris", hashed_password="x", created_at=now, updated_at=now)
+    return [
+        Product(
+            id=i, title=f"Product {i}", description="A well kept item " * 8, price=10.0 + i,
+            category="electronics", subcategory="phones", condition=ProductCondition.GOOD,
+            product_type=ProductType.SECOND_HAND, location="Paris", latitude=48.85, longitude=2.35,
+            status=ProductStatus.ACTIVE, is_featured=False, views_count=i * 3, favorites_count=i,
+            inquiries_count=0, tags='["phone", "android"]', brand="Acme", model="X1", language="en",
+            shipping_available=True, shipping_cost=4.5, local_pickup=True, seller_id=1, seller=seller,
+            created_at=now, updated_at=now
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+async def run_benchmark(args) -> None:
+    """Compare listing serialization through Pydantic models with compiled serializers"""
+    import json
+    import time
+
+    from app.routers.products import _product_list_response
+    from app.schemas.base import PaginationParams
+    from app.schemas.product import Product as ProductSchema, ProductList, serialize_product
+
+    products = _sample_products(args.products)
+    pagination = PaginationParams(page=1, size=args.products)
+
+    def reflective() -> bytes:
+        # to_dict, schema validation, then FastAPI's response_model pass
+        page = ProductList(
+            products=[ProductSchema(**product.to_public_dict()) for product in products],
+            total=len(products), page=1, size=len(products), pages=1
+        )
+        content = ProductList.model_validate(page.model_dump()).model_dump(mode="json")
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def compiled() -> bytes:
+        return _product_list_response(
+            [serialize_product(product) for product in products], pagination, len(products), "exact"
+        ).body
+
+    if json.loads(reflective()) != json.loads(compiled()):
+        raise SystemExit("Compiled serializer output differs from the Pydantic response")
+
+    timings = {}
+    for name, render in (("pydantic", reflective), ("compiled", compiled)):
+        render()
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            render()
+        timings[name] = (time.perf_counter() - start) / args.iterations
+
+    for name, seconds in timings.items():
+        print(f"{name:<9} {seconds * 1e6:9.1f} µs/page  {1 / seconds:9.0f} pages/s")
+    logger.info(
+        f"⏱️ Compiled serializers are {timings['pydantic'] / timings['compiled']:.1f}x faster "
+        f"for {args.products}-product pages"
+    )
+
+
+def main():
+    """Main entry point for maintenance commands"""
+
+    parser = argparse.ArgumentParser(description="PurpleShop Backend Maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    indexes = subparsers.add_parser(
+        "indexes",
+        help="Create missing indexes (concurrently on PostgreSQL) and drop retired ones"
+    )
+    indexes.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the statements without executing them"
+    )
+    indexes.add_argument(
+        "--keep-retired",
+        action="store_true",
+        help="Do not drop retired indexes"
+    )
+    indexes.set_defaults(handler=run_indexes)
+
+    advise = subparsers.add_parser(
+        "advise",
+        help="EXPLAIN the router queries and report sequential scans"
+    )
+    advise.add_argument(
+        "--strict",
+        action="store_true",
+        help="Disable sequential scans in the planner to check index coverage on small databases"
+    )
+    advise.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print the SQL of queries that scan sequentially"
+    )
+    advise.set_defaults(handler=run_advise)
+
+    tags = subparsers.add_parser(
+        "tags",
+        help="Backfill product_tags from the JSON tags column and recount tags"
+    )
+    tags.set_defaults(handler=run_tags)
+
+    geohash = subparsers.add_parser(
+        "geohash",
+        help="Add and backfill the geohash column used by radius searches"
+    )
+    geohash.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Products per transaction"
+    )
+    geohash.set_defaults(handler=run_geohash)
+
+    related = subparsers.add_parser(
+        "related",
+        help="Recompute the related products of every product"
+    )
+    related.set_defaults(handler=run_related)
+
+    recommendations = subparsers.add_parser(
+        "recommendations",
+        help="Rebuild the favorites co-occurrence neighbors of every product"
+    )
+    recommendations.set_defaults(handler=run_recommendations)
+
+    counts = subparsers.add_parser(
+        "counts",
+        help="Recompute products, favorites and reviews counts from their source rows"
+    )
+    counts.add_argument(
+        "--chunk-size",
+        type=int,
+        default=settings.RECONCILE_CHUNK_SIZE,
+        help="Ids per transaction"
+    )
+    counts.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.RECONCILE_CONCURRENCY,
+        help="Chunks reconciled in parallel"
+    )
+    counts.set_defaults(handler=run_counts)
+
+    benchmark = subparsers.add_parser(
+        "benchmark",
+        help="Benchmark listing serialization, Pydantic models against compiled serializers"
+    )
+    benchmark.add_argument(
+        "--products",
+        type=int,
+        default=20,
+        help="Products per listing page"
+    )
+    benchmark.add_argument(
+        "--iterations",
+        type=int,
+        default=2000,
+        help="Pages rendered per serializer"
+    )
+    benchmark.set_defaults(handler=run_benchmark)
+
+    args = parser.parse_args()
+    logger.info(f"📚 Database: {settings.SQLALCHEMY_DATABASE_URI}")
+
+    async def run():
+        try:
+            await args.handler(args)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -29,8 +29,8 @@ def run_command(command, shell=True):
 def check_python_version():
     """Check if Python version is compatible"""
     version = sys.version_info
-    if version.major < 3 or (version.major == 3 and version.minor < 8):
-        print("❌ Python 3.8+ is required")
+    if version.major < 3 or (version.major == 3 and version.minor < 9):
+        print("❌ Python 3.9+ is required")
         return False
     print(f"✅ Python {version.major}.{version.minor}.{version.micro} detected")
     return True
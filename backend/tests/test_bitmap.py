@@ -0,0 +1,95 @@
+"""
+Roaring bitmap tests
+"""
+import random
+
+import pytest
+
+from app.utils.bitmap import ARRAY_CONTAINER_MAX, RoaringBitmap
+
+
+def _values(count, spread, seed):
+    """Get random values spread over a few containers"""
+    rng = random.Random(seed)
+    return {rng.randrange(spread) for _ in range(count)}
+
+
+SPARSE = _values(500, 1 << 20, seed=1)
+DENSE = _values(30000, 3 << 16, seed=2)
+MIXED = _values(9000, 1 << 17, seed=3) | _values(100, 1 << 22, seed=4)
+
+
+def test_empty_bitmap():
+    """An empty bitmap is falsy and has no values"""
+    bitmap = RoaringBitmap()
+
+    assert not bitmap
+    assert len(bitmap) == 0
+    assert list(bitmap) == []
+    assert list(bitmap.descending()) == []
+    assert 5 not in bitmap
+    assert not RoaringBitmap.intersect_all([])
+    assert not RoaringBitmap.union_all([])
+
+
+@pytest.mark.parametrize("values", [SPARSE, DENSE, MIXED])
+def test_holds_the_values_added(values):
+    """Membership, length and order match a set, in array and bitset containers"""
+    bitmap = RoaringBitmap(values)
+
+    assert len(bitmap) == len(values)
+    assert list(bitmap) == sorted(values)
+    assert list(bitmap.descending()) == sorted(values, reverse=True)
+    assert all(value in bitmap for value in values)
+    assert not any(value in bitmap for value in range(0, 1 << 16, 97) if value not in values)
+
+
+@pytest.mark.parametrize("a, b", [(SPARSE, DENSE), (DENSE, MIXED), (MIXED, SPARSE), (DENSE, DENSE)])
+def test_set_operations_match_sets(a, b):
+    """Intersections and unions match Python sets across container types"""
+    left, right = RoaringBitmap(a), RoaringBitmap(b)
+
+    assert list(left & right) == sorted(a & b)
+    assert list(left | right) == sorted(a | b)
+    assert list(RoaringBitmap.intersect_all([left, right, RoaringBitmap(a | b)])) == sorted(a & b)
+    assert list(RoaringBitmap.union_all([left, right])) == sorted(a | b)
+
+
+def test_discard_shrinks_containers():
+    """Removing values keeps the set right and turns sparse bitsets back into arrays"""
+    values = set(range(ARRAY_CONTAINER_MAX + 100))
+    bitmap = RoaringBitmap(values)
+    assert isinstance(bitmap._containers[0], int)
+
+    for value in range(0, ARRAY_CONTAINER_MAX + 100, 2):
+        bitmap.discard(value)
+        values.discard(value)
+    bitmap.discard(1 << 30)
+
+    assert isinstance(bitmap._containers[0], list)
+    assert list(bitmap) == sorted(values)
+    for value in values:
+        bitmap.discard(value)
+    assert not bitmap
+    assert bitmap._containers == {}
+
+
+@pytest.mark.parametrize("values", [SPARSE, DENSE, MIXED])
+def test_descending_below_a_bound(values):
+    """Descending iteration starts below the bound, also inside a container"""
+    bitmap = RoaringBitmap(values)
+    for below in (0, 70000, (1 << 16) + 123, 1 << 30):
+        assert list(bitmap.descending(below)) == sorted((v for v in values if v < below), reverse=True)
+
+
+def test_results_do_not_share_containers():
+    """Results and copies can be changed without touching their sources"""
+    source = RoaringBitmap([1, 2, 3, 1 << 17])
+    single = RoaringBitmap.intersect_all([source])
+    union = source | RoaringBitmap([4])
+    copy = source.copy()
+    for bitmap in (single, union, copy):
+        bitmap.add(99)
+        bitmap.discard(1)
+
+    assert list(source) == [1, 2, 3, 1 << 17]
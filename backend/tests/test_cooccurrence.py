@@ -0,0 +1,107 @@
+"""
+Item-item co-occurrence tests
+"""
+import math
+import random
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+from app.utils.cooccurrence import CooccurrenceMatrix
+
+
+def _baskets(users, items_per_user, catalog, seed):
+    """Get random baskets as user -> distinct items"""
+    rng = random.Random(seed)
+    return {
+        user: rng.sample(range(1, catalog + 1), rng.randint(1, items_per_user))
+        for user in range(users)
+    }
+
+
+def _arrays(baskets):
+    """Flatten baskets into the parallel arrays add_baskets takes"""
+    users = [user for user, items in baskets.items() for _ in items]
+    items = [item for items in baskets.values() for item in items]
+    return np.array(users), np.array(items)
+
+
+def _exact_neighbors(baskets, n):
+    """Compute weighted cosine neighbors pair by pair"""
+    pair_weights, item_weights = defaultdict(float), defaultdict(float)
+    for items in baskets.values():
+        weight = 1.0 / math.log2(1.0 + len(items))
+        for item in items:
+            item_weights[item] += weight
+        for a in items:
+            for b in items:
+                if a < b:
+                    pair_weights[a, b] += weight
+
+    scored = defaultdict(list)
+    for (a, b), weight in pair_weights.items():
+        score = weight / math.sqrt(item_weights[a] * item_weights[b])
+        scored[a].append((b, score))
+        scored[b].append((a, score))
+    return {
+        item: sorted(pairs, key=lambda pair: (-pair[1], pair[0]))[:n]
+        for item, pairs in scored.items()
+    }
+
+
+def _assert_same_neighbors(actual, expected):
+    """Neighbor lists match, scores up to float rounding"""
+    assert actual.keys() == expected.keys()
+    for item, pairs in expected.items():
+        assert [neighbor for neighbor, _ in actual[item]] == [neighbor for neighbor, _ in pairs]
+        assert [score for _, score in actual[item]] == pytest.approx([score for _, score in pairs])
+
+
+def test_empty_input_has_no_neighbors():
+    """No baskets, or only single-item baskets, give no neighbors"""
+    matrix = CooccurrenceMatrix()
+    matrix.add_baskets(np.array([], dtype=np.int64), np.array([], dtype=np.int64))
+    assert matrix.top_neighbors(5) == {}
+
+    matrix.add_baskets(np.array([1, 2]), np.array([10, 11]))
+    assert matrix.top_neighbors(5) == {}
+
+
+def test_scores_match_weighted_cosine():
+    """Scores and rankings match a pair-by-pair computation"""
+    baskets = _baskets(users=300, items_per_user=8, catalog=40, seed=1)
+    matrix = CooccurrenceMatrix()
+    matrix.add_baskets(*_arrays(baskets))
+
+    _assert_same_neighbors(matrix.top_neighbors(5), _exact_neighbors(baskets, 5))
+
+
+def test_chunks_merge_into_the_same_matrix():
+    """Baskets streamed in chunks, with compaction on the way, add up to one pass"""
+    baskets = _baskets(users=300, items_per_user=8, catalog=40, seed=2)
+    matrix = CooccurrenceMatrix(max_pending=50)
+    users = list(baskets)
+    for start in range(0, len(users), 25):
+        matrix.add_baskets(*_arrays({user: baskets[user] for user in users[start:start + 25]}))
+
+    _assert_same_neighbors(matrix.top_neighbors(5), _exact_neighbors(baskets, 5))
+
+
+def test_baskets_are_capped():
+    """Items past max_basket in a basket are ignored"""
+    matrix = CooccurrenceMatrix(max_basket=2)
+    matrix.add_baskets(np.array([1, 1, 1]), np.array([10, 11, 12]))
+
+    assert matrix.top_neighbors(5) == {10: [(11, 1.0)], 11: [(10, 1.0)]}
+
+
+def test_min_count_and_candidates_filter_neighbors():
+    """Rare pairs and non-candidate neighbors are dropped"""
+    baskets = {1: [10, 11], 2: [10, 11], 3: [10, 12]}
+    matrix = CooccurrenceMatrix()
+    matrix.add_baskets(*_arrays(baskets))
+
+    assert set(matrix.top_neighbors(5, min_count=2)) == {10, 11}
+    restricted = matrix.top_neighbors(5, candidates=np.array([12]))
+    assert {item: [n for n, _ in pairs] for item, pairs in restricted.items()} == {10: [12]}
@@ -0,0 +1,113 @@
+"""
+DDSketch quantile sketch tests
+"""
+import random
+
+import pytest
+
+from app.utils.ddsketch import DDSketch
+
+QUANTILES = [0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0]
+
+
+def _exact_quantile(values, q):
+    """Get the value at the rank DDSketch.quantile targets"""
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def _assert_accurate(sketch, values):
+    """Every quantile is within the sketch's relative accuracy of the exact one"""
+    for q in QUANTILES:
+        exact = _exact_quantile(values, q)
+        assert sketch.quantile(q) == pytest.approx(exact, rel=sketch.relative_accuracy, abs=1e-9)
+
+
+def _prices(count, seed):
+    """Get log-normally spread prices, with a few free items"""
+    rng = random.Random(seed)
+    return [0.0 if rng.random() < 0.05 else round(rng.lognormvariate(3, 1.5), 2) for _ in range(count)]
+
+
+def test_empty_sketch_has_no_quantiles():
+    """An empty sketch answers None and counts nothing"""
+    sketch = DDSketch()
+
+    assert sketch.quantile(0.5) is None
+    assert sketch.bucket_counts([10, 100]) == [0, 0, 0, 0]
+
+
+def test_quantiles_are_within_relative_accuracy():
+    """Quantiles stay within 1% of the exact values, zeros included"""
+    values = _prices(5000, seed=1)
+    sketch = DDSketch()
+    for value in values:
+        sketch.add(value)
+
+    assert sketch.count == len(values)
+    _assert_accurate(sketch, values)
+
+
+def test_removal_matches_sketch_of_remaining_values():
+    """Removing values leaves the bins of a sketch that never saw them"""
+    values = _prices(3000, seed=2)
+    removed, kept = values[:1000], values[1000:]
+    sketch = DDSketch()
+    for value in values:
+        sketch.add(value)
+    for value in removed:
+        sketch.remove(value)
+    fresh = DDSketch()
+    for value in kept:
+        fresh.add(value)
+
+    assert (sketch.bins, sketch.zero_count, sketch.count) == (fresh.bins, fresh.zero_count, fresh.count)
+    _assert_accurate(sketch, kept)
+
+
+def test_removing_everything_empties_the_sketch():
+    """Bins drop out once their count reaches zero"""
+    sketch = DDSketch()
+    for value in (1.0, 2.5, 0.0, 2.5):
+        sketch.add(value)
+    for value in (2.5, 0.0, 1.0, 2.5):
+        sketch.remove(value)
+
+    assert sketch.bins == {}
+    assert sketch.count == 0
+    assert sketch.quantile(0.5) is None
+
+
+def test_merge_matches_sketch_of_all_values():
+    """Merged sketches answer like one sketch of both inputs"""
+    a_values, b_values = _prices(2000, seed=3), _prices(2000, seed=4)
+    a, b = DDSketch(), DDSketch()
+    for value in a_values:
+        a.add(value)
+    for value in b_values:
+        b.add(value)
+    a.merge(b)
+
+    assert a.count == 4000
+    _assert_accurate(a, a_values + b_values)
+
+
+def test_merge_rejects_other_accuracy():
+    """Sketches of different accuracy do not merge"""
+    with pytest.raises(ValueError):
+        DDSketch(0.01).merge(DDSketch(0.02))
+
+
+def test_negative_values_are_rejected():
+    """Only non-negative values can be counted"""
+    with pytest.raises(ValueError):
+        DDSketch().add(-1)
+
+
+def test_bucket_counts():
+    """Values are counted per price range, zero first"""
+    sketch = DDSketch()
+    for value in (0, 0, 5, 9.5, 10.5, 50, 150):
+        sketch.add(value)
+
+    assert sketch.bucket_counts([10, 100]) == [2, 2, 2, 1]
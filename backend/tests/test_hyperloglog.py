@@ -0,0 +1,67 @@
+"""
+HyperLogLog sketch tests
+"""
+import pytest
+
+from app.utils.hyperloglog import DENSE, SPARSE, HyperLogLog
+
+
+def _sketch(values, p=10):
+    """Build a sketch of some values"""
+    sketch = HyperLogLog(p)
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+def test_empty_sketch_counts_zero():
+    """A sketch nothing was added to estimates zero, also after a round trip"""
+    sketch = HyperLogLog()
+
+    assert sketch.count() == 0
+    assert HyperLogLog.from_bytes(sketch.to_bytes()).count() == 0
+
+
+@pytest.mark.parametrize("distinct", [10, 100, 1000, 20000])
+def test_count_is_within_three_standard_errors(distinct):
+    """Estimates stay within 3 x 1.04 / sqrt(m) of the true count, duplicates included"""
+    sketch = _sketch(f"viewer-{i % distinct}" for i in range(distinct * 3))
+    error = 3 * 1.04 / sketch.m ** 0.5
+
+    assert abs(sketch.count() - distinct) <= error * distinct
+
+
+def test_merge_matches_sketch_of_union():
+    """Merging sketches gives the registers of a sketch of the combined items"""
+    a = _sketch(f"user-{i}" for i in range(0, 3000))
+    b = _sketch(f"user-{i}" for i in range(2000, 5000))
+    merged = HyperLogLog.union([a, b])
+
+    assert (merged.registers == _sketch(f"user-{i}" for i in range(5000)).registers).all()
+    assert abs(merged.count() - 5000) <= 3 * 1.04 / merged.m ** 0.5 * 5000
+
+
+def test_merge_rejects_other_precision():
+    """Sketches of different precision do not merge"""
+    with pytest.raises(ValueError):
+        HyperLogLog(10).merge(HyperLogLog(12))
+
+
+@pytest.mark.parametrize("p", [3, 17])
+def test_precision_is_bounded(p):
+    """Precision outside 4..16 is rejected"""
+    with pytest.raises(ValueError):
+        HyperLogLog(p)
+
+
+@pytest.mark.parametrize("distinct, layout", [(20, SPARSE), (5000, DENSE)])
+def test_serialization_round_trips(distinct, layout):
+    """Small sketches serialize sparse, large ones dense, and both load back unchanged"""
+    sketch = _sketch((f"item-{i}" for i in range(distinct)), p=8)
+    data = sketch.to_bytes()
+    loaded = HyperLogLog.from_bytes(data)
+
+    assert data[0] == layout
+    assert loaded.p == 8
+    assert (loaded.registers == sketch.registers).all()
+    assert loaded.count() == sketch.count()
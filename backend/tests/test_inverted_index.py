@@ -0,0 +1,145 @@
+"""
+BM25 inverted index tests
+"""
+import math
+import queue
+import random
+
+import pytest
+
+from app.utils.inverted_index import (
+    InvertedIndex,
+    document_terms,
+    merge_hits,
+    shard_worker,
+    tokenize
+)
+
+WORDS = ["bike", "road", "red", "lamp", "oak", "desk", "camera", "lens", "phone", "case"]
+
+
+def _documents(count, seed):
+    """Get random product documents"""
+    rng = random.Random(seed)
+    return [
+        (doc_id, {
+            "title": " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))),
+            "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 12))),
+            "brand": rng.choice([None, "Acme", "Orbea"])
+        })
+        for doc_id in range(1, count + 1)
+    ]
+
+
+def _bm25(index, query, doc_id):
+    """Score one document with the textbook BM25 formula"""
+    terms = index.doc_terms[doc_id]
+    average = sum(index.doc_lengths.values()) / len(index.doc_lengths)
+    score = 0.0
+    for term in set(tokenize(query)):
+        matches = sum(term in counter for counter in index.doc_terms.values())
+        if term not in terms:
+            continue
+        idf = math.log(1 + (len(index) - matches + 0.5) / (matches + 0.5))
+        length = index.k1 * (1 - index.b + index.b * index.doc_lengths[doc_id] / average)
+        score += idf * terms[term] * (index.k1 + 1) / (terms[term] + length)
+    return score
+
+
+def test_tokenize_normalizes_text():
+    """Text is lowercased, stripped of accents and split, without one-letter tokens"""
+    assert tokenize("Cámara Réflex, 2 lentes & a CASE") == ["camara", "reflex", "lentes", "case"]
+    assert tokenize(None) == []
+    assert document_terms({"title": "Red bike", "description": "red"}) == {"red": 4, "bike": 3}
+
+
+def test_empty_index_finds_nothing():
+    """An empty index, and documents without text, give no hits"""
+    index = InvertedIndex()
+    assert index.search("bike") == []
+
+    index.add(1, {"title": "", "description": None})
+    assert len(index) == 0
+    assert index.search("bike") == []
+
+
+def test_scores_match_bm25():
+    """Hits are every matching document, ranked by BM25 over weighted fields"""
+    index = InvertedIndex()
+    index.add_many(_documents(200, seed=1))
+
+    for query in ("bike", "red road bike", "acme lamp", "nothing here"):
+        hits = index.search(query, limit=1000)
+        expected = sorted(
+            ((_bm25(index, query, doc_id), doc_id) for doc_id in index.doc_terms),
+            reverse=True
+        )
+        expected = [(score, doc_id) for score, doc_id in expected if score > 0]
+        assert [doc_id for _, doc_id in hits] == [doc_id for _, doc_id in expected]
+        assert [score for score, _ in hits] == pytest.approx([score for score, _ in expected])
+
+
+def test_title_outranks_description():
+    """A term in the title weighs more than the same term in the description"""
+    index = InvertedIndex()
+    index.add(1, {"title": "oak desk", "description": "lamp"})
+    index.add(2, {"title": "lamp", "description": "oak desk"})
+
+    assert [doc_id for _, doc_id in index.search("lamp")] == [2, 1]
+
+
+def test_remove_and_replace_match_fresh_index():
+    """Removed and re-indexed documents leave the state of an index built without them"""
+    documents = dict(_documents(100, seed=2))
+    replacements = dict(_documents(20, seed=3))
+    index = InvertedIndex()
+    index.add_many(documents.items())
+    for doc_id in range(1, 41):
+        index.remove(doc_id)
+        del documents[doc_id]
+    for doc_id, fields in replacements.items():
+        index.add(doc_id + 40, fields)
+        documents[doc_id + 40] = fields
+    index.remove(10_000)
+
+    fresh = InvertedIndex()
+    fresh.add_many(documents.items())
+    assert index.postings == fresh.postings
+    assert index.total_length == fresh.total_length
+    assert index.search("red bike case") == fresh.search("red bike case")
+
+    for doc_id in documents:
+        index.remove(doc_id)
+    assert (index.postings, index.total_length, len(index)) == ({}, 0, 0)
+
+
+def test_merge_hits_keeps_global_top():
+    """Per-shard top lists merge into one ranking cut to the limit"""
+    shards = [[(3.0, 1), (1.0, 4)], [], [(2.5, 2), (2.0, 3)]]
+
+    assert merge_hits(shards, 3) == [(3.0, 1), (2.5, 2), (2.0, 3)]
+    assert merge_hits([[], []], 3) == []
+
+
+def test_shard_worker_applies_commands_in_order():
+    """A shard replies to searches with every earlier update applied"""
+    inbox, outbox = queue.Queue(), queue.Queue()
+    commands = [
+        ("add_many", [(1, {"title": "red bike"}), (2, {"title": "road bike"})]),
+        ("search", 1, "bike", 10),
+        ("remove", 1),
+        ("add", 3, {"title": "bike lamp"}),
+        ("search", 2, "red bike", 10),
+        ("clear",),
+        ("search", 3, "bike", 10),
+        ("stop",)
+    ]
+    for command in commands:
+        inbox.put(command)
+    shard_worker(inbox, outbox)
+
+    replies = [outbox.get_nowait() for _ in range(3)]
+    assert [request_id for request_id, _ in replies] == [1, 2, 3]
+    assert {doc_id for _, doc_id in replies[0][1]} == {1, 2}
+    assert {doc_id for _, doc_id in replies[1][1]} == {2, 3}
+    assert replies[2][1] == []
@@ -0,0 +1,80 @@
+"""
+Bounded top-k tests
+"""
+import random
+
+from app.utils.topk import TopK
+
+
+def test_empty_topk():
+    """An empty top-k has no members and accepts any score"""
+    top = TopK(3)
+
+    assert len(top) == 0
+    assert top.items() == []
+    assert top.min_score() == float("-inf")
+
+
+def test_keeps_highest_scores_in_order():
+    """Only the k highest scores are kept, highest first"""
+    top = TopK(3)
+    for item, score in [("a", 5), ("b", 1), ("c", 9), ("d", 3), ("e", 7)]:
+        top.update(item, score)
+
+    assert top.items() == [("c", 9), ("e", 7), ("a", 5)]
+    assert top.items(limit=2) == [("c", 9), ("e", 7)]
+    assert "b" not in top
+    assert top.min_score() == 5
+
+
+def test_low_score_is_not_admitted():
+    """A newcomer that does not beat the lowest member is turned away"""
+    top = TopK(2)
+    top.update("a", 5)
+    top.update("b", 4)
+
+    assert top.update("c", 4) is False
+    assert top.update("d", 6) is True
+    assert top.items() == [("d", 6), ("a", 5)]
+
+
+def test_rising_scores_match_exact_ranking():
+    """With scores that only grow, the members are the exact top k"""
+    rng = random.Random(7)
+    top = TopK(10)
+    exact = {}
+    for _ in range(5000):
+        item = rng.randrange(200)
+        exact[item] = exact.get(item, 0) + rng.random()
+        top.update(item, exact[item])
+
+    ranked = sorted(exact.items(), key=lambda entry: entry[1], reverse=True)
+    assert top.items() == ranked[:10]
+    assert len(top._heap) <= 2 * top.k
+
+
+def test_member_score_can_drop():
+    """A member's lowered score is used for ranking and eviction"""
+    top = TopK(2)
+    top.update("a", 10)
+    top.update("b", 8)
+    top.update("a", 1)
+
+    assert top.min_score() == 1
+    assert top.update("c", 5) is True
+    assert top.items() == [("b", 8), ("c", 5)]
+
+
+def test_remove_frees_a_slot():
+    """A removed item leaves room, and its stale heap entry is skipped"""
+    top = TopK(2)
+    top.update("a", 1)
+    top.update("b", 9)
+    top.remove("a")
+    top.remove("missing")
+
+    assert top.min_score() == float("-inf")
+    assert top.update("c", 0.5) is True
+    assert top.items() == [("b", 9), ("c", 0.5)]
+    assert top.update("d", 2) is True
+    assert top.items() == [("b", 9), ("d", 2)]
@@ -0,0 +1,104 @@
+"""
+Completion trie tests
+"""
+import random
+
+from app.utils.trie import CompletionTrie, normalize_phrase
+
+WORDS = ["apple", "iphone", "case", "red", "bike", "road", "kids", "lamp", "desk", "oak"]
+
+
+def _phrases(count, seed):
+    """Get random weighted phrases of one to four words"""
+    rng = random.Random(seed)
+    return [
+        (" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))), rng.randint(1, 50))
+        for _ in range(count)
+    ]
+
+
+def _expected(trie, weights, prefix):
+    """Rank every phrase reachable from a prefix by brute force"""
+    matches = [
+        (score, phrase) for phrase, score in weights.items()
+        if any(key.startswith(prefix) for key in trie._keys(phrase))
+    ]
+    return [(phrase, score) for score, phrase in sorted(matches, reverse=True)[:trie.k]]
+
+
+def _assert_matches(trie, weights):
+    """Every one- and two-letter prefix, and some longer ones, rank like brute force"""
+    prefixes = {word[:length] for word in WORDS for length in (1, 2, 4)} | {"", "apple i", "zz"}
+    for prefix in prefixes:
+        assert trie.complete(prefix) == _expected(trie, weights, prefix), prefix
+
+
+def test_empty_trie_completes_nothing():
+    """An empty trie has no completions, and blank phrases are not added"""
+    trie = CompletionTrie()
+    trie.add("   ", 5)
+
+    assert len(trie) == 0
+    assert trie.complete("") == []
+    assert trie.complete("a") == []
+
+
+def test_completes_from_every_word_start():
+    """A phrase completes from its first word_starts words, normalized"""
+    trie = CompletionTrie(word_starts=2)
+    trie.add("  Apple   iPhone 13 ", 3)
+
+    assert normalize_phrase("  Apple   iPhone 13 ") == "apple iphone 13"
+    assert trie.complete("APP") == [("apple iphone 13", 3)]
+    assert trie.complete("iph") == [("apple iphone 13", 3)]
+    assert trie.complete("13") == []
+
+
+def test_ranking_matches_brute_force():
+    """Cached top-k lists match a scan of every phrase, weights accumulated"""
+    trie = CompletionTrie(k=5)
+    weights = {}
+    for phrase, weight in _phrases(400, seed=1):
+        trie.add(phrase, weight)
+        weights[phrase] = weights.get(phrase, 0) + weight
+
+    _assert_matches(trie, weights)
+
+
+def test_removal_updates_cached_rankings():
+    """Lowered and removed phrases drop out of cached lists and empty branches are pruned"""
+    trie = CompletionTrie(k=5)
+    weights = {}
+    for phrase, weight in _phrases(300, seed=2):
+        trie.add(phrase, weight)
+        weights[phrase] = weights.get(phrase, 0) + weight
+    trie.refresh()
+
+    rng = random.Random(3)
+    for phrase in rng.sample(sorted(weights), 150):
+        if rng.random() < 0.5:
+            trie.add(phrase, -weights.pop(phrase))
+        else:
+            trie.add(phrase, -1)
+            weights[phrase] -= 1
+            if not weights[phrase]:
+                del weights[phrase]
+
+    assert len(trie) == len(weights)
+    _assert_matches(trie, weights)
+
+    for phrase, weight in list(weights.items()):
+        trie.add(phrase, -weight)
+    assert trie.complete("") == []
+    trie.refresh()
+    assert trie.root.children == {}
+
+
+def test_limit_and_key_length():
+    """Completions are cut to the limit, and long prefixes to max_key_length"""
+    trie = CompletionTrie(k=3, max_key_length=6)
+    for phrase, weight in [("desk lamp", 3), ("desk", 2), ("desktop stand", 1)]:
+        trie.add(phrase, weight)
+
+    assert trie.complete("des", limit=2) == [("desk lamp", 3), ("desk", 2)]
+    assert trie.complete("desk lamp shade") == [("desk lamp", 3)]